@@ -0,0 +1,108 @@
+"""
+Cold-start times of the CLI and of importing the tools as libraries.
+
+Each case runs in a fresh interpreter, several times, and reports the median
+wall time. Every case also asserts, inside that interpreter, that none of
+`HEAVY_MODULES` (LangChain, pypdf) got imported by `--help` or a plain import,
+which catches regressions long before they show up as seconds. `--check`
+runs each case once and only makes that assertion (exit status 1 on failure);
+tests/test_cold_start.py runs the same cases under pytest:
+
+    python benchmarks/bench_cold_start.py --check
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --save benchmarks/results/cold_start.json
+    python benchmarks/bench_cold_start.py --compare benchmarks/results/cold_start.json --threshold 0.5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only a running LLM call or document parse should pull in
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_community", "langchain_google_genai", "pypdf")
+
+TOOLS = ("cv_ranking", "cover_letter", "cv_builder", "psycometric")
+HELP = "try:\n    {call}\nexcept SystemExit:\n    pass"
+
+# name -> Python code run with the repo root as working directory
+CASES = {
+    "cli_help": "import careercraft\n" + HELP.format(call="careercraft.main(['--help'])"),
+    "rank_help": "import careercraft\n" + HELP.format(call="careercraft.main(['rank', '--help'])"),
+    **{f"import_{tool}": f"from tools import load_tool; load_tool({tool!r})" for tool in TOOLS},
+    **{f"help_{tool}": "from tools import load_tool\n" + HELP.format(call=f"load_tool({tool!r}).main(['--help'])")
+       for tool in TOOLS},
+}
+
+# Appended to every case: the last stderr line lists the heavy modules that got imported,
+# and the interpreter exits with an AssertionError if there are any
+REPORT = """
+import sys, json
+heavy = sorted({name.split('.')[0] for name in sys.modules} & set(%r))
+print(json.dumps(heavy), file=sys.stderr)
+assert not heavy, f"imported {heavy}"
+"""
+
+
+def run_case(code, runs):
+    timings = []
+    heavy = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-c", code + REPORT % (HEAVY_MODULES,)], cwd=ROOT, capture_output=True, text=True,
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        lines = [line for line in process.stderr.splitlines() if line.startswith("[")]
+        if not lines:
+            raise RuntimeError(f"case failed before its import check:\n{process.stderr}")
+        heavy = json.loads(lines[-1])
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "heavy_imports": heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI and tool import cold-start times.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    parser.add_argument("--check", action="store_true", help="Only assert that no heavy module is imported")
+    parser.add_argument("--save", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --save run")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Fail when a case's median is this much slower than the baseline (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for name, code in CASES.items():
+        result = results[name] = run_case(code, 1 if args.check else args.runs)
+        flag = ""
+        if result["heavy_imports"]:
+            flag = f"  FAIL imports {', '.join(result['heavy_imports'])}"
+            failed = True
+        print(f"{name:<22} median {result['median_ms']:>7.1f} ms  min {result['min_ms']:>7.1f} ms{flag}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            change = result["median_ms"] / baseline[name]["median_ms"] - 1
+            if change > args.threshold:
+                print(f"REGRESSION {name}: {baseline[name]['median_ms']:.1f} -> {result['median_ms']:.1f} ms "
+                      f"({change:+.0%})")
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
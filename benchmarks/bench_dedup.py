@@ -0,0 +1,125 @@
+"""
+Scale check for dedup.DedupIndex.
+
+Fills the index with `--cvs` signatures (random signatures stand in for
+unrelated CVs, whose MinHash values are independent anyway), plus a set of
+real synthetic CV texts. Then it times lookups of lightly edited copies of those
+CVs (which should be found) and of new CVs (which should not), and reports
+recall, false matches, signature cost, the time to load the index back
+from a ResultStore, and peak RSS:
+
+    python benchmarks/bench_dedup.py --cvs 100000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import resource
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import DedupIndex  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+
+WORDS = """
+analyst engineer python sql excel dashboards pipelines stakeholders reporting forecasting pandas spark
+airflow tableau power bi modelling experiments marketing finance revenue churn retention budgets teams
+mentored delivered automated migrated designed launched improved reduced increased led owned built
+customers product research operations logistics healthcare retail banking insurance startup enterprise
+""".split()
+
+
+def synthetic_cv(rng, lines=40, words_per_line=12):
+    return "\n".join(" ".join(rng.choice(WORDS) for _ in range(words_per_line)) for _ in range(lines))
+
+
+def edit(rng, text, changes=2):
+    """A re-upload: a couple of words changed and a new contact line."""
+    words = text.split(" ")
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words) + "\nPhone: +44 7000 000000"
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate CV lookups.")
+    parser.add_argument("--cvs", type=int, default=100_000, help="Signatures in the index")
+    parser.add_argument("--texts", type=int, default=1000, help="Real CV texts among them (and edited lookups)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = DedupIndex()
+    texts = [synthetic_cv(rng) for _ in range(args.texts)]
+
+    started = time.perf_counter()
+    fingerprints = [index.fingerprint(text) for text in texts]
+    signature_ms = (time.perf_counter() - started) / len(texts) * 1000
+
+    filler = np.random.default_rng(args.seed).integers(
+        0, 1 << 32, size=(args.cvs - len(texts), index.num_perm), dtype=np.uint32
+    )
+    started = time.perf_counter()
+    index.add_many([f"random-{number}" for number in range(len(filler))], filler)
+    build = time.perf_counter() - started
+    started = time.perf_counter()
+    for cv_hash, signature in fingerprints:
+        index.add(cv_hash, signature)
+    add_us = (time.perf_counter() - started) / len(fingerprints) * 1e6
+
+    with tempfile.TemporaryDirectory() as directory:
+        with ResultStore(os.path.join(directory, "results.sqlite3")) as store:
+            index.save(store)
+            started = time.perf_counter()
+            loaded = DedupIndex.load(store)
+            load = time.perf_counter() - started
+        assert len(loaded) == len(index)
+
+    edited = [index.fingerprint(edit(rng, text)) for text in texts]
+    new = [index.fingerprint(synthetic_cv(rng)) for _ in range(args.texts)]
+
+    found, hit_timings = 0, []
+    for (cv_hash, signature), (original, _) in zip(edited, fingerprints):
+        started = time.perf_counter()
+        match = index.match(cv_hash, signature)
+        hit_timings.append(time.perf_counter() - started)
+        found += match is not None and match.cv_hash == original
+
+    false_matches, miss_timings = 0, []
+    for cv_hash, signature in new:
+        started = time.perf_counter()
+        match = index.match(cv_hash, signature)
+        miss_timings.append(time.perf_counter() - started)
+        false_matches += match is not None
+
+    exact_timings = []
+    for cv_hash, signature in fingerprints:
+        started = time.perf_counter()
+        index.match(cv_hash, signature)
+        exact_timings.append(time.perf_counter() - started)
+
+    print(f"Index: {len(index):,} signatures, add_many {build:.2f}s, add {add_us:.0f} us each, "
+          f"load from store {load:.2f}s, peak RSS {peak_rss_mb():.0f} MB")
+    print(f"Signature: {signature_ms:.2f} ms per CV")
+    for name, timings in (("near duplicate", hit_timings), ("new CV", miss_timings), ("exact", exact_timings)):
+        p50, p99 = percentiles(timings)
+        print(f"Lookup {name:<15} p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+    print(f"Recall: {found}/{len(edited)} edited CVs matched their original")
+    print(f"False matches: {false_matches}/{len(new)} new CVs")
+
+
+if __name__ == "__main__":
+    main()
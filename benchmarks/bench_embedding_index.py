@@ -0,0 +1,84 @@
+"""
+Scale check for embedding_index.EmbeddingIndex.
+
+Builds an index of synthetic CVs (random unit vectors stand in for the
+embedder, whose cost is not what is measured here), then times free-text
+search and "similar CV" queries and reports peak RSS next to the on-disk
+size of the vectors:
+
+    python benchmarks/bench_embedding_index.py --cvs 100000
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_index import EmbeddingIndex  # noqa: E402
+
+SECTIONS = ["header", "summary", "experience", "skills", "education", "projects", "certifications", "languages"]
+
+
+class RandomEmbedder:
+    name = "random"
+
+    def __init__(self, dim, seed=0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+
+    def embed(self, texts):
+        vectors = self.rng.standard_normal((len(texts), self.dim), dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory-mapped CV embedding index.")
+    parser.add_argument("--cvs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch", type=int, default=2000, help="CVs per add_many call")
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    # Every CV gets the same text, so each one is split into the same handful of section chunks
+    pages = ["\n".join(f"{section.title()}\nline about {section}" for section in SECTIONS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = EmbeddingIndex(directory, embedder=RandomEmbedder(args.dim))
+        started = time.perf_counter()
+        for start in range(0, args.cvs, args.batch):
+            index.add_many([(f"cv-{i:06d}", pages) for i in range(start, min(start + args.batch, args.cvs))])
+        build = time.perf_counter() - started
+        rss_after_build = peak_rss_mb()
+        vectors_mb = os.path.getsize(os.path.join(directory, "vectors.f32")) / 1e6
+        print(f"built {len(index)} CVs / {index.count} chunks in {build:.1f}s "
+              f"(vectors on disk: {vectors_mb:.0f} MB, peak RSS {rss_after_build:.0f} MB)")
+
+        # Reopen so searches start from the files, not from pages left behind by the build
+        index = EmbeddingIndex(directory, embedder=index.embedder)
+        timings = []
+        for i in range(args.queries):
+            query = index.embedder.embed(["query"])[0]
+            started = time.perf_counter()
+            results = index.search_vector(query, k=10)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f"search: p50 {timings[len(timings) // 2] * 1000:.1f} ms, max {timings[-1] * 1000:.1f} ms, "
+              f"top hit {results[0][0]} ({results[0][1]:.3f})")
+
+        started = time.perf_counter()
+        index.similar_to("cv-000042", k=10)
+        print(f"similar_to: {(time.perf_counter() - started) * 1000:.1f} ms")
+        print(f"peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Memory and latency check for page_loader against the eager PyPDFLoader path.
+
+Writes a synthetic portfolio PDF (text pages followed by large image-only
+pages, like a CV with scanned certificates attached), then compares
+PyPDFLoader(...).load() with page_loader.iter_pages under a token budget:
+
+    python benchmarks/bench_page_loader.py --text-pages 40 --image-pages 60
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.document_loaders import PyPDFLoader  # noqa: E402
+from page_loader import iter_pages  # noqa: E402
+
+
+def write_pdf(path, text_pages, image_pages, image_kb):
+    """Minimal PDF writer with a correct xref table; image pages carry raw /Image streams."""
+    objects = {}
+    page_ids = []
+    next_id = 4  # 1 = catalog, 2 = pages, 3 = font
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+    line = "Senior engineer building Python data pipelines, FastAPI services and LangChain tooling."
+    for number in range(text_pages):
+        rows = "".join(f"({line} p{number} l{row}) Tj T* " for row in range(40))
+        content = f"BT /F1 10 Tf 12 TL 50 780 Td {rows}ET".encode()
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(page_id)
+
+    side = int((image_kb * 1024 / 3) ** 0.5)
+    for _ in range(image_pages):
+        image = os.urandom(side * side * 3)
+        content = b"q 612 0 0 792 0 0 cm /Im0 Do Q"
+        image_id, content_id, page_id = next_id, next_id + 1, next_id + 2
+        next_id += 3
+        objects[image_id] = (b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                             b"/BitsPerComponent 8 /Length %d >>\nstream\n" % (side, side, len(image))
+                             + image + b"\nendstream")
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>" % (image_id, content_id))
+        page_ids.append(page_id)
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = {}
+        for object_id in sorted(objects):
+            offsets[object_id] = f.tell()
+            f.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+        xref_at = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (next_id))
+        for object_id in range(1, next_id):
+            f.write(b"%010d 00000 n \n" % offsets[object_id])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref_at))
+
+
+def measure(name, fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    pages = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<28} {elapsed * 1000:9.1f} ms   peak {peak / 1e6:8.1f} MB   {sum(map(len, pages)):>8} chars")
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lazy page loading against PyPDFLoader.")
+    parser.add_argument("--text-pages", type=int, default=40)
+    parser.add_argument("--image-pages", type=int, default=60)
+    parser.add_argument("--image-kb", type=int, default=1024, help="raw size of each page image")
+    parser.add_argument("--max-tokens", type=int, default=3000 * 3, help="read budget for the budgeted run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "portfolio.pdf")
+        write_pdf(path, args.text_pages, args.image_pages, args.image_kb)
+        print(f"{args.text_pages} text + {args.image_pages} image pages, "
+              f"{os.path.getsize(path) / 1e6:.0f} MB on disk\n")
+
+        eager = measure("PyPDFLoader.load()", lambda: [
+            document.page_content for document in PyPDFLoader(path).load()])
+        lazy = measure("iter_pages (full)", lambda: list(iter_pages(path, PyPDFLoader, cache=False)))
+        measure(f"iter_pages ({args.max_tokens} tokens)", lambda: list(
+            iter_pages(path, PyPDFLoader, max_tokens=args.max_tokens, cache=False)))
+
+        # Image pages come back empty from PyPDFLoader; the lazy reader drops them instead
+        assert lazy == [text for text in eager if text]
+        print("\nfull lazy read matches PyPDFLoader text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Throughput benchmark for the CV ranking response parser.
+
+Runs `parse_ranking` over a corpus of ranking responses (clean JSON, fenced
+JSON, legacy markdown, reordered/bolded headings and truncated output) and
+reports parses per second plus which parser path handled each response.
+
+    python benchmarks/bench_ranking_parser.py [--iterations 2000] [--corpus FILE]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ranking_parser import parse_ranking  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "data", "ranking_responses.jsonl")
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["response"] for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    modes = Counter(parse_ranking(response)["Parse Mode"] for response in corpus)
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        for response in corpus:
+            parse_ranking(response)
+    elapsed = time.perf_counter() - started
+
+    parsed = args.iterations * len(corpus)
+    print(f"corpus: {len(corpus)} responses, {sum(map(len, corpus)) / len(corpus):.0f} chars on average")
+    print(f"modes: {dict(modes)}")
+    print(f"parsed {parsed} responses in {elapsed:.3f}s -> {parsed / elapsed:,.0f} responses/s "
+          f"({elapsed / parsed * 1e6:.1f} us each)")
+
+
+if __name__ == "__main__":
+    main()
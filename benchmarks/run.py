@@ -0,0 +1,336 @@
+"""
+Benchmark suite for the CareerCraft tools, run against a local fake Gemini.
+
+Every case runs in its own interpreter, is timed per iteration and reported
+as throughput plus p50/p95/p99 latency, together with the peak RSS of that
+interpreter (so one case's memory never shows up in the next one's).
+Results are written as JSON (by default to benchmarks/results/<commit>.json)
+so runs on different commits can be compared:
+
+    python benchmarks/run.py --iterations 50 --latency 0.05
+    python benchmarks/run.py --compare benchmarks/results/<old-commit>.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import zipfile
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_llm import install_fake_llm  # noqa: E402
+from tools import load_tool  # noqa: E402
+
+SAMPLE_PDF = os.path.join(ROOT, "Ankon-CV.pdf")
+RANKING_CORPUS = os.path.join(ROOT, "benchmarks", "data", "ranking_responses.jsonl")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+JOB_DESCRIPTION = (
+    "We are looking for a Data Analyst with experience in SQL, Python, Excel, and Power BI. "
+    "Candidate should have strong analytical skills, experience with dashboards, and business communication skills."
+)
+
+
+# ---------------------------
+# Fixtures
+# ---------------------------
+CV_PARAGRAPHS = [
+    "Data Analyst with four years of experience in SQL, Python and Power BI.",
+    "Built executive dashboards used by 40 stakeholders and cut reporting time by 30%.",
+    "Automated weekly Excel reports with pandas and scheduled SQL jobs.",
+    "Presented findings to sales and finance leadership every quarter.",
+]
+
+
+def synthetic_cv_text(paragraphs=60, seed=0):
+    rng = random.Random(seed)
+    return "\n".join(rng.choice(CV_PARAGRAPHS) for _ in range(paragraphs))
+
+
+def write_pdf(path, text):
+    """Writes a one-page PDF with one line of Helvetica text per line of `text`."""
+    def literal(line):
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    lines = "".join(f"({literal(line)}) Tj T* " for line in text.splitlines())
+    content = f"BT /F1 8 Tf 10 TL 30 780 Td {lines}ET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [5 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 3 0 R >> >> /Contents 4 0 R >>",
+    ]
+    with open(path, "wb") as pdf:
+        pdf.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(pdf.tell())
+            pdf.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = pdf.tell()
+        pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        pdf.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def write_docx(path, text):
+    """Writes a minimal .docx (just enough OOXML for Docx2txt/Unstructured to read)."""
+    body = "".join(f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in text.splitlines())
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        docx.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/>'
+            '</Relationships>'
+        ))
+        docx.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ))
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS; it is this process's peak, hence one process per case
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(name, fn, iterations, warmup=1, ops_per_call=1):
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    result = {
+        "iterations": iterations,
+        "throughput_per_s": iterations * ops_per_call / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(
+        f"{name:<28} {result['throughput_per_s']:>10.1f}/s  p50 {result['p50_ms']:>8.2f}ms  "
+        f"p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  rss {result['peak_rss_mb']:>7.1f}MB"
+    )
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ---------------------------
+# Cases
+# ---------------------------
+# Document loading measures parsing itself, so these cases bypass the shared text cache
+UNCACHED_CASES = ("load_pdf", "load_docx", "load_txt", "analyze_cv_uncached")
+# Ranking cases that also report input tokens per scored CV, with their CVs per prompt
+TOKEN_CASES = {"rank_cvs_batch": 1, "rank_cvs_packed": 4}
+
+
+def build_cases(args, workdir):
+    """
+    Writes the fixtures to `workdir` and returns ({name: (label, fn, iterations, ops_per_call)}, rank),
+    where `rank(cvs_per_prompt)` ranks the CV batch once.
+    """
+    cv_ranking = load_tool("cv_ranking")
+    cover_letter = load_tool("cover_letter")
+    psycometric = load_tool("psycometric")
+    from fake_llm import canned_response
+
+    cv_text = synthetic_cv_text()
+    docx_path = os.path.join(workdir, "cv.docx")
+    txt_path = os.path.join(workdir, "cv.txt")
+    write_docx(docx_path, cv_text)
+    with open(txt_path, "w", encoding="utf-8") as f:
+        f.write(cv_text)
+
+    # Distinct CVs, so neither the text cache nor request coalescing folds the batch into one call
+    pdf_paths = []
+    for number in range(args.batch_size):
+        path = os.path.join(workdir, f"candidate-{number}.pdf")
+        write_pdf(path, f"Candidate {number}\n" + synthetic_cv_text(seed=number))
+        pdf_paths.append(path)
+
+    with open(RANKING_CORPUS, encoding="utf-8") as f:
+        ranking_responses = [json.loads(line)["response"] for line in f if line.strip()]
+    questions_text = canned_response("psychometric test questions")
+
+    def rank(cvs_per_prompt):
+        return asyncio.run(cv_ranking.arank_cvs(
+            pdf_paths, JOB_DESCRIPTION, max_concurrency=args.batch_size, cvs_per_prompt=cvs_per_prompt
+        ))
+
+    n = args.iterations
+    return {
+        "load_pdf": ("load_pdf", lambda: cover_letter.load_cv_pages(SAMPLE_PDF), n, 1),
+        "load_docx": ("load_docx", lambda: cover_letter.load_cv_pages(docx_path), n, 1),
+        "load_txt": ("load_txt", lambda: cover_letter.load_cv_pages(txt_path), n, 1),
+        "analyze_cv_uncached": (
+            "analyze_cv (no text cache)", lambda: cv_ranking.analyze_cv(SAMPLE_PDF, JOB_DESCRIPTION), n, 1
+        ),
+        "analyze_cv": ("analyze_cv", lambda: cv_ranking.analyze_cv(SAMPLE_PDF, JOB_DESCRIPTION), n, 1),
+        "parse_response": (
+            "parse_response", lambda: [cv_ranking.parse_response(response) for response in ranking_responses],
+            n * 10, len(ranking_responses),
+        ),
+        "generate_cover_letter": (
+            "generate_cover_letter", lambda: cover_letter.generate_cover_letter(cv_text, JOB_DESCRIPTION), n, 1
+        ),
+        "parse_questions": (
+            "psycometric parse_questions", lambda: psycometric.parse_questions(questions_text), n * 10, 1
+        ),
+        "rank_cvs_batch": (f"rank_cvs x{args.batch_size}", lambda: rank(1), max(1, n // 10), args.batch_size),
+        "rank_cvs_packed": (
+            f"rank_cvs x{args.batch_size} (4/prompt)", lambda: rank(4), max(1, n // 10), args.batch_size
+        ),
+    }, rank
+
+
+CASE_NAMES = (
+    "load_pdf", "load_docx", "load_txt", "analyze_cv_uncached", "analyze_cv", "parse_response",
+    "generate_cover_letter", "parse_questions", "rank_cvs_batch", "rank_cvs_packed",
+)
+
+
+def run_case(args, name):
+    """Runs one case in this process (the child side of `run_cases`)."""
+    install_fake_llm(latency=args.latency, error_rate=args.error_rate)
+    with tempfile.TemporaryDirectory() as workdir:
+        # Keep the benchmark's text cache away from the user's
+        os.environ.setdefault("CAREERCRAFT_TEXT_CACHE_DIR", os.path.join(workdir, "text-cache"))
+        os.environ["CAREERCRAFT_TEXT_CACHE"] = "0" if name in UNCACHED_CASES else "1"
+        cases, rank = build_cases(args, workdir)
+        label, fn, iterations, ops_per_call = cases[name]
+        result = measure(label, fn, iterations, ops_per_call=ops_per_call)
+
+        # Input tokens per scored CV, one CV per prompt vs. packed (lower is better, reported next to the timings)
+        if name in TOKEN_CASES:
+            tokens = [row["Prompt Tokens"] for row in rank(TOKEN_CASES[name]) if row["Prompt Tokens"]]
+            result["input_tokens_per_cv"] = sum(tokens) / len(tokens) if tokens else None
+            print(f"{name:<28} {result['input_tokens_per_cv']:>10.0f} input tokens per CV")
+    return result
+
+
+def run_cases(args):
+    """Runs every case in a fresh interpreter and collects the JSON each one prints last."""
+    results = {}
+    for name in CASE_NAMES:
+        process = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--case", name, "--iterations", str(args.iterations),
+             "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+             "--batch-size", str(args.batch_size)],
+            cwd=ROOT, stdout=subprocess.PIPE, text=True, check=True,
+        )
+        *lines, last = process.stdout.splitlines()
+        for line in lines:
+            print(line)
+        results[name] = json.loads(last)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["p50_ms"]:
+            continue
+        change = (current["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"]
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"  {name:<26} p50 {previous['p50_ms']:>8.2f}ms -> {current['p50_ms']:>8.2f}ms ({change:+.0%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated LLM latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of LLM calls failing with a 429 (exercises the scheduler's retries)")
+    parser.add_argument("--batch-size", type=int, default=20, help="CVs per rank_cvs batch")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative p50 slowdown counted as a regression")
+    parser.add_argument("--case", choices=CASE_NAMES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args, args.case)))
+        return
+
+    results = run_cases(args)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "iterations": args.iterations, "latency": args.latency,
+            "error_rate": args.error_rate, "batch_size": args.batch_size,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
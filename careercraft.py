@@ -0,0 +1,53 @@
+import os
+import sys
+import argparse
+
+
+# ---------------------------
+# Subcommands
+# ---------------------------
+# subcommand -> (tool module, help); each tool parses its own options, so nothing
+# beyond argparse is imported until a subcommand actually runs
+COMMANDS = {
+    "rank": ("cv_ranking", "Rank CVs against a job description (or roles for one CV with --jobs)"),
+    "cover-letter": ("cover_letter", "Write cover letters for one or many job descriptions"),
+    "enhance": ("cv_builder", "Enhance CV sections (interactive menu, or --cv JSON)"),
+    "psychometric": ("psycometric", "Take a psychometric test and get AI feedback"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="careercraft",
+        description="CareerCraft AI command line tools.",
+        epilog="Run 'careercraft <command> --help' for the options of a command.",
+    )
+    subcommands = parser.add_subparsers(dest="command", required=True, metavar="<command>")
+    for name, (_, help_text) in COMMANDS.items():
+        # The tool's own parser handles everything after the command name, including --help
+        subcommands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args, rest = build_parser().parse_known_args(argv[:1])
+    rest += argv[1:]
+
+    # Loaded here rather than at import: the tools leave .env alone when imported as modules
+    from dotenv import load_dotenv
+    from tools import load_tool
+
+    load_dotenv()
+    # "fake" serves canned responses locally (see fake_llm.py), as in main.py
+    if os.getenv("CAREERCRAFT_LLM_BACKEND") == "fake":
+        from fake_llm import install_fake_llm
+
+        install_fake_llm(latency=float(os.getenv("CAREERCRAFT_FAKE_LATENCY", 0.5)))
+
+    module, _ = COMMANDS[args.command]
+    return load_tool(module).main(rest, prog=f"careercraft {args.command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import os
+import re
+from collections import Counter
+from prefilter import tokenize
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+# Roughly two dense CV pages; None disables trimming (cleanup still applies)
+DEFAULT_TOKEN_BUDGET = int(os.getenv("CAREERCRAFT_CV_TOKEN_BUDGET", 3000))
+
+# Headings that commonly open CV sections, and how much we care about them regardless of the JD
+SECTION_PRIORITY = {
+    "summary": 3, "professional summary": 3, "profile": 3, "objective": 2, "career objective": 2, "about me": 2,
+    "experience": 4, "work experience": 4, "professional experience": 4, "employment": 4,
+    "employment history": 4, "work history": 4, "internship": 3, "internships": 3,
+    "skills": 4, "technical skills": 4, "core skills": 4, "key skills": 4, "competencies": 3,
+    "projects": 3, "education": 2, "certifications": 2, "certificates": 2, "achievements": 2,
+    "awards": 1, "publications": 1, "languages": 1, "volunteering": 1, "volunteer experience": 1,
+    "interests": 0, "hobbies": 0, "references": 0, "activities": 1, "extracurricular activities": 1,
+}
+# "Relevant Experience", "Tools & Skills" and similar variants are matched on their last word
+HEADING_LAST_WORDS = {
+    "summary", "profile", "objective", "experience", "history", "skills", "projects",
+    "education", "certifications", "achievements", "awards", "publications", "languages",
+}
+# Headers and footers live in the first/last few lines of a page
+EDGE_LINES = 3
+
+# "Page 2", "Page 2 of 3", "2 of 3", "2/3", "- 2 -"; a bare "2" is only a page number at a page edge (see clean_lines)
+PAGE_NUMBER_PATTERN = re.compile(
+    r"^(?:page\s*\d+(?:\s*(?:/|of)\s*\d+)?|\d+\s*(?:/|of)\s*\d+|[-–]\s*\d+\s*[-–])$", re.IGNORECASE
+)
+BARE_NUMBER_PATTERN = re.compile(r"^\d+$")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for Gemini on English text)."""
+    return (len(text) + 3) // 4
+
+
+# ---------------------------
+# Cleanup
+# ---------------------------
+def clean_lines(pages):
+    """
+    Normalizes whitespace and drops boilerplate: page numbers, headers/footers
+    repeated on most pages, and exact duplicate lines (PyPDFLoader sometimes
+    emits the same content twice).
+    """
+    if isinstance(pages, str):
+        pages = [pages]
+
+    page_lines = [
+        [WHITESPACE_PATTERN.sub(" ", line).strip() for line in page.splitlines()]
+        for page in pages
+    ]
+
+    page_lines = [[line for line in lines if line] for lines in page_lines]
+
+    def edges(lines):
+        return lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+
+    # Edge lines present on at least half of a multi-page document are headers/footers;
+    # so are bare numbers ("1", "2", ...) when that many pages have one at an edge
+    repeated = set()
+    bare_page_numbers = False
+    if len(page_lines) > 1:
+        per_page = Counter()
+        numbered_pages = 0
+        for lines in page_lines:
+            per_page.update(set(edges(lines)))
+            numbered_pages += any(BARE_NUMBER_PATTERN.match(line) for line in edges(lines))
+        threshold = max(2, (len(page_lines) + 1) // 2)
+        repeated = {line for line, count in per_page.items() if count >= threshold}
+        bare_page_numbers = numbered_pages >= threshold
+
+    seen = set()
+    cleaned = []
+    for lines in page_lines:
+        for position, line in enumerate(lines):
+            if line in repeated or PAGE_NUMBER_PATTERN.match(line):
+                continue
+            at_edge = position < EDGE_LINES or position >= len(lines) - EDGE_LINES
+            if bare_page_numbers and at_edge and BARE_NUMBER_PATTERN.match(line):
+                continue
+            # Short lines ("Python", "2019") legitimately repeat; long ones are duplicated content
+            if len(line) >= 25:
+                if line in seen:
+                    continue
+                seen.add(line)
+            cleaned.append(line)
+    return cleaned
+
+
+# ---------------------------
+# Sections
+# ---------------------------
+def _heading_key(line):
+    key = line.strip(" :*#-•").lower()
+    if key in SECTION_PRIORITY:
+        return key
+    words = key.replace("&", " ").split()
+    if 1 < len(words) <= 3 and words[-1] in HEADING_LAST_WORDS:
+        return key
+    return None
+
+
+def _section_priority(heading):
+    if heading in SECTION_PRIORITY:
+        return SECTION_PRIORITY[heading]
+    return SECTION_PRIORITY.get(heading.split()[-1], 1)
+
+
+def split_sections(lines):
+    """Splits cleaned lines into [(heading, [lines])]; text before the first heading is the header."""
+    sections = [("header", [])]
+    for line in lines:
+        key = _heading_key(line) if len(line) <= 40 else None
+        if key is not None:
+            sections.append((key, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, body) for heading, body in sections if body]
+
+
+class CompactionResult:
+    """Compacted CV text plus before/after token counts."""
+
+    __slots__ = ("text", "tokens_before", "tokens_after", "dropped_sections")
+
+    def __init__(self, text, tokens_before, tokens_after, dropped_sections):
+        self.text = text
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+        self.dropped_sections = dropped_sections
+
+    def __str__(self):
+        saved = 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+        return f"CV tokens {self.tokens_before} -> {self.tokens_after} ({saved:.0%} saved)"
+
+
+def compact_cv(pages, job_description="", token_budget=DEFAULT_TOKEN_BUDGET, count_tokens=estimate_tokens):
+    """
+    Cleans CV text and trims it to `token_budget`.
+
+    The header (name, contact details) is always kept. Remaining sections are
+    admitted by how many job description keywords they mention, then by a
+    default priority (experience and skills before hobbies), and are emitted
+    in their original order. The last admitted section may be cut at a line
+    boundary to fill the budget exactly.
+    """
+    raw = pages if isinstance(pages, str) else "\n".join(pages)
+    tokens_before = count_tokens(raw)
+
+    sections = split_sections(clean_lines(pages))
+    if token_budget is None:
+        text = "\n".join(line for _, body in sections for line in body)
+        return CompactionResult(text, tokens_before, count_tokens(text), [])
+
+    jd_terms = set(tokenize(job_description))
+
+    def relevance(item):
+        index, (heading, body) = item
+        # The header (name, contact details) is always kept; a CV may also start straight with a section
+        if heading == "header":
+            return (float("inf"), 0, 0)
+        overlap = len(jd_terms.intersection(tokenize(" ".join(body)))) if jd_terms else 0
+        return (overlap, _section_priority(heading), -index)
+
+    kept = {}
+    remaining = token_budget
+    for index, (heading, body) in sorted(enumerate(sections), key=relevance, reverse=True):
+        if remaining <= 0:
+            break
+        section_text = "\n".join(body)
+        cost = count_tokens(section_text) + 1
+        if cost <= remaining:
+            kept[index] = body
+            remaining -= cost
+            continue
+
+        # Partially keep the section, line by line, to use up the budget
+        partial = []
+        for line in body:
+            line_cost = count_tokens(line) + 1
+            if line_cost > remaining:
+                break
+            partial.append(line)
+            remaining -= line_cost
+        if partial:
+            kept[index] = partial
+        remaining = 0
+
+    text = "\n".join(line for index in sorted(kept) for line in kept[index])
+    dropped = [heading for index, (heading, _) in enumerate(sections) if index not in kept]
+    return CompactionResult(text, tokens_before, count_tokens(text), dropped)
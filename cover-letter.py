@@ -1,57 +1,60 @@
 import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
-
-# Updated imports
-from langchain.document_loaders import PyPDFLoader
-from langchain_community.document_loaders import Docx2txtLoader, TextLoader
+import re
+import time
+import asyncio
+import argparse
+import hashlib
+import tempfile
+from page_loader import read_pages, read_budget
+from llm_clients import get_chat_model
+from compaction import DEFAULT_TOKEN_BUDGET, CompactionResult, compact_cv
+import tracing
+from streaming import LatencyReport, invoke_text, ainvoke_text, stream_text, astream_text, print_stream
 
 
 # --------------------------
-# Load API Key
+# Load API Key (only when run as a script; see llm_clients.py)
 # --------------------------
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+if __name__ == "__main__":
+    from dotenv import load_dotenv
 
-if not GOOGLE_API_KEY:
-    raise ValueError("❌ GOOGLE_API_KEY not found in .env file")
+    load_dotenv()
 
 # --------------------------
-# Initialize Gemini Model
+# Gemini Model (built on first use and shared, see llm_clients.py)
 # --------------------------
-model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=GOOGLE_API_KEY)
+def get_model():
+    return get_chat_model()
 
 # --------------------------
 # Function to load CV
 # --------------------------
-def load_cv(file_path: str) -> str:
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".pdf":
-        loader = PyPDFLoader(file_path)
-    elif ext == ".docx":
-        loader = Docx2txtLoader(file_path)
-    elif ext == ".txt":
-        loader = TextLoader(file_path)
-    else:
+# Loader classes by path, so LangChain is only imported when a document is actually parsed
+LOADERS = {
+    ".pdf": "langchain_community.document_loaders.pdf.PyPDFLoader",
+    ".docx": "langchain_community.document_loaders.word_document.Docx2txtLoader",
+    ".txt": "langchain_community.document_loaders.text.TextLoader",
+}
+
+def load_cv_pages(file_path: str, max_tokens: int = None) -> list:
+    loader_cls = LOADERS.get(os.path.splitext(file_path)[1].lower())
+    if loader_cls is None:
         raise ValueError("❌ Unsupported file format. Use PDF, DOCX, or TXT.")
 
-    docs = loader.load()
-    return " ".join([d.page_content for d in docs])
+    # Pages are read lazily up to `max_tokens`; parsed pages are shared with cv-ranking.py through the text cache
+    return read_pages(file_path, loader_cls, max_tokens)
+
+def load_cv(file_path: str) -> str:
+    return " ".join(load_cv_pages(file_path))
 
 # --------------------------
-# Generate Cover Letter
+# Cover Letter Prompt
 # --------------------------
-def generate_cover_letter(cv_text: str, job_description: str) -> str:
-    prompt = ChatPromptTemplate.from_template("""
+# The fixed instructions go first as a system message, a stable prefix the backend can cache.
+# The CV comes before the job description, so bulk runs (one CV, many jobs) share it as well.
+COVER_LETTER_INSTRUCTIONS = """
     You are an expert career coach and professional writer. 
-    Using the candidate's CV and the provided Job Description (JD), create a personalized cover letter. 
-
-    CV Content:
-    {cv}
-
-    Job Description:
-    {jd}
+    Using the candidate's CV and the provided Job Description (JD) in the next message, create a personalized cover letter. 
 
     The cover letter should:
     - Be professional and well-structured
@@ -60,27 +63,197 @@ def generate_cover_letter(cv_text: str, job_description: str) -> str:
     - Avoid being too formal or robotic—make it conversational and engaging
     - Stay within one page (approximately 3-4 short paragraphs)
 
-    Now write the cover letter:
-    """)
+    Reply with the cover letter only.
+    """
+
+COVER_LETTER_INPUT = "CV Content:\n{cv}\n\nJob Description:\n{jd}\n\nNow write the cover letter:"
+
+_cover_letter_prompt = None
+
+def cover_letter_chain():
+    # The prompt template is built on first use: langchain_core is slow to import and `--help` should not wait
+    global _cover_letter_prompt
+    if _cover_letter_prompt is None:
+        from langchain_core.prompts import ChatPromptTemplate
+
+        _cover_letter_prompt = ChatPromptTemplate.from_messages([
+            ("system", COVER_LETTER_INSTRUCTIONS),
+            ("human", COVER_LETTER_INPUT),
+        ])
+    return _cover_letter_prompt | get_model()
+
+# --------------------------
+# Generate Cover Letter
+# --------------------------
+def _prompt_inputs(cv_text, job_description, token_budget):
+    # A CV the caller already compacted (a CompactionResult) is sent as is
+    if isinstance(cv_text, CompactionResult):
+        return {"cv": cv_text.text, "jd": job_description}
+    # Drop boilerplate and trim to the token budget, keeping the sections the JD cares about
+    with tracing.span("compact_cv") as current:
+        compacted = compact_cv(cv_text, job_description, token_budget)
+        current.set(tokens_before=compacted.tokens_before, tokens_after=compacted.tokens_after)
+    return {"cv": compacted.text, "jd": job_description}
+
+def generate_cover_letter(cv_text: str, job_description: str, latency: LatencyReport = None,
+                          token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    with tracing.span("generate_cover_letter"):
+        chain = cover_letter_chain()
+        return invoke_text(chain, _prompt_inputs(cv_text, job_description, token_budget), latency)
 
-    chain = prompt | model
-    response = chain.invoke({"cv": cv_text, "jd": job_description})
+async def agenerate_cover_letter(cv_text: str, job_description: str, latency: LatencyReport = None,
+                                 token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    with tracing.span("generate_cover_letter"):
+        chain = cover_letter_chain()
+        return await ainvoke_text(chain, _prompt_inputs(cv_text, job_description, token_budget), latency)
 
-    # ✅ FIX: AIMessage object contains .content as string
-    return response.content if hasattr(response, "content") else str(response)
+def stream_cover_letter(cv_text: str, job_description: str, latency: LatencyReport = None,
+                        token_budget: int = DEFAULT_TOKEN_BUDGET):
+    """Yields the cover letter in chunks as Gemini generates it (`cv_text` may be an already compacted CV)."""
+    chain = cover_letter_chain()
+    inputs = _prompt_inputs(cv_text, job_description, token_budget)
+    yield from stream_text(chain, inputs, latency, stage="generate_cover_letter")
+
+def astream_cover_letter(cv_text: str, job_description: str, latency: LatencyReport = None,
+                         token_budget: int = DEFAULT_TOKEN_BUDGET):
+    """Async iterator version of `stream_cover_letter`."""
+    chain = cover_letter_chain()
+    inputs = _prompt_inputs(cv_text, job_description, token_budget)
+    return astream_text(chain, inputs, latency, stage="generate_cover_letter")
+
+# --------------------------
+# Bulk Cover Letters
+# --------------------------
+FILE_NAME_PATTERN = re.compile(r"[^\w.-]+")
+
+def letter_path(output_dir: str, role: str) -> str:
+    # The short hash keeps roles that sanitize alike ("Data Analyst (Remote)", "Data Analyst / Remote") apart
+    suffix = hashlib.sha256(role.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(output_dir, f"{FILE_NAME_PATTERN.sub('_', role).strip('_')}-{suffix}.txt")
+
+def _write_letter(path: str, text: str):
+    # Write to a temp file and rename, so a crash never leaves a half-written letter behind
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+async def _bulk_one(role, job_description, cv_text, output_dir, semaphore):
+    row = {"Role": role, "Path": letter_path(output_dir, role), "Status": None, "Seconds": None, "Error": None}
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            with tracing.span("generate_cover_letter", role=role):
+                chain = cover_letter_chain()
+                text = await ainvoke_text(chain, {"cv": cv_text, "jd": job_description})
+            await asyncio.to_thread(_write_letter, row["Path"], text)
+            row["Status"] = "written"
+        except Exception as e:  # one failed job should not sink the batch
+            row["Status"] = "failed"
+            row["Error"] = str(e)
+        row["Seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+async def agenerate_cover_letters(cv_path: str, job_descriptions: dict, output_dir: str, max_concurrency: int = 8,
+                                  token_budget: int = DEFAULT_TOKEN_BUDGET, overwrite: bool = False,
+                                  on_done=None) -> list:
+    """
+    Writes one cover letter per {role: job description} to `output_dir`/<role>-<hash>.txt.
+
+    The CV is loaded and compacted once, against all the job descriptions
+    together, and the same CV text is sent with every letter. Up to
+    `max_concurrency` letters are generated at a time and each one is written
+    as soon as it finishes. Roles whose letter file already exists are skipped
+    unless `overwrite` is set, so an interrupted run can simply be restarted.
+    `on_done(row)` is called as each row completes.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rows = []
+    pending = {}
+    for role, job_description in job_descriptions.items():
+        if not overwrite and os.path.exists(letter_path(output_dir, role)):
+            rows.append({"Role": role, "Path": letter_path(output_dir, role), "Status": "skipped",
+                         "Seconds": None, "Error": None})
+        else:
+            pending[role] = job_description
+    if not pending:
+        return rows
+
+    with tracing.span("compact_cv", roles=len(pending)) as current:
+        pages = await asyncio.to_thread(load_cv_pages, cv_path, read_budget(token_budget))
+        compacted = compact_cv(pages, "\n".join(pending.values()), token_budget)
+        current.set(tokens_before=compacted.tokens_before, tokens_after=compacted.tokens_after)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        asyncio.create_task(_bulk_one(role, job_description, compacted.text, output_dir, semaphore))
+        for role, job_description in pending.items()
+    ]
+    for task in asyncio.as_completed(tasks):
+        row = await task
+        rows.append(row)
+        if on_done is not None:
+            on_done(row)
+    return rows
+
+def generate_cover_letters(cv_path: str, job_descriptions: dict, output_dir: str, max_concurrency: int = 8,
+                           token_budget: int = DEFAULT_TOKEN_BUDGET, overwrite: bool = False, on_done=None) -> list:
+    """Synchronous wrapper around `agenerate_cover_letters`."""
+    return asyncio.run(agenerate_cover_letters(
+        cv_path, job_descriptions, output_dir, max_concurrency, token_budget, overwrite, on_done
+    ))
+
+def bulk_summary(rows: list, elapsed: float) -> str:
+    written = sum(row["Status"] == "written" for row in rows)
+    skipped = sum(row["Status"] == "skipped" for row in rows)
+    failed = sum(row["Status"] == "failed" for row in rows)
+    rate = written / elapsed * 60 if elapsed else 0.0
+    return (f"{written} written, {skipped} skipped, {failed} failed in {elapsed:.1f}s "
+            f"({rate:.1f} letters/min)")
 
 # --------------------------
 # Main Program
 # --------------------------
-if __name__ == "__main__":
-    cv_path = "Ankon-CV.pdf"  
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Write a cover letter for one or many job descriptions.")
+    parser.add_argument("cv", nargs="?", default="Ankon-CV.pdf", help="CV file (PDF, DOCX or TXT)")
+    parser.add_argument("--jobs", help="Directory of job descriptions (.txt/.md): write one letter per role")
+    parser.add_argument("--out", default="cover_letters", help="Output directory in --jobs mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum letters generated at once")
+    parser.add_argument("--overwrite", action="store_true", help="Regenerate letters that already exist")
+    args = parser.parse_args(argv)
+
+    if args.jobs:
+        from tools import load_tool
+        job_descriptions = load_tool("cv_ranking").load_job_descriptions(args.jobs)
+        print(f"📄 Writing {len(job_descriptions)} cover letters to {args.out}/ ...")
+        started = time.perf_counter()
+        rows = generate_cover_letters(
+            args.cv, job_descriptions, args.out, max_concurrency=args.concurrency, overwrite=args.overwrite,
+            on_done=lambda row: print(f"{'✅' if row['Status'] == 'written' else '❌'} {row['Role']} "
+                                      f"({row['Seconds']:.1f}s){' - ' + row['Error'] if row['Error'] else ''}"),
+        )
+        print(f"\n⏱️ {bulk_summary(rows, time.perf_counter() - started)}")
+        return
+
+    cv_path = args.cv
     job_description = input("📝 Paste Job Description: ").strip()
 
     print("\n📄 Reading CV...")
-    cv_text = load_cv(cv_path)
+    compacted = compact_cv(load_cv_pages(cv_path, read_budget(DEFAULT_TOKEN_BUDGET)), job_description)
+    print(f"✂️ {compacted}")
 
     print("⚡ Generating personalized cover letter...")
-    cover_letter = generate_cover_letter(cv_text, job_description)
+    latency = LatencyReport()
 
     print("\n✅ Generated Cover Letter:\n")
-    print(cover_letter)
+    print_stream(stream_cover_letter(compacted, job_description, latency))
+    print(f"\n⏱️ {latency}")
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,28 @@
 import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
+import sys
+import json
+import time
+import asyncio
+import argparse
+from llm_clients import get_chat_model
+from streaming import LatencyReport, stream_text, print_stream
+import tracing
 
 
 
-# --- 1. Load Environment Variables ---
-load_dotenv()
+# --- 1. Load Environment Variables (only when run as a script; see llm_clients.py) ---
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
 
-# --- 2. Initialize the Language Model (LLM) ---
-try:
-    # Use a highly capable model like gemini-2.5-flash for quality and speed
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
-    print("LLM (Gemini) initialized successfully.")
-except Exception as e:
-    print(f"Error initializing LLM. Make sure your Google/Gemini API key is set as GOOGLE_API_KEY in your .env file.")
-    print(f"Details: {e}")
-    exit()
+# --- 2. Language Model (LLM) ---
+def get_llm():
+    # Use a highly capable model like gemini-2.5-flash for quality and speed.
+    # The client is built on first use and shared (see llm_clients.py).
+    return get_chat_model(model="gemini-2.5-flash", temperature=0.7)
 
 
 
@@ -46,10 +50,15 @@ You are acting as a veteran career coach. Your goal is to review and rewrite a c
 
 --- Your Expertly Rewritten Summary ---
 """
-summary_prompt = PromptTemplate(
-    template=summary_template_string,
-    input_variables=["core_skills", "original_summary"]
-)
+
+def stream_summary(core_skills, original_summary, latency=None):
+    """Yields the rewritten summary in chunks as the model generates it."""
+    # Plain str.format templates: LangChain's PromptTemplate would be imported just for this
+    prompt_text = summary_template_string.format(
+        core_skills=core_skills,
+        original_summary=original_summary
+    )
+    yield from stream_text(get_llm(), prompt_text, latency, stage="enhance_summary")
 
 def task_1_enhance_summary():
     """Runs the enhanced professional summary task."""
@@ -66,20 +75,14 @@ def task_1_enhance_summary():
 
 
     
-    # Use llm.invoke() directly
-    prompt_value = summary_prompt.format_prompt(
-        core_skills=core_skills,
-        original_summary=original_summary
-    )
-    
-    response = llm.invoke(prompt_value.to_string())
+    # Stream the rewrite so the first words show up as soon as Gemini sends them
+    latency = LatencyReport()
 
-
-    
     print("\n--- ✅ HERE IS YOUR REVISED PROFESSIONAL SUMMARY ---")
     print("-----------------------------------------------------")
-    print(response.content.strip())
-    print("-----------------------------------------------------\n")
+    print_stream(stream_summary(core_skills, original_summary, latency))
+    print("-----------------------------------------------------")
+    print(f"⏱️ {latency}\n")
 
 
 
@@ -104,10 +107,11 @@ You are a senior copywriter specializing in transforming boring job duties into
 
 --- Your Expertly Rewritten Bullet Points ---
 """
-history_prompt = PromptTemplate(
-    template=history_template_string,
-    input_variables=["original_history"]
-)
+
+def stream_history(original_history, latency=None):
+    """Yields the rewritten bullet points in chunks as the model generates them."""
+    prompt_text = history_template_string.format(original_history=original_history)
+    yield from stream_text(get_llm(), prompt_text, latency, stage="enhance_history")
 
 def task_2_enhance_history():
     """Runs the enhanced employment history task."""
@@ -121,16 +125,14 @@ def task_2_enhance_history():
 
 
     
-    # Use llm.invoke() directly
-    prompt_value = history_prompt.format_prompt(original_history=original_history)
-    response = llm.invoke(prompt_value.to_string())
-
-
+    # Stream the rewrite so the first bullet shows up as soon as Gemini sends it
+    latency = LatencyReport()
 
     print("\n--- ✅ REVISED EMPLOYMENT HISTORY BULLET POINTS ---")
     print("-----------------------------------------------------")
-    print(response.content.strip())
-    print("-----------------------------------------------------\n")
+    print_stream(stream_history(original_history, latency))
+    print("-----------------------------------------------------")
+    print(f"⏱️ {latency}\n")
 
 
 
@@ -155,10 +157,6 @@ You are an expert ATS (Applicant Tracking System) consultant. Your job is to sug
 
 --- Suggested Skills Taglines (Comma-separated list) ---
 """
-skills_prompt = PromptTemplate(
-    template=skills_template_string,
-    input_variables=["job_title"]
-)
 
 def task_3_suggest_skills():
     """Runs the suggested skills taglines task."""
@@ -171,8 +169,9 @@ def task_3_suggest_skills():
     print("\nAnalyzing keywords for ATS compatibility...")
     
     # Use llm.invoke() directly
-    prompt_value = skills_prompt.format_prompt(job_title=job_title)
-    response = llm.invoke(prompt_value.to_string())
+    prompt_text = skills_template_string.format(job_title=job_title)
+    with tracing.span("suggest_skills"):
+        response = get_llm().invoke(prompt_text)
 
     print("\n--- ✅ SUGGESTED CORE SKILLS TAGLINES (ATS Optimized) ---")
     print("---------------------------------------------------------")
@@ -185,6 +184,76 @@ def task_3_suggest_skills():
 
 
 
+# =========================================================================
+# === Whole-CV Enhancement (Non-Interactive API) ===
+# =========================================================================
+
+async def _enhance_section(section, prompt_text, semaphore):
+    """Runs one section prompt and returns (text, seconds)."""
+    async with semaphore:
+        started = time.perf_counter()
+        with tracing.span("enhance_section", section=section):
+            response = await get_llm().ainvoke(prompt_text)
+        return response.content.strip(), time.perf_counter() - started
+
+
+async def aenhance_cv(summary, core_skills, jobs, target_title, max_concurrency=8):
+    """
+    Enhances a whole CV at once: the summary, every job's bullet points and the
+    skills taglines are requested concurrently (at most `max_concurrency` in
+    flight), so a CV costs roughly one round-trip instead of one per section.
+
+    `jobs` is a list of bullet-point strings, one per job. Returns the rewritten
+    sections plus per-section and total latency in seconds. A section that
+    fails (after the scheduler's retries) comes back as None with its error
+    under "errors", so it does not discard the sections that succeeded.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    started = time.perf_counter()
+
+    prompts = [("summary", summary_template_string.format(core_skills=core_skills, original_summary=summary))]
+    prompts += [(f"job-{i}", history_template_string.format(original_history=job)) for i, job in enumerate(jobs, 1)]
+    prompts.append(("skills", skills_template_string.format(job_title=target_title)))
+
+    with tracing.span("enhance_cv", sections=len(prompts)):
+        results = await asyncio.gather(*[
+            _enhance_section(section, prompt, semaphore) for section, prompt in prompts
+        ], return_exceptions=True)
+    errors = {
+        section: str(result) for (section, _), result in zip(prompts, results) if isinstance(result, Exception)
+    }
+    # Cancellation and other BaseExceptions still propagate
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+    results = [(None, None) if isinstance(result, Exception) else result for result in results]
+    texts = [text for text, _ in results]
+    seconds = [elapsed for _, elapsed in results]
+
+    return {
+        "summary": texts[0],
+        "jobs": texts[1:-1],
+        "skills": texts[-1],
+        "latency": {
+            "summary": seconds[0],
+            "jobs": seconds[1:-1],
+            "skills": seconds[-1],
+            "total": time.perf_counter() - started,
+        },
+        "errors": errors,
+    }
+
+
+def enhance_cv(summary, core_skills, jobs, target_title, max_concurrency=8):
+    """Synchronous wrapper around `aenhance_cv`."""
+    return asyncio.run(aenhance_cv(summary, core_skills, jobs, target_title, max_concurrency))
+
+
+
+
+
+
+
 # =========================================================================
 # === Main Menu (Test Mode) ===
 # =========================================================================
@@ -219,5 +288,41 @@ def main_menu():
 
 
 
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Enhance CV sections with Gemini.")
+    parser.add_argument(
+        "--cv",
+        help="JSON file with summary, core_skills, jobs (list of bullet-point strings) and target_title; "
+             "enhances every section concurrently and prints JSON instead of opening the menu"
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum LLM calls in flight")
+    args = parser.parse_args(argv)
+
+    if args.cv:
+        with open(args.cv, encoding="utf-8") as f:
+            cv = json.load(f)
+        result = enhance_cv(
+            cv.get("summary", ""), cv.get("core_skills", ""), cv.get("jobs", []), cv.get("target_title", ""),
+            max_concurrency=args.concurrency
+        )
+        json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        for section, error in result["errors"].items():
+            print(f"❌ {section} failed: {error}", file=sys.stderr)
+        if result["errors"]:
+            sys.exit(1)
+        return
+
+    try:
+        get_llm()
+        print("LLM (Gemini) initialized successfully.")
+    except Exception as e:
+        print(f"Error initializing LLM. Make sure your Google/Gemini API key is set as GOOGLE_API_KEY in your .env file.")
+        print(f"Details: {e}")
+        return
+
+    main_menu()
+
+
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    main()
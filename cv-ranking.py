@@ -1,56 +1,54 @@
 import os
-from dotenv import load_dotenv
-from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage
-from langchain_community.document_loaders import PyPDFLoader, UnstructuredWordDocumentLoader
+import time
+import asyncio
+import argparse
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from page_loader import read_pages, read_budget
+from llm_clients import get_chat_model
+from prefilter import BM25Index, similarity_matrix
+from ranking_parser import parse_ranking, parse_batch_rankings
+from compaction import DEFAULT_TOKEN_BUDGET, compact_cv, estimate_tokens
+import tracing
+from scheduler import batch_priority
+from cv_artifacts import FRESH, STALE, RESULT_KEYS, ArtifactStore
+from result_store import RESULT_DB, ResultStore, job_digest, model_name
+from dedup import DedupIndex
 
 
 # ---------------------------
 # Load API Key
 # ---------------------------
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Only when run as a script; importing the tool leaves the environment alone and the key
+# itself is checked when the first Gemini client is built (see llm_clients.py)
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
-if not GEMINI_API_KEY:
-    raise ValueError("Please set GEMINI_API_KEY in your .env file.")
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+# Given by path so LangChain is only imported when a document is actually parsed (see text_cache.py)
+LOADERS = {
+    ".pdf": "langchain_community.document_loaders.pdf.PyPDFLoader",
+    ".docx": "langchain_community.document_loaders.word_document.UnstructuredWordDocumentLoader",
+}
 
 
 # ---------------------------
-# CV Ranking Function
+# Prompt Templates
 # ---------------------------
-def analyze_cv(cv_file_path, job_description):
-    # Load CV directly as a Document
-    if cv_file_path.endswith(".pdf"):
-        loader = PyPDFLoader(cv_file_path)
-    elif cv_file_path.endswith(".docx"):
-        loader = UnstructuredWordDocumentLoader(cv_file_path)
-    else:
-        raise ValueError("Only PDF and DOCX files are supported.")
-    
-    documents = loader.load()
-    cv_text = "\n".join([doc.page_content for doc in documents])
-
-    # Gemini LLM
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        google_api_key=GEMINI_API_KEY,
-        temperature=0.3
-    )
-
-    # Prompt Template
-    template = """
-You are an expert career consultant and recruiter with years of experience evaluating CVs. 
-Your task is to provide a personalized and in-depth analysis of the following CV based on the job description provided.
-
+# The instructions never change, so they are sent first as a system message: a stable prefix
+# the backend can cache. Whatever is shared across a run comes next (the job description when
+# ranking CVs, the CV when matching roles) and the part that varies per request goes last.
+RANKING_RUBRIC = """
 Please analyze the CV carefully and provide a detailed, thoughtful, and personalized response addressing the following aspects:
 
-1. **Relevance Score (0-100)**: 
-   - How well does this CV align with the requirements of the job description? 
+1. **Relevance Score (0-100)**:
+   - How well does this CV align with the requirements of the job description?
    - Rate the relevance of the candidate’s experience, skills, and achievements in relation to the job’s expectations.
 
 2. **Content Quality and Clarity**:
-   - **Clarity of Communication**: Is the CV easy to read and understand? Does it communicate the candidate’s qualifications and experiences clearly? 
+   - **Clarity of Communication**: Is the CV easy to read and understand? Does it communicate the candidate’s qualifications and experiences clearly?
    - **Focus on Achievements**: Does the CV effectively showcase accomplishments and measurable impact, rather than just listing job duties?
    - Provide personalized suggestions for improving the CV’s narrative.
 
@@ -74,90 +72,757 @@ Please analyze the CV carefully and provide a detailed, thoughtful, and personal
 
 9. **Final Recommendation**:
    - Based on the overall analysis, provide a final recommendation on how the CV can be further refined to improve the candidate's chances of getting hired for the specific job.
-  
-**CV Text:**
-{cv_text}
-
-**Job Description:**
-{job_description}
-
-Please present the results in the following format:
-
-**Score**: <number>/100  
-**Strengths**:  
-- <list of strengths>  
-**Weaknesses**:  
-- <list of weaknesses>  
-**Personalized Feedback**:  
-- <detailed feedback with specific suggestions, explanations, and actionable recommendations for improvement>
 """
 
-    # Prepare the prompt
-    prompt = PromptTemplate(
-        input_variables=["cv_text", "job_description"],
-        template=template
-    )
-    final_prompt = prompt.format(cv_text=cv_text, job_description=job_description)
-
-    # Invoke LLM
-    response = llm.invoke([HumanMessage(content=final_prompt)])
-    result_content = response.content.strip()
-
-    # Parsing the response into structured format (score, strengths, weaknesses, feedback)
-    def parse_response(response_text):
-        # Extracting the content using simple pattern matching or regex (could be more sophisticated)
-        score = None
-        strengths = []
-        weaknesses = []
-        feedback = []
-
-        # Score extraction
-        if "Score" in response_text:
-            score_line = response_text.split("Score")[1].split("\n")[0].strip()
-            score = score_line.split(":")[1].strip() if score_line else "N/A"
-
-        # Extracting strengths
-        if "Strengths" in response_text:
-            strengths_section = response_text.split("Strengths")[1].split("Weaknesses")[0].strip()
-            strengths = [s.strip() for s in strengths_section.split("\n") if s.strip()]
-
-        # Extracting weaknesses
-        if "Weaknesses" in response_text:
-            weaknesses_section = response_text.split("Weaknesses")[1].split("Personalized Feedback")[0].strip()
-            weaknesses = [w.strip() for w in weaknesses_section.split("\n") if w.strip()]
-
-        # Extracting personalized feedback
-        if "Personalized Feedback" in response_text:
-            feedback_section = response_text.split("Personalized Feedback")[1].split("Final Recommendation")[0].strip()
-            feedback = [f.strip() for f in feedback_section.split("\n") if f.strip()]
-
-        return {
-            "Score": score,
-            "Strengths": strengths[:5],  # Max 5 strengths
-            "Weaknesses": weaknesses[:5],  # Max 5 weaknesses
-            "Personalized Feedback": feedback[:5]  # Max 5 feedback points
-        }
-
-    # Parse the response content into structured format
-    result = parse_response(result_content)
-    
+RANKING_INSTRUCTIONS = """
+You are an expert career consultant and recruiter with years of experience evaluating CVs.
+Your task is to provide a personalized and in-depth analysis of the CV in the next message based on the job description provided with it.
+""" + RANKING_RUBRIC + """
+Respond with a single JSON object and nothing else, using exactly this schema:
+
+{
+  "score": <integer 0-100>,
+  "strengths": ["<strength>", ...],
+  "weaknesses": ["<weakness>", ...],
+  "feedback": ["<detailed feedback with specific suggestions, explanations, and actionable recommendations for improvement>", ...],
+  "final_recommendation": "<final recommendation>"
+}
+"""
+
+# Several CVs against one job description; each CV is tagged "[C1]", "[C2]", ...
+BATCH_RANKING_INSTRUCTIONS = """
+You are an expert career consultant and recruiter with years of experience evaluating CVs.
+The next message holds a job description followed by several candidates' CVs, each starting with a tag line such as [C1].
+Evaluate every CV separately against the job description; never compare candidates with each other.
+""" + RANKING_RUBRIC + """
+Respond with a single JSON object and nothing else, with one entry per candidate id, using exactly this schema:
+
+{
+  "results": [
+    {
+      "id": "<candidate id, e.g. C1>",
+      "score": <integer 0-100>,
+      "strengths": ["<strength>", ...],
+      "weaknesses": ["<weakness>", ...],
+      "feedback": ["<detailed feedback with specific suggestions, explanations, and actionable recommendations for improvement>", ...],
+      "final_recommendation": "<final recommendation>"
+    }
+  ]
+}
+"""
+
+RANKING_INPUT_TEMPLATE = "**Job Description:**\n{job_description}\n\n**CV Text:**\n{cv_text}\n"
+
+# One CV against several roles; each role is tagged "[R1]", "[R2]", ... in {job_descriptions}
+MULTI_JD_INSTRUCTIONS = """
+You are an expert career consultant and recruiter with years of experience evaluating CVs.
+A candidate wants to know which of several open roles fits them best. The next message holds their CV followed by the job descriptions, each starting with a tag line such as [R1]. Evaluate the CV separately against each job description.
+
+For each role, assess how well the candidate's experience, skills and achievements match its requirements, and give:
+- a relevance score (0-100)
+- the candidate's strongest qualities for that role
+- the gaps or missing requirements
+- concrete suggestions for tailoring the CV to that role
+- a short final recommendation
+
+Respond with a single JSON object and nothing else, with one entry per role id, using exactly this schema:
+
+{
+  "results": [
+    {
+      "id": "<role id, e.g. R1>",
+      "score": <integer 0-100>,
+      "strengths": ["<strength>", ...],
+      "weaknesses": ["<weakness>", ...],
+      "feedback": ["<suggestion>", ...],
+      "final_recommendation": "<final recommendation>"
+    }
+  ]
+}
+"""
+
+MULTI_JD_INPUT_TEMPLATE = "**CV Text:**\n{cv_text}\n\n**Job Descriptions:**\n{job_descriptions}"
+
+
+# Message classes are imported on first use: langchain_core is slow to import and a
+# plain import of this tool (or `--help`) should not pay for it
+def ranking_messages(cv_text, job_description):
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    return [
+        SystemMessage(content=RANKING_INSTRUCTIONS),
+        HumanMessage(content=RANKING_INPUT_TEMPLATE.format(cv_text=cv_text, job_description=job_description)),
+    ]
+
+
+def batch_ranking_messages(cv_texts, ids, job_description):
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    candidates = "\n".join(f"[{cv_id}]\n{cv_text.strip()}\n" for cv_id, cv_text in zip(ids, cv_texts))
+    return [
+        SystemMessage(content=BATCH_RANKING_INSTRUCTIONS),
+        HumanMessage(content=f"**Job Description:**\n{job_description}\n\n**CVs:**\n{candidates}"),
+    ]
+
+
+def multi_jd_messages(cv_text, roles_text):
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    return [
+        SystemMessage(content=MULTI_JD_INSTRUCTIONS),
+        HumanMessage(content=MULTI_JD_INPUT_TEMPLATE.format(cv_text=cv_text, job_descriptions=roles_text)),
+    ]
+
+
+def input_tokens(response, messages):
+    """Prompt tokens billed for a call: the model's usage report, or an estimate when it has none."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("input_tokens"):
+        return usage["input_tokens"]
+    return sum(estimate_tokens(str(message.content)) for message in messages)
+
+
+# Batched ranking packs CVs into one prompt until it reaches this size
+RANKING_BATCH_PROMPT_TOKENS = int(os.getenv("CAREERCRAFT_RANKING_BATCH_PROMPT_TOKENS", 16000))
+CVS_PER_PROMPT = int(os.getenv("CAREERCRAFT_CVS_PER_PROMPT", 1))
+
+# Multi-JD prompts are packed with roles until they reach this size
+MULTI_JD_PROMPT_TOKENS = int(os.getenv("CAREERCRAFT_MULTI_JD_PROMPT_TOKENS", 8000))
+MAX_JDS_PER_PROMPT = 5
+
+
+# ---------------------------
+# Gemini LLM
+# ---------------------------
+def get_llm():
+    # JSON mode keeps Gemini on the schema requested by the prompt
+    return get_chat_model(temperature=0.3, response_mime_type="application/json")
+
+
+# ---------------------------
+# CV Loading
+# ---------------------------
+def load_cv_pages(cv_file_path, max_tokens=None):
+    # Load CV pages lazily (stopping after `max_tokens`), reusing the shared text cache when this file was seen before
+    loader_cls = LOADERS.get(os.path.splitext(cv_file_path)[1].lower())
+    if loader_cls is None:
+        raise ValueError("Only PDF and DOCX files are supported.")
+
+    return read_pages(cv_file_path, loader_cls, max_tokens)
+
+
+def load_cv_text(cv_file_path):
+    return "\n".join(load_cv_pages(cv_file_path))
+
+
+# ---------------------------
+# Response Parsing
+# ---------------------------
+def parse_response(response_text):
+    # Structured JSON first, one-pass section extraction as fallback (see ranking_parser.py)
+    return parse_ranking(response_text)
+
+
+# ---------------------------
+# CV Ranking Function
+# ---------------------------
+def analyze_cv(cv_file_path, job_description, llm=None, token_budget=DEFAULT_TOKEN_BUDGET, store=None,
+               dedup=None):
+    if dedup is not None and store is None:
+        raise ValueError("dedup needs the ResultStore its results are looked up in")
+    with tracing.span("analyze_cv", file=os.path.basename(cv_file_path)):
+        # Drop boilerplate and trim to the token budget, keeping the sections the JD cares about
+        pages = load_cv_pages(cv_file_path, read_budget(token_budget))
+
+        # Gemini LLM (any LangChain chat model can be passed in, e.g. a fake one for tests)
+        llm = llm or get_llm()
+
+        # A re-upload of a CV already scored for this job reuses that result (see dedup.py)
+        if dedup is not None:
+            with tracing.span("dedup"):
+                result, _, _, match = find_stored_result(dedup, store, "\n".join(pages), job_description, llm)
+            if result is not None:
+                if not match.exact:
+                    store.add("\n".join(pages), job_description, model_name(llm), result,
+                              os.path.basename(cv_file_path))
+                    store.flush()
+                dedup.save(store)
+                return result
+
+        with tracing.span("compact_cv") as current:
+            compacted = compact_cv(pages, job_description, token_budget)
+            current.set(tokens_before=compacted.tokens_before, tokens_after=compacted.tokens_after)
+
+        # Prepare the prompt (fixed instructions first, see ranking_messages)
+        with tracing.span("format_prompt"):
+            messages = ranking_messages(compacted.text, job_description)
+
+        # Invoke LLM
+        with tracing.span("llm", prompt="ranking"):
+            response = llm.invoke(messages)
+        result_content = response.content.strip()
+
+        # Parse the response content into structured format
+        with tracing.span("parse_response") as current:
+            result = parse_response(result_content)
+            current.set(parse_mode=result["Parse Mode"])
+        result["CV Tokens Before"] = compacted.tokens_before
+        result["CV Tokens After"] = compacted.tokens_after
+        result["Prompt Tokens"] = input_tokens(response, messages)
+
+        # Keep the result for later views instead of re-running the LLM (see result_store.py)
+        if store is not None and result["Parse Mode"] != "unparsed":
+            store.add("\n".join(pages), job_description, model_name(llm), result, os.path.basename(cv_file_path))
+            store.flush()
+        if dedup is not None:
+            dedup.save(store)
+
     return result
 
 
 # ---------------------------
-# Example Run
+# Batch Ranking
 # ---------------------------
-if __name__ == "__main__":
-    cv_file = "Ankon-CV.pdf"  # or sample_cv.docx
-    job_description = """
-    We are looking for a Data Analyst with experience in SQL, Python, Excel, and Power BI.
-    Candidate should have strong analytical skills, experience with dashboards, and business communication skills.
+def collect_cv_files(paths):
+    """Expands directories into the supported CV files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
+def _timed_extract(cv_file_path, max_tokens=None):
+    # Runs inside the process pool, so it has to stay a top-level function
+    started = time.perf_counter()
+    pages = load_cv_pages(cv_file_path, max_tokens)
+    return pages, time.perf_counter() - started
+
+
+def _new_row(cv_file_path):
+    return {
+        "File": cv_file_path,
+        "Score": None,
+        "Strengths": [],
+        "Weaknesses": [],
+        "Personalized Feedback": [],
+        "Prefilter Score": None,
+        "Shortlisted": True,
+        "Error": None,
+        "Extract Seconds": 0.0,
+        "LLM Seconds": 0.0,
+        "CV Tokens Before": None,
+        "CV Tokens After": None,
+        "Prompt Tokens": None,
+        "Freshness": None,
+        "Relevance Shift": None,
+        "Duplicate Of": None,
+        "Similarity": None,
+    }
+
+
+async def _extract_one(row, pool, max_tokens=None):
+    loop = asyncio.get_running_loop()
+    try:
+        pages, row["Extract Seconds"] = await loop.run_in_executor(pool, _timed_extract, row["File"], max_tokens)
+        return pages
+    except Exception as e:
+        row["Error"] = f"{type(e).__name__}: {e}"
+        return None
+
+
+def _compact_row(row, pages, job_description, token_budget):
+    with tracing.span("compact_cv"):
+        compacted = compact_cv(pages, job_description, token_budget)
+    row["CV Tokens Before"] = compacted.tokens_before
+    row["CV Tokens After"] = compacted.tokens_after
+    return compacted.text
+
+
+async def _score_one(row, pages, job_description, llm, semaphore, token_budget, cv_text=None):
+    try:
+        with tracing.span("score_cv", file=os.path.basename(row["File"])):
+            if cv_text is None:
+                cv_text = _compact_row(row, pages, job_description, token_budget)
+
+            messages = ranking_messages(cv_text, job_description)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    with tracing.span("llm", prompt="ranking"):
+                        response = await llm.ainvoke(messages)
+                finally:
+                    row["LLM Seconds"] = time.perf_counter() - started
+
+            with tracing.span("parse_response"):
+                row.update(parse_response(response.content.strip()))
+            row["Prompt Tokens"] = input_tokens(response, messages)
+            row["Freshness"] = FRESH
+    except Exception as e:
+        row["Error"] = f"{type(e).__name__}: {e}"
+
+
+async def _score_cv_batch(rows, batch, cv_texts, job_description, llm, semaphore, token_budget):
+    """Scores the CVs at `batch` (row indices) in one prompt; CVs the model skips are retried alone."""
+    if len(batch) == 1:
+        i = batch[0]
+        await _score_one(rows[i], None, job_description, llm, semaphore, token_budget, cv_texts[i])
+        return
+
+    ids = [f"C{n}" for n in range(1, len(batch) + 1)]
+    messages = batch_ranking_messages([cv_texts[i] for i in batch], ids, job_description)
+    try:
+        async with semaphore:
+            started = time.perf_counter()
+            with tracing.span("llm", prompt="ranking_batch", cvs=len(batch)):
+                response = await llm.ainvoke(messages)
+            elapsed = time.perf_counter() - started
+        with tracing.span("parse_response"):
+            results = parse_batch_rankings(response.content.strip(), ids)
+    except Exception as e:
+        for i in batch:
+            rows[i]["Error"] = f"{type(e).__name__}: {e}"
+        return
+
+    # The shared prefix and job description are billed once, so each CV carries a share of them
+    per_cv = round(input_tokens(response, messages) / len(batch))
+    missing = []
+    for cv_id, i in zip(ids, batch):
+        rows[i]["LLM Seconds"] = elapsed
+        if cv_id in results:
+            rows[i].update(results[cv_id])
+            rows[i]["Prompt Tokens"] = per_cv
+            rows[i]["Freshness"] = FRESH
+        else:
+            missing.append(i)
+
+    await asyncio.gather(*[
+        _score_one(rows[i], None, job_description, llm, semaphore, token_budget, cv_texts[i]) for i in missing
+    ])
+
+
+# ---------------------------
+# Duplicate Uploads
+# ---------------------------
+def _stored_result(stored, match):
+    # A stored row (see result_store.py) in the shape parse_response returns, marked as reused
+    return {
+        "Score": stored["score"],
+        "Strengths": stored["strengths"],
+        "Weaknesses": stored["weaknesses"],
+        "Personalized Feedback": stored["feedback"],
+        "Final Recommendation": stored["final_recommendation"],
+        "Parse Mode": "stored",
+        "Duplicate Of": stored["cv_name"] or stored["cv_hash"][:12],
+        "Similarity": match.similarity,
+        # Identical text gets the identical score; a near duplicate's score may be slightly off
+        "Freshness": FRESH if match.exact else STALE,
+    }
+
+
+def find_stored_result(dedup, store, cv_text, job_description, llm):
+    """
+    A stored result for this CV text, or for a near duplicate of it, against the same job and model.
+
+    Returns (result, cv_hash, signature, match); result is None when the CV
+    has to be scored. The CV is added to `dedup` either way.
+    """
+    cv_hash, signature = dedup.fingerprint(cv_text)
+    match = dedup.match(cv_hash, signature)
+    dedup.add(cv_hash, signature)
+    if match is None:
+        return None, cv_hash, signature, None
+    stored = store.get(match.cv_hash, jd_hash=job_digest(job_description), model=model_name(llm))
+    return (None if stored is None else _stored_result(stored, match)), cv_hash, signature, match
+
+
+def _reuse_duplicates(rows, indices, extracted, job_description, llm, dedup, store):
+    """
+    Splits `indices` into the CVs that need an LLM score, {copy: original} for near
+    duplicates inside this batch, and the CVs whose stored result was reused.
+    """
+    to_score, copies, reused = [], {}, []
+    batch_hashes = {}
+    with tracing.span("dedup", cvs=len(indices)) as current:
+        for i in indices:
+            result, cv_hash, _, match = find_stored_result(
+                dedup, store, "\n".join(extracted[i]), job_description, llm
+            )
+            if result is not None:
+                rows[i].update(result)
+                reused.append(i)
+            elif match is not None and match.cv_hash in batch_hashes:
+                # Uploaded twice in this batch: score the first copy only
+                copies[i] = batch_hashes[match.cv_hash]
+                rows[i]["Similarity"] = match.similarity
+            else:
+                batch_hashes[cv_hash] = i
+                to_score.append(i)
+        current.set(reused=len(reused), copies=len(copies))
+    return to_score, copies, reused
+
+
+async def _fill_copies(rows, copies, extracted, job_description, llm, semaphore, token_budget):
+    """Copies each original's score to its in-batch duplicates; copies of failed CVs are scored themselves."""
+    retry = []
+    for i, original in copies.items():
+        if rows[original]["Error"] is None and rows[original]["Score"] is not None:
+            for key in RESULT_KEYS:
+                rows[i][key] = rows[original].get(key)
+            rows[i]["Duplicate Of"] = os.path.basename(rows[original]["File"])
+            rows[i]["Freshness"] = rows[original]["Freshness"]
+        else:
+            retry.append(i)
+    await asyncio.gather(*[
+        _score_one(rows[i], extracted[i], job_description, llm, semaphore, token_budget) for i in retry
+    ])
+
+
+def _store_row(store, row, pages, job_description, llm):
+    if store is not None and row["Error"] is None and row["Parse Mode"] != "unparsed":
+        store.add("\n".join(pages), job_description, model_name(llm), row, os.path.basename(row["File"]))
+
+
+async def _rank_one(row, job_description, llm, pool, semaphore, token_budget, store=None):
+    pages = await _extract_one(row, pool, read_budget(token_budget))
+    if pages is not None:
+        await _score_one(row, pages, job_description, llm, semaphore, token_budget)
+        _store_row(store, row, pages, job_description, llm)
+
+
+async def arank_cvs(cv_paths, job_description, llm=None, max_concurrency=8, max_workers=None,
+                    shortlist_size=None, min_prefilter_score=0.0, token_budget=DEFAULT_TOKEN_BUDGET, pool=None,
+                    artifacts=None, cvs_per_prompt=CVS_PER_PROMPT, prompt_tokens=RANKING_BATCH_PROMPT_TOKENS,
+                    store=None, dedup=None):
+    """
+    Scores many CVs against one job description and returns rows sorted by score.
+
+    Text extraction runs in a process pool while at most `max_concurrency` LLM
+    calls are in flight. Failures are reported per file in the "Error" column
+    instead of aborting the batch.
+
+    With `shortlist_size` set, every CV is first scored locally with BM25
+    (see prefilter.py) and only the best `shortlist_size` CVs scoring above
+    `min_prefilter_score` are sent to the LLM; the rest keep "Shortlisted": False.
+
+    Each CV is compacted to `token_budget` before prompting (see compaction.py);
+    the before/after token counts are reported per row.
+
+    Long-running callers (e.g. the HTTP service) can pass a shared executor as
+    `pool`; otherwise a process pool is created for this batch.
+
+    With an `ArtifactStore` as `artifacts`, CVs scored in an earlier run are
+    only sent to the LLM again when the (edited) job description affects them
+    (see cv_artifacts.py). Reused results are marked "stale" in the
+    "Freshness" column, or "fresh" when the job description is unchanged.
+
+    Every prompt starts with the same fixed instructions, followed by the job
+    description, so backends with prompt caching only process the CV part
+    anew. With `cvs_per_prompt` above 1, up to that many CVs are scored in a
+    single prompt of at most `prompt_tokens`, and the instructions and job
+    description are sent once per batch instead of once per CV. "Prompt
+    Tokens" reports each CV's share of the input tokens.
+
+    With a `ResultStore` as `store`, every new LLM score is persisted (in
+    batched writes) so dashboards can query it later without another call.
+
+    With a `DedupIndex` as `dedup` (loaded from that same `store`), a CV whose
+    text, or a near duplicate of it, was already scored for this job and
+    model reuses the stored result: "Duplicate Of" names the original and
+    "Similarity" its estimated similarity (see dedup.py). Near duplicates
+    uploaded together are scored once. New signatures are saved to `store`.
     """
+    if dedup is not None and store is None:
+        raise ValueError("dedup needs the ResultStore its results are looked up in")
+    llm = llm or get_llm()
+    rows = [_new_row(path) for path in collect_cv_files(cv_paths)]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Batch priority leaves part of the quota free for interactive requests (see scheduler.py)
+    with tracing.span("rank_cvs", cvs=len(rows), shortlist_size=shortlist_size), batch_priority():
+        with (nullcontext(pool) if pool is not None else ProcessPoolExecutor(max_workers=max_workers)) as pool:
+            if shortlist_size is None and artifacts is None and dedup is None and cvs_per_prompt <= 1:
+                await asyncio.gather(*[
+                    _rank_one(row, job_description, llm, pool, semaphore, token_budget, store) for row in rows
+                ])
+            else:
+                all_pages = await asyncio.gather(*[
+                    _extract_one(row, pool, read_budget(token_budget)) for row in rows
+                ])
+                extracted = {i: pages for i, pages in enumerate(all_pages) if pages is not None}
+
+                if shortlist_size is None:
+                    shortlisted = list(extracted)
+                elif extracted:
+                    texts = ["\n".join(pages) for pages in extracted.values()]
+                    index = BM25Index(texts, ids=list(extracted.keys()))
+                    for i, prefilter_score in zip(index.ids, index.score(job_description)):
+                        rows[i]["Prefilter Score"] = float(prefilter_score)
+                        rows[i]["Shortlisted"] = False
+                    shortlisted = [i for i, _ in index.top_k(job_description, k=shortlist_size,
+                                                              min_score=min_prefilter_score)]
+                else:
+                    shortlisted = []
+
+                for i in shortlisted:
+                    rows[i]["Shortlisted"] = True
+
+                to_score = shortlisted
+                if artifacts is not None:
+                    decisions = {i: artifacts.plan(extracted[i], job_description) for i in shortlisted}
+                    to_score = [i for i in shortlisted if decisions[i]["rescore"]]
+                    for i, decision in decisions.items():
+                        rows[i]["Relevance Shift"] = decision["shift"]
+                        if not decision["rescore"]:
+                            rows[i].update(decision["result"])
+                            rows[i]["Freshness"] = FRESH if decision["fresh"] else STALE
+
+                copies, reused = {}, []
+                if dedup is not None:
+                    to_score, copies, reused = _reuse_duplicates(
+                        rows, to_score, extracted, job_description, llm, dedup, store
+                    )
+
+                if cvs_per_prompt <= 1:
+                    await asyncio.gather(*[
+                        _score_one(rows[i], extracted[i], job_description, llm, semaphore, token_budget)
+                        for i in to_score
+                    ])
+                else:
+                    cv_texts = {i: _compact_row(rows[i], extracted[i], job_description, token_budget)
+                                for i in to_score}
+                    base_tokens = estimate_tokens(BATCH_RANKING_INSTRUCTIONS) + estimate_tokens(job_description)
+                    batches = pack_batches(
+                        [(i, cv_texts[i]) for i in to_score], base_tokens, prompt_tokens, cvs_per_prompt
+                    )
+                    await asyncio.gather(*[
+                        _score_cv_batch(rows, batch, cv_texts, job_description, llm, semaphore, token_budget)
+                        for batch in batches
+                    ])
+                if copies:
+                    await _fill_copies(rows, copies, extracted, job_description, llm, semaphore, token_budget)
+                if artifacts is not None:
+                    for i in to_score:
+                        # An unreadable reply scores 0 and must not be served again as a fresh result
+                        if rows[i]["Error"] is None and rows[i].get("Parse Mode") != "unparsed":
+                            artifacts.record(decisions[i], extracted[i], job_description, rows[i])
+                # Reused near duplicates are stored under their own text too, so the next upload matches exactly
+                for i in [*to_score, *copies, *(i for i in reused if rows[i]["Similarity"] < 1.0)]:
+                    _store_row(store, rows[i], extracted[i], job_description, llm)
+
+            if store is not None:
+                await asyncio.to_thread(store.flush)
+            if dedup is not None:
+                await asyncio.to_thread(dedup.save, store)
+
+    # Highest score first, then unscored CVs by prefilter score, failed files last
+    rows.sort(key=lambda row: (
+        row["Score"] is None,
+        -(row["Score"] or 0),
+        -(row["Prefilter Score"] or 0),
+    ))
+    return rows
+
+
+def rank_cvs(cv_paths, job_description, llm=None, max_concurrency=8, max_workers=None,
+             shortlist_size=None, min_prefilter_score=0.0, token_budget=DEFAULT_TOKEN_BUDGET, artifacts=None,
+             cvs_per_prompt=CVS_PER_PROMPT, prompt_tokens=RANKING_BATCH_PROMPT_TOKENS, store=None, dedup=None):
+    """Synchronous wrapper around `arank_cvs`."""
+    return asyncio.run(arank_cvs(
+        cv_paths, job_description, llm=llm,
+        max_concurrency=max_concurrency, max_workers=max_workers,
+        shortlist_size=shortlist_size, min_prefilter_score=min_prefilter_score,
+        token_budget=token_budget, artifacts=artifacts,
+        cvs_per_prompt=cvs_per_prompt, prompt_tokens=prompt_tokens, store=store, dedup=dedup
+    ))
 
-    result = analyze_cv(cv_file, job_description)
-    
+
+# ---------------------------
+# Multi-JD Matching
+# ---------------------------
+def load_job_descriptions(directory):
+    """Reads every .txt / .md file in `directory` as one job description, named after the file."""
+    job_descriptions = {}
+    for name in sorted(os.listdir(directory)):
+        role, extension = os.path.splitext(name)
+        if extension.lower() in (".txt", ".md"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                job_descriptions[role] = f.read()
+    return job_descriptions
+
+
+def pack_batches(items, base_tokens, prompt_tokens=MULTI_JD_PROMPT_TOKENS, max_per_prompt=MAX_JDS_PER_PROMPT):
+    """Groups (key, text) pairs, in order, into prompts that stay within `prompt_tokens`; returns lists of keys."""
+    batches = []
+    current = []
+    used = base_tokens
+    for key, text in items:
+        cost = estimate_tokens(text) + 10  # tag line and spacing
+        if current and (used + cost > prompt_tokens or len(current) >= max_per_prompt):
+            batches.append(current)
+            current = []
+            used = base_tokens
+        current.append(key)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _new_role_row(role, similarity):
+    return {
+        "Role": role,
+        "Similarity": similarity,
+        "Score": None,
+        "Strengths": [],
+        "Weaknesses": [],
+        "Personalized Feedback": [],
+        "Final Recommendation": "",
+        "Shortlisted": False,
+        "Batch": None,
+        "Error": None,
+        "LLM Seconds": 0.0,
+    }
+
+
+async def _score_job_batch(rows, batch, cv_text, job_descriptions, llm, semaphore):
+    ids = [f"R{i}" for i in range(1, len(batch) + 1)]
+    roles_text = "\n".join(
+        f"[{role_id}] {role}\n{job_descriptions[role].strip()}\n" for role_id, role in zip(ids, batch)
+    )
+    messages = multi_jd_messages(cv_text, roles_text)
+
+    try:
+        async with semaphore:
+            started = time.perf_counter()
+            with tracing.span("llm", prompt="multi_jd", roles=len(batch)):
+                response = await llm.ainvoke(messages)
+            elapsed = time.perf_counter() - started
+        results = parse_batch_rankings(response.content.strip(), ids)
+    except Exception as e:
+        for role in batch:
+            rows[role]["Error"] = f"{type(e).__name__}: {e}"
+        return
+
+    missing = []
+    for role_id, role in zip(ids, batch):
+        rows[role]["LLM Seconds"] = elapsed
+        if role_id in results:
+            rows[role].update(results[role_id])
+        else:
+            missing.append(role)
+
+    if len(batch) == 1:
+        for role in missing:
+            rows[role]["Error"] = "No result for this role in the model's response."
+    elif missing:
+        # Roles the model skipped get a prompt of their own
+        await asyncio.gather(*[
+            _score_job_batch(rows, [role], cv_text, job_descriptions, llm, semaphore) for role in missing
+        ])
+
+
+async def amatch_jobs(cv_file_path, job_descriptions, llm=None, top_n=5, max_concurrency=8,
+                      token_budget=DEFAULT_TOKEN_BUDGET, prompt_tokens=MULTI_JD_PROMPT_TOKENS,
+                      max_per_prompt=MAX_JDS_PER_PROMPT):
+    """
+    Ranks many roles for one CV ("which of these jobs fits me best?").
+
+    `job_descriptions` maps a role name to its description. The CV is
+    extracted and compacted once, every role is ranked locally by TF-IDF
+    cosine similarity to it (see prefilter.py), and only the `top_n` most
+    similar roles are scored by the LLM (all of them with `top_n=None`),
+    packed several to a prompt as far as `prompt_tokens` and `max_per_prompt` allow.
+
+    Returns one row per role: LLM-scored roles by score, then the rest by similarity.
+    """
+    if top_n is not None and top_n < 1:
+        raise ValueError("top_n must be at least 1 (or None to score every role).")
+    llm = llm or get_llm()
+    roles = list(job_descriptions)
+
+    with tracing.span("match_jobs", roles=len(roles), top_n=top_n):
+        pages = await asyncio.to_thread(load_cv_pages, cv_file_path, read_budget(token_budget))
+        if not roles:
+            return []
+
+        similarities = similarity_matrix(["\n".join(pages)], [job_descriptions[role] for role in roles])[0]
+        rows = {role: _new_role_row(role, float(similarity)) for role, similarity in zip(roles, similarities)}
+        shortlisted = sorted(roles, key=lambda role: -rows[role]["Similarity"])[:top_n]
+
+        # One compacted CV serves every prompt, focused on what the shortlisted roles ask for
+        focus = "\n".join(job_descriptions[role] for role in shortlisted)
+        compacted = compact_cv(pages, focus, token_budget)
+        base_tokens = estimate_tokens(MULTI_JD_INSTRUCTIONS) + compacted.tokens_after
+        batches = pack_batches(
+            [(role, job_descriptions[role]) for role in shortlisted], base_tokens, prompt_tokens, max_per_prompt
+        )
+        for number, batch in enumerate(batches, 1):
+            for role in batch:
+                rows[role]["Shortlisted"] = True
+                rows[role]["Batch"] = number
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        await asyncio.gather(*[
+            _score_job_batch(rows, batch, compacted.text, job_descriptions, llm, semaphore) for batch in batches
+        ])
+
+    return sorted(rows.values(), key=lambda row: (row["Score"] is None, -(row["Score"] or 0), -row["Similarity"]))
+
+
+def match_jobs(cv_file_path, job_descriptions, llm=None, top_n=5, max_concurrency=8,
+               token_budget=DEFAULT_TOKEN_BUDGET, prompt_tokens=MULTI_JD_PROMPT_TOKENS,
+               max_per_prompt=MAX_JDS_PER_PROMPT):
+    """Synchronous wrapper around `amatch_jobs`."""
+    return asyncio.run(amatch_jobs(
+        cv_file_path, job_descriptions, llm=llm, top_n=top_n, max_concurrency=max_concurrency,
+        token_budget=token_budget, prompt_tokens=prompt_tokens, max_per_prompt=max_per_prompt
+    ))
+
+
+def format_job_matches(rows):
+    lines = [f"{'Rank':<5} {'Score':>6} {'Match':>6} {'Batch':>6}  Role"]
+    for rank, row in enumerate(rows, 1):
+        score = "-" if row["Score"] is None else str(row["Score"])
+        batch = "-" if row["Batch"] is None else str(row["Batch"])
+        line = f"{rank:<5} {score:>6} {row['Similarity']:>6.2f} {batch:>6}  {row['Role']}"
+        if row["Error"]:
+            line += f"  [error: {row['Error']}]"
+        elif row["Final Recommendation"]:
+            line += f"  - {row['Final Recommendation']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_ranking_table(rows):
+    lines = [f"{'Rank':<5} {'Score':>6} {'BM25':>7} {'Tokens':>7}  {'Extract':>8} {'LLM':>8}  File"]
+    for rank, row in enumerate(rows, 1):
+        score = "-" if row["Score"] is None else str(row["Score"])
+        bm25 = "-" if row["Prefilter Score"] is None else f"{row['Prefilter Score']:.2f}"
+        tokens = "-" if row["CV Tokens After"] is None else str(row["CV Tokens After"])
+        line = (
+            f"{rank:<5} {score:>6} {bm25:>7} {tokens:>7}  "
+            f"{row['Extract Seconds']:>7.2f}s {row['LLM Seconds']:>7.2f}s  {row['File']}"
+        )
+        if row["Error"]:
+            line += f"  [error: {row['Error']}]"
+        elif not row["Shortlisted"]:
+            line += "  [not shortlisted]"
+        elif row["Duplicate Of"]:
+            line += f"  [reused score of {row['Duplicate Of']}, similarity {row['Similarity']:.2f}]"
+        elif row["Freshness"] == STALE:
+            line += f"  [stale, relevance shift {row['Relevance Shift']:+.2f}]"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def print_result(result):
     # Output the formatted result
-    print(f"Score: {result['Score']}")
+    print(f"Score: {result['Score']}/100")
     print("Strengths:")
     for strength in result['Strengths']:
         print(f"- {strength}")
@@ -167,3 +832,105 @@ if __name__ == "__main__":
     print("Personalized Feedback:")
     for feedback_point in result['Personalized Feedback']:
         print(f"- {feedback_point}")
+    if result.get('Final Recommendation'):
+        print(f"Final Recommendation: {result['Final Recommendation']}")
+    if result.get('CV Tokens Before'):
+        print(f"CV tokens: {result['CV Tokens Before']} -> {result['CV Tokens After']}")
+
+
+# ---------------------------
+# Example Run
+# ---------------------------
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Rank CVs against a job description.")
+    parser.add_argument("paths", nargs="*", help="CV files or directories containing PDF/DOCX CVs")
+    parser.add_argument("--jd-file", help="File containing the job description")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum LLM calls in flight")
+    parser.add_argument("--workers", type=int, default=None, help="Text extraction processes")
+    parser.add_argument("--shortlist", type=positive_int, default=None, help="Only send the top K CVs by BM25 to the LLM")
+    parser.add_argument("--min-prefilter-score", type=float, default=0.0, help="BM25 cutoff for the shortlist")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help="Trim each CV to this many tokens before prompting (0 = no trimming)")
+    parser.add_argument("--jobs", help="Directory of job descriptions (.txt/.md): rank the roles for one CV")
+    parser.add_argument("--top-jobs", type=int, default=5, help="Roles sent to the LLM in --jobs mode")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse earlier scores for CVs the (edited) job description does not affect")
+    parser.add_argument("--rerank-threshold", type=float, default=None,
+                        help="Relevance shift that forces a re-score in --incremental mode")
+    parser.add_argument("--store", nargs="?", const=RESULT_DB, default=None, metavar="DB",
+                        help="Save the results to a SQLite result store (query it with result_store.py)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Reuse stored results for re-uploaded and near-duplicate CVs (uses --store)")
+    parser.add_argument("--cvs-per-prompt", type=int, default=CVS_PER_PROMPT,
+                        help="Score up to this many CVs in one prompt (shares the instructions and job description)")
+    args = parser.parse_args(argv)
+    if args.top_jobs < 1:
+        parser.error("--top-jobs must be at least 1")
+
+    job_description = """
+    We are looking for a Data Analyst with experience in SQL, Python, Excel, and Power BI.
+    Candidate should have strong analytical skills, experience with dashboards, and business communication skills.
+    """
+    if args.jd_file:
+        with open(args.jd_file, encoding="utf-8") as f:
+            job_description = f.read()
+    token_budget = args.token_budget or None
+    if args.dedup and not args.store:
+        args.store = RESULT_DB
+    store = ResultStore(args.store) if args.store else None
+    dedup = DedupIndex.load(store) if args.dedup else None
+
+    if args.jobs:
+        cv_file = args.paths[0] if args.paths else "Ankon-CV.pdf"
+        started = time.perf_counter()
+        rows = match_jobs(cv_file, load_job_descriptions(args.jobs), top_n=args.top_jobs, token_budget=token_budget)
+        print(format_job_matches(rows))
+        prompts = len({row["Batch"] for row in rows if row["Batch"] is not None})
+        print(f"\nMatched {len(rows)} roles with {prompts} LLM prompts in {time.perf_counter() - started:.1f}s")
+    elif not args.paths:
+        cv_file = "Ankon-CV.pdf"  # or sample_cv.docx
+        result = analyze_cv(cv_file, job_description, token_budget=token_budget, store=store, dedup=dedup)
+        if result.get("Duplicate Of"):
+            print(f"♻️ Reused the score of {result['Duplicate Of']} (similarity {result['Similarity']:.2f})")
+        print_result(result)
+    else:
+        artifacts = None
+        if args.incremental:
+            artifacts = ArtifactStore()
+            if args.rerank_threshold is not None:
+                artifacts.threshold = args.rerank_threshold
+
+        started = time.perf_counter()
+        rows = rank_cvs(
+            args.paths, job_description, max_concurrency=args.concurrency, max_workers=args.workers,
+            shortlist_size=args.shortlist, min_prefilter_score=args.min_prefilter_score,
+            token_budget=token_budget, artifacts=artifacts, cvs_per_prompt=args.cvs_per_prompt,
+            store=store, dedup=dedup
+        )
+        print(format_ranking_table(rows))
+        print(f"\nRanked {len(rows)} CVs in {time.perf_counter() - started:.1f}s")
+        if artifacts is not None:
+            reused = sum(row["Freshness"] is not None and not row["LLM Seconds"] for row in rows)
+            print(f"Reused {reused} earlier scores")
+        if dedup is not None:
+            duplicates = sum(row["Duplicate Of"] is not None for row in rows)
+            print(f"Reused {duplicates} scores of duplicate CVs")
+
+        before = sum(row["CV Tokens Before"] or 0 for row in rows)
+        after = sum(row["CV Tokens After"] or 0 for row in rows)
+        if before:
+            print(f"CV tokens sent: {after} of {before} extracted ({1 - after / before:.0%} saved)")
+        prompt_tokens = [row["Prompt Tokens"] for row in rows if row["Prompt Tokens"]]
+        if prompt_tokens:
+            print(f"Input tokens per scored CV: {sum(prompt_tokens) / len(prompt_tokens):.0f}")
+
+
+if __name__ == "__main__":
+    main()
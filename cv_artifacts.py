@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from collections import Counter
+from prefilter import tokenize
+from compaction import clean_lines, split_sections
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+ARTIFACT_DIR = os.getenv(
+    "CAREERCRAFT_ARTIFACT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "careercraft", "artifacts")
+)
+# A CV is re-scored once its local JD relevance moves by more than this (0-1 scale)
+RELEVANCE_THRESHOLD = float(os.getenv("CAREERCRAFT_RERANK_THRESHOLD", 0.05))
+# An earlier job's score is only carried over when at most this share of the JD's terms changed
+MAX_JD_CHANGE = float(os.getenv("CAREERCRAFT_RERANK_MAX_JD_CHANGE", 0.3))
+# Scores kept per CV, one per job description; the least recently scored are dropped
+MAX_JOBS_PER_CV = 20
+
+# Bump when the stored format or the keyword extraction changes
+ARTIFACT_FORMAT_VERSION = 2
+
+FRESH = "fresh"
+STALE = "stale"
+RESULT_KEYS = ("Score", "Strengths", "Weaknesses", "Personalized Feedback", "Final Recommendation", "Parse Mode")
+
+
+# ---------------------------
+# Keyword Vectors
+# ---------------------------
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def section_vectors(pages):
+    """Term counts per CV section ({heading: {term: count}}), using the compaction section split."""
+    vectors = {}
+    for heading, lines in split_sections(clean_lines(pages)):
+        # The heading line itself ("Skills") says nothing about the candidate
+        body = lines if heading == "header" else lines[1:]
+        counts = Counter(tokenize(" ".join(body)))
+        if heading in vectors:
+            counts.update(vectors[heading])
+        vectors[heading] = dict(counts)
+    return vectors
+
+
+def relevance(cv_terms, jd_terms):
+    """Share of the JD's keyword mass that the CV mentions at all (0-1)."""
+    total = sum(jd_terms.values())
+    if not total:
+        return 0.0
+    return sum(count for term, count in jd_terms.items() if term in cv_terms) / total
+
+
+def changed_terms(old_jd_terms, new_jd_terms):
+    """Terms added to, removed from or re-weighted in the job description."""
+    return {
+        term for term in old_jd_terms.keys() | new_jd_terms.keys()
+        if old_jd_terms.get(term) != new_jd_terms.get(term)
+    }
+
+
+def is_reusable(result):
+    # An unreadable reply scores 0 and must never be served again
+    return result is not None and result.get("Parse Mode") != "unparsed"
+
+
+# ---------------------------
+# Artifact Store
+# ---------------------------
+class ArtifactStore:
+    """
+    Per-CV artifacts kept between ranking runs, keyed by the extracted text.
+
+    Each artifact holds the CV text, its section keyword vectors and, under
+    "jobs", one structured result per job description it was scored against
+    (keyed by the JD digest). Switching between jobs reuses each job's own
+    score, and an edited JD only needs the CVs it actually affects re-scored.
+    """
+
+    def __init__(self, directory=ARTIFACT_DIR, threshold=RELEVANCE_THRESHOLD, max_jd_change=MAX_JD_CHANGE):
+        self.directory = directory
+        self.threshold = threshold
+        self.max_jd_change = max_jd_change
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if artifact.get("format") != ARTIFACT_FORMAT_VERSION:
+            return None
+        return artifact
+
+    def put(self, key, artifact):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"format": ARTIFACT_FORMAT_VERSION, **artifact}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def plan(self, pages, job_description):
+        """
+        Decides whether a CV needs a new LLM score for `job_description`.
+
+        Returns a dict with "key", "rescore", "reason", "relevance", "shift"
+        and, when a previous score can be reused, "result". A score for this
+        exact JD is always reused. Otherwise the earlier JD closest to this one
+        is the base, and the CV is re-scored when there is none, when more than
+        `max_jd_change` of the JD's terms changed (a different job rather than
+        an edit), when a changed term appears in one of its sections, or when
+        its keyword relevance moved by more than `threshold`.
+        """
+        text = "\n".join(pages)
+        key = text_digest(text)
+        artifact = self.get(key)
+        jd_terms = Counter(tokenize(job_description))
+
+        if artifact is None:
+            sections = section_vectors(pages)
+            cv_terms = set().union(*sections.values()) if sections else set()
+            return {"key": key, "rescore": True, "reason": "new", "sections": sections,
+                    "relevance": relevance(cv_terms, jd_terms), "shift": None}
+
+        sections = artifact["sections"]
+        cv_terms = set().union(*sections.values()) if sections else set()
+        current = relevance(cv_terms, jd_terms)
+        decision = {"key": key, "sections": sections, "relevance": current}
+
+        jobs = {digest: job for digest, job in artifact["jobs"].items() if is_reusable(job["result"])}
+        if not jobs:
+            return {**decision, "rescore": True, "reason": "unscored", "shift": None}
+        same = jobs.get(text_digest(job_description))
+        if same is not None:
+            return {**decision, "rescore": False, "reason": "same job description",
+                    "shift": 0.0, "result": same["result"], "fresh": True}
+
+        base = min(jobs.values(), key=lambda job: len(changed_terms(job["jd_terms"], jd_terms)))
+        changed = changed_terms(base["jd_terms"], jd_terms)
+        if len(changed) > self.max_jd_change * len(base["jd_terms"].keys() | jd_terms.keys()):
+            return {**decision, "rescore": True, "reason": "different job description", "shift": None}
+
+        shift = current - base["relevance"]
+        affected = sorted(heading for heading, terms in sections.items() if changed.intersection(terms))
+        if affected:
+            return {**decision, "rescore": True, "reason": f"affected sections: {', '.join(affected)}",
+                    "shift": shift}
+        if abs(shift) > self.threshold:
+            return {**decision, "rescore": True, "reason": f"relevance shift {shift:+.2f}", "shift": shift}
+        return {**decision, "rescore": False, "reason": "unaffected", "shift": shift,
+                "result": base["result"], "fresh": False}
+
+    def record(self, decision, pages, job_description, result):
+        """Stores the new score for the CV planned by `decision`, next to its scores for other jobs."""
+        artifact = self.get(decision["key"]) or {"text": "\n".join(pages), "sections": decision["sections"], "jobs": {}}
+        jobs = artifact["jobs"]
+        jobs[text_digest(job_description)] = {
+            "jd_terms": dict(Counter(tokenize(job_description))),
+            "relevance": decision["relevance"],
+            "result": {key: result.get(key) for key in RESULT_KEYS},
+            "scored_at": time.time(),
+        }
+        for digest in sorted(jobs, key=lambda digest: jobs[digest]["scored_at"])[:-MAX_JOBS_PER_CV]:
+            del jobs[digest]
+        self.put(decision["key"], artifact)
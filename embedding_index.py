@@ -0,0 +1,362 @@
+import os
+import json
+import mmap
+import zlib
+import argparse
+import tempfile
+import numpy as np
+from prefilter import tokenize
+from compaction import clean_lines, split_sections, estimate_tokens
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+INDEX_DIR = os.getenv(
+    "CAREERCRAFT_EMBEDDING_INDEX",
+    os.path.join(os.path.expanduser("~"), ".cache", "careercraft", "embeddings")
+)
+INDEX_FORMAT_VERSION = 1
+CHUNK_TOKENS = 256
+SEARCH_BLOCK_ROWS = 65_536  # rows scored per step, so search memory stays flat however big the index gets
+INITIAL_CAPACITY = 1024
+
+
+# ---------------------------
+# Chunking
+# ---------------------------
+def chunk_cv(pages, max_tokens=CHUNK_TOKENS):
+    """Splits a CV into (section, text) chunks of at most roughly `max_tokens` tokens each."""
+    chunks = []
+    for heading, lines in split_sections(clean_lines(pages)):
+        current = []
+        used = 0
+        for line in lines:
+            cost = estimate_tokens(line)
+            if current and used + cost > max_tokens:
+                chunks.append((heading, "\n".join(current)))
+                current = []
+                used = 0
+            current.append(line)
+            used += cost
+        if current:
+            chunks.append((heading, "\n".join(current)))
+    return chunks
+
+
+# ---------------------------
+# Embedders
+# ---------------------------
+class HashingEmbedder:
+    """
+    Offline embedder: hashed unigrams and bigrams with sublinear weights.
+
+    Uses crc32 so vectors are stable across processes and runs. No semantic
+    knowledge, but good enough for keyword-style search and for tests.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features),
+                                 dtype=np.uint32, count=len(features))
+            # Low bits pick the bucket, the top bit the sign, so collisions tend to cancel out
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+            vectors[row] = np.bincount(hashes % self.dim, weights=signs, minlength=self.dim)
+
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model; needs `pip install sentence-transformers`."""
+
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        # Imported here so the index works without the (large) optional dependency
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts):
+        vectors = self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+def get_embedder(name=None):
+    """
+    Builds an embedder from a name such as "hashing-384" or
+    "sentence-transformers:all-MiniLM-L6-v2" (default: CAREERCRAFT_EMBEDDER or hashing).
+    Any object with `name`, `dim` and `embed(texts) -> float32 array` can be used instead.
+    """
+    name = name or os.getenv("CAREERCRAFT_EMBEDDER", "hashing-384")
+    if name.startswith("hashing"):
+        _, _, dim = name.partition("-")
+        return HashingEmbedder(int(dim or 384))
+    if name.startswith("sentence-transformers"):
+        _, _, model_name = name.partition(":")
+        return SentenceTransformerEmbedder(model_name or "all-MiniLM-L6-v2")
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+# ---------------------------
+# Memory-Mapped Index
+# ---------------------------
+class EmbeddingIndex:
+    """
+    Section-chunk embeddings of a CV corpus on disk.
+
+    Layout of the index directory:
+      index.json   format version, embedder, dimension, row count, section names
+      vectors.f32  float32 memmap, one L2-normalized row per chunk
+      rows.i32     int32 memmap of (cv number, section number) per row; cv -1 marks a replaced CV
+      cv_ids.txt   CV ids, one per line; the line number is the cv number
+
+    Only the id map is held in memory. Searches stream over the vectors in
+    blocks of `SEARCH_BLOCK_ROWS`, so the index can grow past available RAM.
+    """
+
+    def __init__(self, directory=INDEX_DIR, embedder=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        meta = self._read_meta()
+
+        if meta is None:
+            self.embedder = embedder or get_embedder()
+            self.dim = self.embedder.dim
+            self.count = 0
+            self.capacity = 0
+            self.sections = []
+            self.cv_ids = []
+        else:
+            if meta["format"] != INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported embedding index format in {directory}: {meta['format']}")
+            self.embedder = embedder or get_embedder(meta["embedder"])
+            if self.embedder.name != meta["embedder"]:
+                raise ValueError(f"Index was built with {meta['embedder']}, not {self.embedder.name}.")
+            self.dim = meta["dim"]
+            self.count = meta["count"]
+            self.capacity = meta["capacity"]
+            self.sections = meta["sections"]
+            with open(self._path("cv_ids.txt"), encoding="utf-8") as f:
+                self.cv_ids = f.read().splitlines()
+
+        self.cv_numbers = {cv_id: number for number, cv_id in enumerate(self.cv_ids)}
+        self.section_numbers = {section: number for number, section in enumerate(self.sections)}
+        self.vectors = None
+        self.rows = None
+        if self.capacity:
+            self._open()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._path("index.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self):
+        meta = {
+            "format": INDEX_FORMAT_VERSION, "embedder": self.embedder.name, "dim": self.dim,
+            "count": self.count, "capacity": self.capacity, "sections": self.sections,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path("index.json"))
+
+    def _open(self):
+        self.vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+",
+                                 shape=(self.capacity, self.dim))
+        self.rows = np.memmap(self._path("rows.i32"), dtype=np.int32, mode="r+", shape=(self.capacity, 2))
+
+    def _grow(self, needed):
+        # Doubling keeps appends amortized O(1); the files are extended in place, not copied
+        capacity = max(INITIAL_CAPACITY, self.capacity * 2, needed)
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.rows.flush()
+            self.vectors = self.rows = None
+        for name, row_bytes in (("vectors.f32", self.dim * 4), ("rows.i32", 8)):
+            with open(self._path(name), "ab") as f:
+                f.truncate(capacity * row_bytes)
+        self.capacity = capacity
+        self._open()
+
+    def __len__(self):
+        return len(self.cv_numbers)
+
+    def add(self, cv_id, pages):
+        """Chunks, embeds and appends one CV; a CV already in the index is replaced."""
+        return self.add_many([(cv_id, pages)])
+
+    def add_many(self, items):
+        """Adds (cv_id, pages) pairs in one batch; returns the number of chunks written."""
+        chunk_rows = []
+        texts = []
+        new_ids = []
+        for cv_id, pages in items:
+            if cv_id in self.cv_numbers:
+                replaced = self.cv_numbers[cv_id]
+                # No rows exist yet when every CV so far had no chunks
+                if self.count:
+                    live = self.rows[:self.count, 0] == replaced
+                    self.rows[:self.count, 0][live] = -1
+                # A CV listed twice in this batch keeps only its last chunks
+                kept = [i for i, (cv, _) in enumerate(chunk_rows) if cv != replaced]
+                chunk_rows = [chunk_rows[i] for i in kept]
+                texts = [texts[i] for i in kept]
+            number = len(self.cv_ids) + len(new_ids)
+            new_ids.append(cv_id)
+            self.cv_numbers[cv_id] = number
+            for section, text in chunk_cv(pages):
+                if section not in self.section_numbers:
+                    self.section_numbers[section] = len(self.sections)
+                    self.sections.append(section)
+                chunk_rows.append((number, self.section_numbers[section]))
+                texts.append(text)
+
+        if texts:
+            vectors = self.embedder.embed(texts)
+            if self.count + len(texts) > self.capacity:
+                self._grow(self.count + len(texts))
+            self.vectors[self.count:self.count + len(texts)] = vectors
+            self.rows[self.count:self.count + len(texts)] = np.asarray(chunk_rows, dtype=np.int32)
+            self.count += len(texts)
+            self.vectors.flush()
+            self.rows.flush()
+            self._release(self.count - len(texts), self.count)
+
+        with open(self._path("cv_ids.txt"), "a", encoding="utf-8") as f:
+            f.writelines(f"{cv_id}\n" for cv_id in new_ids)
+        self.cv_ids.extend(new_ids)
+        self._write_meta()
+        return len(texts)
+
+    def _release(self, start, end):
+        """Drops scanned rows from this process's resident set; the OS page cache still keeps them."""
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        for array, row_bytes in ((self.vectors, self.dim * 4), (self.rows, 8)):
+            buffer = getattr(array, "_mmap", None)
+            if buffer is None:
+                continue
+            first = start * row_bytes // mmap.PAGESIZE * mmap.PAGESIZE
+            last = end * row_bytes // mmap.PAGESIZE * mmap.PAGESIZE
+            if last > first:
+                buffer.madvise(mmap.MADV_DONTNEED, first, last - first)
+
+    def _best_per_cv(self, query):
+        """Best chunk score and its section for every CV, scanning the vectors block by block."""
+        best = np.full(len(self.cv_ids), -np.inf, dtype=np.float32)
+        best_section = np.full(len(self.cv_ids), -1, dtype=np.int32)
+        for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, self.count)
+            scores = np.asarray(self.vectors[start:end]) @ query
+            rows = np.asarray(self.rows[start:end])
+            live = rows[:, 0] >= 0
+            cvs, sections, scores = rows[live, 0], rows[live, 1], scores[live]
+
+            # Keep each CV's best chunk in this block, then merge with earlier blocks
+            order = np.lexsort((-scores, cvs))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = cvs[order][1:] != cvs[order][:-1]
+            top = order[first]
+            better = scores[top] > best[cvs[top]]
+            best[cvs[top][better]] = scores[top][better]
+            best_section[cvs[top][better]] = sections[top][better]
+            self._release(start, end)
+        return best, best_section
+
+    def search_vector(self, query, k=10, exclude=()):
+        """Top-k CVs by their best-matching chunk: [(cv_id, score, section)]."""
+        if not self.count:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        best, best_section = self._best_per_cv(query)
+        for cv_id in exclude:
+            if cv_id in self.cv_numbers:
+                best[self.cv_numbers[cv_id]] = -np.inf
+
+        candidates = np.flatnonzero(np.isfinite(best))
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(-best[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-best[candidates], kind="stable")]
+        return [(self.cv_ids[i], float(best[i]), self.sections[best_section[i]]) for i in candidates]
+
+    def search(self, text, k=10):
+        """CVs matching a free-text query such as "Power BI dashboards"."""
+        return self.search_vector(self.embedder.embed([text])[0], k)
+
+    def similar_to(self, cv_id, k=10):
+        """CVs most like an indexed one (its chunks averaged into one query vector)."""
+        number = self.cv_numbers.get(cv_id)
+        if number is None:
+            raise ValueError(f"CV {cv_id!r} is not in the index.")
+        total = np.zeros(self.dim, dtype=np.float32)
+        for start in range(0, self.count, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, self.count)
+            mine = np.asarray(self.rows[start:end, 0]) == number
+            if mine.any():
+                total += np.asarray(self.vectors[start:end])[mine].sum(axis=0)
+            self._release(start, end)
+        norm = np.linalg.norm(total)
+        if not norm:
+            return []
+        return self.search_vector(total / norm, k, exclude=(cv_id,))
+
+
+# ---------------------------
+# Command Line
+# ---------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query the local CV embedding index.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    add_parser = subcommands.add_parser("add", help="Index CV files (PDF/DOCX/TXT) or directories of them")
+    add_parser.add_argument("paths", nargs="+")
+    search_parser = subcommands.add_parser("search", help="Find CVs matching a text query")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-k", type=int, default=10)
+    similar_parser = subcommands.add_parser("similar", help="Find CVs like an indexed one")
+    similar_parser.add_argument("cv_id")
+    similar_parser.add_argument("-k", type=int, default=10)
+    subcommands.add_parser("stats")
+    parser.add_argument("--index", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    index = EmbeddingIndex(args.index)
+    if args.command == "add":
+        from tools import load_tool
+
+        cover_letter = load_tool("cover_letter")
+        files = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                             if name.lower().endswith((".pdf", ".docx", ".txt")))
+            else:
+                files.append(path)
+        chunks = index.add_many([(os.path.abspath(path), cover_letter.load_cv_pages(path)) for path in files])
+        print(f"Indexed {len(files)} CVs ({chunks} chunks)")
+    elif args.command in ("search", "similar"):
+        try:
+            results = index.search(args.query, args.k) if args.command == "search" else index.similar_to(args.cv_id, args.k)
+        except ValueError as e:
+            parser.error(str(e))
+        for rank, (cv_id, score, section) in enumerate(results, 1):
+            print(f"{rank:<4} {score:.3f}  [{section}]  {cv_id}")
+    print(json.dumps({"cvs": len(index), "chunks": index.count, "dim": index.dim, "embedder": index.embedder.name}))
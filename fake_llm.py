@@ -0,0 +1,171 @@
+import time
+import json
+import re
+import random
+import asyncio
+import hashlib
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from pydantic import PrivateAttr
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from llm_clients import set_chat_model_factory
+
+
+# ---------------------------
+# Canned Responses
+# ---------------------------
+def _digest(text):
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _ranking_response(prompt):
+    # Deterministic per prompt, so rankings are stable but not all equal
+    score = 40 + _digest(prompt) % 56
+    return json.dumps({
+        "score": score,
+        "strengths": ["Relevant SQL and Python experience", "Dashboards built for stakeholders"],
+        "weaknesses": ["Impact of projects is not quantified"],
+        "feedback": ["Add numbers to the main achievements.", "Move skills above education."],
+        "final_recommendation": "Good fit after minor edits.",
+    })
+
+
+# Batched prompts tag each item with a line like "[R1] Data Analyst" or "[C3]"
+BATCH_ITEM_PATTERN = re.compile(r"^\[([A-Z]+\d+)\]", re.MULTILINE)
+
+
+def _batch_ranking_response(prompt):
+    results = []
+    for item_id in dict.fromkeys(BATCH_ITEM_PATTERN.findall(prompt)):
+        result = json.loads(_ranking_response(f"{item_id}\n{prompt}"))
+        results.append({"id": item_id, **result})
+    return json.dumps({"results": results})
+
+
+def _questions_response(prompt):
+    blocks = []
+    for i in range(1, 16):
+        blocks.append(
+            f"Question: Sample question {i}?\n1. Option A\n2. Option B\n3. Option C\n4. Option D\nAnswer: {1 + i % 4}"
+        )
+    return "\n\n".join(blocks)
+
+
+def canned_response(prompt):
+    """Picks a plausible response for each of the tools' prompts."""
+    if "psychometric test questions" in prompt:
+        return _questions_response(prompt)
+    if '"results"' in prompt:
+        return _batch_ranking_response(prompt)
+    if '"score"' in prompt:
+        return _ranking_response(prompt)
+    if "cover letter" in prompt.lower():
+        return (
+            "Dear Hiring Manager,\n\nI am excited to apply for this role. My experience with data analysis, "
+            "SQL and dashboarding maps directly onto what your team needs.\n\nIn my recent projects I turned "
+            "raw data into decisions that stakeholders could act on.\n\nThank you for your time.\n\nSincerely,\nCandidate"
+        )
+    if "Skills Taglines" in prompt:
+        return "SQL, Python, Power BI, Data Visualization, Stakeholder Communication, Excel"
+    return "I turned raw data into clear, actionable insights that helped the team hit its targets."
+
+
+# ---------------------------
+# Fake Chat Model
+# ---------------------------
+class FakeRateLimitError(Exception):
+    """Shaped like the 429 that Gemini raises when the quota is used up."""
+
+    code = 429
+
+
+class FakeGeminiChat(BaseChatModel):
+    """
+    Local stand-in for ChatGoogleGenerativeAI with simulated latency.
+
+    Responses are deterministic for a given prompt; `responses` maps prompt
+    substrings to fixed replies that take precedence over the canned ones.
+    Streaming waits `latency` before the first chunk and then emits
+    `chunk_size` characters at a time.
+
+    With `error_rate` set, that share of calls fails immediately with a
+    `FakeRateLimitError` (seeded by `seed`, so runs are repeatable).
+    `calls` counts every call that reached the model.
+    """
+
+    model: str = "fake-gemini"
+    temperature: float = 0.0
+    latency: float = 0.0
+    chunk_size: int = 24
+    responses: dict = {}
+    error_rate: float = 0.0
+    seed: int = 0
+    calls: int = 0
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, context):
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self):
+        return "fake-gemini"
+
+    @property
+    def _identifying_params(self):
+        return {"model": self.model, "temperature": self.temperature, "latency": self.latency}
+
+    def _prompt(self, messages):
+        return "\n".join(str(message.content) for message in messages)
+
+    def _respond(self, messages):
+        self.calls += 1
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeRateLimitError("429 Resource has been exhausted (e.g. check quota).")
+        prompt = self._prompt(messages)
+        for needle, reply in self.responses.items():
+            if needle in prompt:
+                return prompt, reply
+        return prompt, canned_response(prompt)
+
+    @staticmethod
+    def _usage(prompt, text):
+        input_tokens = (len(prompt) + 3) // 4
+        output_tokens = (len(text) + 3) // 4
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _result(self, prompt, text):
+        message = AIMessage(content=text, usage_metadata=self._usage(prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt, text = self._respond(messages)
+        time.sleep(self.latency)
+        return self._result(prompt, text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt, text = self._respond(messages)
+        await asyncio.sleep(self.latency)
+        return self._result(prompt, text)
+
+    def _chunks(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text[start:start + self.chunk_size]))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        _, text = self._respond(messages)
+        time.sleep(self.latency)
+        yield from self._chunks(text)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        _, text = self._respond(messages)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(text):
+            yield chunk
+
+
+def install_fake_llm(latency=0.0, **kwargs):
+    """Routes every `get_chat_model` call to a `FakeGeminiChat`."""
+    def factory(model, temperature, **model_kwargs):
+        return FakeGeminiChat(model=model, temperature=temperature or 0.0, latency=latency, **kwargs)
+
+    set_chat_model_factory(factory)
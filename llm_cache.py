@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+import tracing
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+# The cache is opt-in: it is only enabled when CAREERCRAFT_LLM_CACHE points at a database file
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+# ---------------------------
+# SQLite Response Cache
+# ---------------------------
+class ResponseCache(BaseCache):
+    """
+    Persistent LangChain LLM cache with TTL and max-size eviction.
+
+    LangChain hands every lookup the rendered prompt plus an `llm_string` that
+    serializes the model name, temperature and other call parameters, so a hit
+    requires all of them to match. Least recently used rows are evicted once
+    the table grows past `max_entries`.
+    """
+
+    def __init__(self, database_path, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.database_path = database_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(database_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared across threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(prompt, llm_string):
+        return hashlib.sha256(f"{prompt}\x00{llm_string}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)).fetchone()
+
+        if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+            with conn:
+                conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            tracing.count("cache_misses")
+            return None
+        tracing.count("cache_hits")
+
+        with conn:
+            conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, prompt, llm_string, return_val):
+        key = self._key(prompt, llm_string)
+        value = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.max_entries:
+                conn.execute("""
+                    DELETE FROM llm_responses WHERE key IN (
+                        SELECT key FROM llm_responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+
+    def clear(self, **kwargs):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_configured_cache = None
+
+
+def configure_llm_cache(database_path=None, ttl_seconds=None, max_entries=None):
+    """
+    Installs a `ResponseCache` as LangChain's global LLM cache.
+
+    Without arguments the settings come from CAREERCRAFT_LLM_CACHE,
+    CAREERCRAFT_LLM_CACHE_TTL and CAREERCRAFT_LLM_CACHE_MAX_ENTRIES; when no
+    database path is configured nothing is installed and None is returned.
+    """
+    global _configured_cache
+
+    database_path = database_path or os.getenv("CAREERCRAFT_LLM_CACHE")
+    if not database_path:
+        return None
+    if ttl_seconds is None:
+        ttl_seconds = int(os.getenv("CAREERCRAFT_LLM_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    if max_entries is None:
+        max_entries = int(os.getenv("CAREERCRAFT_LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+    if _configured_cache is None or _configured_cache.database_path != database_path:
+        _configured_cache = ResponseCache(database_path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+        set_llm_cache(_configured_cache)
+    return _configured_cache
+
+
+def get_llm_cache():
+    """Returns the cache installed by `configure_llm_cache`, if any."""
+    return _configured_cache
@@ -0,0 +1,80 @@
+import os
+import threading
+import scheduler
+import tracing
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+_clients = {}
+_lock = threading.Lock()
+_factory = None
+
+
+def _gemini_factory(model, temperature, **kwargs):
+    # Imported here so that importing a tool never pays for the Gemini client stack
+    from dotenv import load_dotenv
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    load_dotenv()  # the tools no longer load .env on import, so library callers still find the key
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("Please set GOOGLE_API_KEY in your .env file.")
+
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    # Retries happen in the scheduler, which also knows about the shared quota
+    kwargs.setdefault("max_retries", 1)  # a single attempt
+    return ChatGoogleGenerativeAI(model=model, google_api_key=api_key, **kwargs)
+
+
+# ---------------------------
+# Shared Client Pool
+# ---------------------------
+def get_chat_model(model=DEFAULT_MODEL, temperature=None, **kwargs):
+    """
+    Returns the shared chat model for this model/temperature/options combination.
+
+    Clients are built on first use and then reused, so every caller shares the
+    same underlying gRPC channel instead of opening a new one per request.
+    Each client is wrapped in a `ScheduledChatModel`, so all calls share the
+    model's rate limits, retries and request coalescing (see scheduler.py).
+    """
+    key = (model, temperature, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # LangChain is imported here, on the first client, so importing a tool stays fast
+            from llm_cache import configure_llm_cache
+
+            configure_llm_cache()
+            client = (_factory or _gemini_factory)(model, temperature, **kwargs)
+            client = scheduler.ScheduledChatModel(inner=client, scheduler=scheduler.get_scheduler(model))
+            if tracing.enabled():
+                client.callbacks = [*(client.callbacks or []), tracing.TracingCallbackHandler()]
+            _clients[key] = client
+    return client
+
+
+def set_chat_model_factory(factory):
+    """
+    Replaces how clients are built, e.g. with a local fake model for tests and
+    benchmarks. `factory(model, temperature, **kwargs)` must return a LangChain
+    chat model; pass None to go back to Gemini. Existing clients are dropped.
+    """
+    global _factory
+    with _lock:
+        _factory = factory
+        _clients.clear()
+
+
+def reset_clients():
+    with _lock:
+        _clients.clear()
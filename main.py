@@ -0,0 +1,264 @@
+import os
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from tools import load_tool
+import tracing
+import scheduler
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+load_dotenv()
+
+MAX_IN_FLIGHT = int(os.getenv("CAREERCRAFT_MAX_IN_FLIGHT", 64))
+REQUEST_TIMEOUT = float(os.getenv("CAREERCRAFT_REQUEST_TIMEOUT", 120))
+PARSE_WORKERS = int(os.getenv("CAREERCRAFT_PARSE_WORKERS", os.cpu_count() or 2))
+LLM_CONCURRENCY = int(os.getenv("CAREERCRAFT_LLM_CONCURRENCY", 8))
+MAX_TEST_SESSIONS = int(os.getenv("CAREERCRAFT_MAX_TEST_SESSIONS", 10000))
+TEST_SESSION_TTL = float(os.getenv("CAREERCRAFT_TEST_SESSION_TTL", 3600))
+# Upper bound on questions per test; also caps what an empty bank would have generated live per request
+MAX_TEST_QUESTIONS = int(os.getenv("CAREERCRAFT_MAX_TEST_QUESTIONS", 40))
+
+# "fake" serves canned responses locally (see fake_llm.py) for load testing
+LLM_BACKEND = os.getenv("CAREERCRAFT_LLM_BACKEND", "gemini")
+FAKE_LATENCY = float(os.getenv("CAREERCRAFT_FAKE_LATENCY", 0.5))
+FAKE_ERROR_RATE = float(os.getenv("CAREERCRAFT_FAKE_ERROR_RATE", 0.0))
+
+if LLM_BACKEND == "fake":
+    from fake_llm import install_fake_llm
+    install_fake_llm(latency=FAKE_LATENCY, error_rate=FAKE_ERROR_RATE)
+
+cv_ranking = load_tool("cv_ranking")
+cover_letter = load_tool("cover_letter")
+cv_builder = load_tool("cv_builder")
+psycometric = load_tool("psycometric")
+
+
+# ---------------------------
+# App Lifecycle
+# ---------------------------
+@asynccontextmanager
+async def lifespan(app):
+    # PDF/DOCX parsing is CPU-bound, so it runs in worker processes off the event loop
+    app.state.parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    app.state.in_flight = 0
+    app.state.test_sessions = psycometric.SessionStore(MAX_TEST_SESSIONS, TEST_SESSION_TTL)
+    try:
+        yield
+    finally:
+        app.state.parse_pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="CareerCraft AI", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def backpressure_and_timeout(request: Request, call_next):
+    """Rejects requests beyond MAX_IN_FLIGHT with 503 and cuts off slow ones with 504."""
+    if request.url.path in ("/health", "/metrics"):
+        return await call_next(request)
+
+    if request.app.state.in_flight >= MAX_IN_FLIGHT:
+        return JSONResponse(
+            {"detail": "Server is busy, please retry shortly."},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+
+    request.app.state.in_flight += 1
+    try:
+        return await asyncio.wait_for(call_next(request), timeout=REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        return JSONResponse({"detail": f"Request timed out after {REQUEST_TIMEOUT:g}s."}, status_code=504)
+    finally:
+        request.app.state.in_flight -= 1
+
+
+async def _save_upload(upload: UploadFile, directory: str) -> str:
+    extension = os.path.splitext(upload.filename or "")[1].lower()
+    fd, path = tempfile.mkstemp(suffix=extension, dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        while chunk := await upload.read(1024 * 1024):
+            f.write(chunk)
+    return path
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "in_flight": app.state.in_flight, "llm_backend": LLM_BACKEND}
+
+
+@app.get("/metrics")
+async def metrics():
+    # Per-stage timings and token counts; only collected while CAREERCRAFT_TRACE is set
+    return {"tracing": tracing.enabled(), "stages": tracing.metrics(), "schedulers": scheduler.all_stats()}
+
+
+# ---------------------------
+# CV Ranking
+# ---------------------------
+@app.post("/rank")
+async def rank(
+    job_description: str = Form(...),
+    files: List[UploadFile] = File(...),
+    shortlist_size: Optional[int] = Form(None, ge=1),
+):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {}
+        for upload in files:
+            paths[await _save_upload(upload, directory)] = upload.filename
+
+        rows = await cv_ranking.arank_cvs(
+            list(paths), job_description,
+            max_concurrency=LLM_CONCURRENCY,
+            shortlist_size=shortlist_size,
+            pool=app.state.parse_pool,
+        )
+
+    for row in rows:
+        row["File"] = paths.get(row["File"], row["File"])
+    return {"results": rows}
+
+
+# ---------------------------
+# Cover Letter
+# ---------------------------
+@app.post("/cover-letter")
+async def cover_letter_endpoint(
+    job_description: str = Form(...),
+    file: UploadFile = File(...),
+    stream: bool = Form(False),
+):
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory() as directory:
+        path = await _save_upload(file, directory)
+        try:
+            pages = await loop.run_in_executor(app.state.parse_pool, cover_letter.load_cv_pages, path)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    cv_text = "\n".join(pages)
+    if stream:
+        return StreamingResponse(
+            cover_letter.astream_cover_letter(cv_text, job_description),
+            media_type="text/plain; charset=utf-8",
+        )
+
+    return {"cover_letter": await cover_letter.agenerate_cover_letter(cv_text, job_description)}
+
+
+# ---------------------------
+# CV Enhancement
+# ---------------------------
+class EnhanceRequest(BaseModel):
+    summary: str = ""
+    core_skills: str = ""
+    jobs: List[str] = []
+    target_title: str = ""
+
+
+@app.post("/enhance")
+async def enhance(body: EnhanceRequest):
+    return await cv_builder.aenhance_cv(
+        body.summary, body.core_skills, body.jobs, body.target_title, max_concurrency=LLM_CONCURRENCY
+    )
+
+
+# ---------------------------
+# Psychometric Test
+# ---------------------------
+class FeedbackRequest(BaseModel):
+    answers: dict  # question id -> chosen option (1-4)
+
+
+@app.get("/psychometric/questions")
+async def psychometric_questions(n: int = Query(15, ge=1, le=MAX_TEST_QUESTIONS)):
+    # Sampling is instant; the thread only matters when the bank is missing and questions are generated live
+    questions = await asyncio.to_thread(psycometric.load_questions, n)
+    # Answers stay on the server; clients submit ids back to /psychometric/feedback
+    return {"questions": [
+        {"id": question.get("id"), "question": question["question"], "options": question["options"]}
+        for question in questions
+    ]}
+
+
+@app.post("/psychometric/feedback")
+async def psychometric_feedback(body: FeedbackRequest):
+    bank = psycometric.get_question_bank()
+    questions = []
+    user_answers = []
+    for question_id, answer in body.answers.items():
+        question = bank.get(question_id)
+        if question is None:
+            raise HTTPException(status_code=400, detail=f"Unknown question id: {question_id}")
+        if answer not in (1, 2, 3, 4):
+            raise HTTPException(status_code=400, detail=f"Answer for {question_id} must be 1-4.")
+        questions.append(question)
+        user_answers.append(answer)
+
+    correct_count = sum(answer == question["answer"] for question, answer in zip(questions, user_answers))
+    wrong_count = len(questions) - correct_count
+    feedback = await psycometric.agenerate_feedback(questions, user_answers, correct_count, wrong_count)
+    return {"correct": correct_count, "wrong": wrong_count, "feedback": feedback}
+
+
+# Session API: one question at a time, scored as answers arrive
+class AnswerRequest(BaseModel):
+    answer: int
+
+
+def _test_session(session_id):
+    session = app.state.test_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired test session: {session_id}")
+    return session
+
+
+@app.post("/psychometric/sessions")
+async def start_test_session(n: int = Query(15, ge=1, le=MAX_TEST_QUESTIONS)):
+    session = app.state.test_sessions.add(await psycometric.TestSession.start(n))
+    return {"session_id": session.id, "question": session.current_question(), **session.results()}
+
+
+@app.post("/psychometric/sessions/{session_id}/answers")
+async def answer_test_question(session_id: str, body: AnswerRequest):
+    session = _test_session(session_id)
+    try:
+        correct = session.answer(body.answer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"is_correct": correct, "question": session.current_question(), **session.results()}
+
+
+@app.get("/psychometric/sessions/{session_id}/feedback")
+async def test_session_feedback(session_id: str):
+    session = _test_session(session_id)
+    try:
+        feedback = await session.generate_feedback()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**session.results(), "feedback": feedback}
+
+
+@app.post("/psychometric/sessions/{session_id}/next")
+async def next_test_session(session_id: str):
+    previous = _test_session(session_id)
+    session = app.state.test_sessions.add(await previous.next_session())
+    app.state.test_sessions.drop(session_id)
+    return {"session_id": session.id, "question": session.current_question(), **session.results()}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", 8000)))
@@ -0,0 +1,148 @@
+import os
+import re
+import time
+from compaction import estimate_tokens
+from text_cache import get_text_cache, loader_name, resolve_loader
+import tracing
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+# The tools read up to this many times the prompt's token budget, so compaction still has sections to choose from
+READ_BUDGET_FACTOR = int(os.getenv("CAREERCRAFT_READ_BUDGET_FACTOR", 3))
+
+SUBTYPE_PATTERN = re.compile(rb"/Subtype\s*/(\w+)")
+OBJECT_HEAD_BYTES = 512
+
+
+def read_budget(token_budget):
+    """Tokens worth reading from a document that will be compacted to `token_budget`."""
+    return token_budget * READ_BUDGET_FACTOR if token_budget else None
+
+
+# ---------------------------
+# Lazy PDF Pages
+# ---------------------------
+def _peek_subtype(reader, stream, reference):
+    """Reads an XObject's /Subtype from the start of its object in the file, without loading its data."""
+    offset = reader.xref.get(reference.generation, {}).get(reference.idnum)
+    if offset is None:
+        return None  # stored inside an object stream; unknown without decoding it
+    stream.seek(offset)
+    match = SUBTYPE_PATTERN.search(stream.read(OBJECT_HEAD_BYTES))
+    return match.group(1) if match else None
+
+
+def _is_image_only(reader, stream, page):
+    """
+    True for pages that can only paint images, such as scanned portfolio pages.
+
+    A page qualifies when it has no fonts of its own and every XObject it uses
+    is an image. Form XObjects may carry text, so those pages are extracted.
+    """
+    from pypdf.generic import IndirectObject
+
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if resources.get("/Font"):
+        return False
+    xobjects = resources.get("/XObject")
+    if not xobjects:
+        return False
+
+    for name in xobjects.get_object().keys():
+        reference = xobjects.get_object().raw_get(name)
+        if not isinstance(reference, IndirectObject):
+            return False
+        if _peek_subtype(reader, stream, reference) != b"Image":
+            return False
+    return True
+
+
+def iter_pdf_pages(file_path, skip_image_pages=True):
+    """
+    Yields the text of each PDF page in order, extracted the same way PyPDFLoader does.
+
+    Image-only pages yield "" without their image streams being read.
+    """
+    from pypdf import PdfReader
+
+    with open(file_path, "rb") as stream:
+        reader = PdfReader(stream)
+        for page in reader.pages:
+            if skip_image_pages and _is_image_only(reader, stream, page):
+                yield ""
+                continue
+            yield page.extract_text(extraction_mode="plain").strip()
+            # Drop parsed objects (content streams, fonts) so memory does not grow with the page count
+            reader.resolved_objects.clear()
+
+
+# ---------------------------
+# Budgeted, Cache-Aware Iteration
+# ---------------------------
+def iter_pages(file_path, loader_cls, max_tokens=None, cache=None, count_tokens=estimate_tokens,
+               skip_image_pages=True):
+    """
+    Yields non-empty page texts one at a time and stops once `max_tokens` have been yielded.
+
+    `loader_cls` is a LangChain loader class or its "module.ClassName" path.
+    PDFs meant for PyPDFLoader are read page by page with pypdf (see
+    `iter_pdf_pages`) without importing LangChain; other loaders are consumed
+    through their `lazy_load()`.
+    Pages are shared with `text_cache.load_pages`. A cached document is served
+    from the cache, and a document read to the end is stored there. A read cut
+    short by `max_tokens` is not cached.
+    """
+    started = time.perf_counter()
+    use_cache = cache is not False and os.getenv("CAREERCRAFT_TEXT_CACHE") != "0"
+    cached = None
+    if use_cache:
+        cache = cache or get_text_cache()
+        key = cache.key(file_path, loader_cls)
+        cached = cache.get(key)
+
+    if cached is not None:
+        source = iter(cached)
+    elif loader_name(loader_cls) == "PyPDFLoader":
+        source = iter_pdf_pages(file_path, skip_image_pages)
+    else:
+        source = (document.page_content for document in resolve_loader(loader_cls)(file_path).lazy_load())
+
+    collected = [] if use_cache and cached is None else None
+    pages = skipped = used = 0
+    stopped_early = False
+    try:
+        for text in source:
+            if collected is not None:
+                collected.append(text)
+            if not text:
+                skipped += 1
+                continue
+            pages += 1
+            yield text
+            used += count_tokens(text)
+            if max_tokens and used >= max_tokens:
+                stopped_early = True
+                return
+        if collected is not None:
+            cache.put(key, collected)
+    finally:
+        if hasattr(source, "close"):
+            source.close()
+        tracing.event(
+            "read_pages", time.perf_counter() - started, file=os.path.basename(file_path),
+            pages=pages, empty_pages=skipped, tokens=used, stopped_early=stopped_early,
+            text_cache_hit=cached is not None,
+        )
+
+
+def read_pages(file_path, loader_cls, max_tokens=None, cache=None):
+    """List version of `iter_pages`, timed as the "load_cv" stage."""
+    with tracing.span("load_cv", file=os.path.basename(file_path), loader=loader_name(loader_cls)) as current:
+        pages = list(iter_pages(file_path, loader_cls, max_tokens=max_tokens, cache=cache))
+        current.set(pages=len(pages))
+    return pages
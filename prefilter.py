@@ -0,0 +1,154 @@
+import re
+import numpy as np
+
+
+# ---------------------------
+# Tokenization
+# ---------------------------
+# Keeps tokens such as "c++", "c#", "node.js" and "power" / "bi" intact enough to match JDs
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to
+we will with you your they them were was who which what when where how all any can may
+should would could also than then into about over such other more most some very
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+# ---------------------------
+# BM25 Inverted Index
+# ---------------------------
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of documents.
+
+    Postings are stored column-wise (one contiguous slice of document ids and
+    term frequencies per term), so scoring a query only touches the postings
+    of its own terms and each term is a single vectorized NumPy update.
+    """
+
+    def __init__(self, texts, ids=None, k1=1.5, b=0.75):
+        self.ids = list(ids) if ids is not None else list(range(len(texts)))
+        if len(self.ids) != len(texts):
+            raise ValueError("ids and texts must have the same length.")
+        self.k1 = k1
+        self.b = b
+
+        vocabulary = {}
+        token_ids = []
+        doc_lengths = np.zeros(len(texts), dtype=np.int64)
+        for doc_id, text in enumerate(texts):
+            ids_in_doc = [vocabulary.setdefault(token, len(vocabulary)) for token in tokenize(text)]
+            doc_lengths[doc_id] = len(ids_in_doc)
+            token_ids.append(np.asarray(ids_in_doc, dtype=np.int64))
+
+        # Count (term, document) pairs in one pass; sorting by term groups each posting list
+        all_terms = np.concatenate(token_ids) if token_ids else np.zeros(0, dtype=np.int64)
+        all_docs = np.repeat(np.arange(len(texts), dtype=np.int64), doc_lengths)
+        pairs, counts = np.unique(all_terms * len(texts) + all_docs, return_counts=True)
+        term_ids = pairs // max(len(texts), 1)
+
+        self.vocabulary = vocabulary
+        self.posting_docs = (pairs % max(len(texts), 1)).astype(np.int32)
+        self.posting_tfs = counts.astype(np.float32)
+        self.term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=self.term_offsets[1:])
+
+        document_frequency = np.diff(self.term_offsets).astype(np.float32)
+        self.idf = np.log1p((len(texts) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        average_length = doc_lengths.mean() if len(texts) else 0.0
+        # Per-document BM25 length normalization, precomputed once
+        self.length_norm = k1 * (1 - b + b * doc_lengths / (average_length or 1.0))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def score(self, query):
+        """Returns one BM25 score per indexed document."""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.posting_docs[start:end]
+            tfs = self.posting_tfs[start:end]
+            # Each document appears at most once per term, so plain fancy-index += is safe
+            scores[docs] += self.idf[term_id] * tfs * (self.k1 + 1) / (tfs + self.length_norm[docs])
+        return scores
+
+    def top_k(self, query, k=None, min_score=0.0):
+        """Returns (id, score) pairs for the best matches, highest score first."""
+        if k is not None and k < 1:
+            raise ValueError("k must be at least 1 (or None for every match).")
+        scores = self.score(query)
+        candidates = np.flatnonzero(scores > min_score) if min_score is not None else np.arange(len(scores))
+
+        if k is not None and k < len(candidates):
+            best = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[best]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in candidates]
+
+
+def shortlist(cv_texts, job_description, top_k=50, min_score=0.0):
+    """
+    Cheap, local first stage for CV ranking.
+
+    `cv_texts` maps an id (usually the file path) to extracted CV text. Returns
+    up to `top_k` (id, score) pairs whose BM25 score against the job
+    description exceeds `min_score`.
+    """
+    if not cv_texts:
+        return []
+    index = BM25Index(list(cv_texts.values()), ids=list(cv_texts.keys()))
+    return index.top_k(job_description, k=top_k, min_score=min_score)
+
+
+# ---------------------------
+# TF-IDF Cosine Similarity
+# ---------------------------
+def similarity_matrix(queries, documents):
+    """
+    Cosine similarity of sublinear TF-IDF vectors, shape (len(queries), len(documents)).
+
+    IDF is computed over queries and documents together. Only terms that occur
+    in some query can contribute to a dot product, so the dense matrices are
+    built over that (small) vocabulary and scored with one matrix product.
+    """
+    texts = list(queries) + list(documents)
+    vocabulary = {}
+    token_ids = [
+        np.asarray([vocabulary.setdefault(token, len(vocabulary)) for token in tokenize(text)], dtype=np.int64)
+        for text in texts
+    ]
+    n_texts = len(texts)
+    n_terms = max(len(vocabulary), 1)
+    lengths = np.asarray([len(ids) for ids in token_ids], dtype=np.int64)
+
+    all_terms = np.concatenate(token_ids) if token_ids else np.zeros(0, dtype=np.int64)
+    all_rows = np.repeat(np.arange(n_texts, dtype=np.int64), lengths)
+    pairs, counts = np.unique(all_rows * n_terms + all_terms, return_counts=True)
+    rows, terms = pairs // n_terms, pairs % n_terms
+
+    document_frequency = np.bincount(terms, minlength=n_terms)
+    idf = np.log((1 + n_texts) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(counts)) * idf[terms]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_texts))
+    norms[norms == 0] = 1.0
+    weights /= norms[rows]
+
+    n_queries = len(texts) - len(documents)
+    query_terms = np.unique(terms[rows < n_queries])
+    columns = np.full(n_terms, -1, dtype=np.int64)
+    columns[query_terms] = np.arange(len(query_terms))
+    keep = columns[terms] >= 0
+
+    dense = np.zeros((n_texts, len(query_terms)), dtype=np.float32)
+    dense[rows[keep], columns[terms[keep]]] = weights[keep]
+    return dense[:n_queries] @ dense[n_queries:].T
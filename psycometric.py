@@ -1,21 +1,28 @@
-import os
-import re
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-
-# Load environment variables
-load_dotenv()
-gemini_api_key = os.getenv("GOOGLE_API_KEY")
-
-# Initialize Gemini LLM
-chat = ChatGoogleGenerativeAI(api_key=gemini_api_key, model="gemini-2.5-flash", temperature=0.3)
-
-# Step 1: Generate 15 psychometric questions
-prompt_generate = PromptTemplate(
-    input_variables=[],
-    template="""
-Generate 15 psychometric test questions covering:
+import time
+import asyncio
+import secrets
+import argparse
+from collections import OrderedDict
+from llm_clients import get_chat_model
+from question_bank import get_question_bank, parse_questions
+import tracing
+
+# Load environment variables (only when run as a script; see llm_clients.py)
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+# Gemini LLM (built on first use and shared, see llm_clients.py)
+def get_chat():
+    return get_chat_model(model="gemini-2.5-flash", temperature=0.3)
+
+
+# Step 1: Generate psychometric questions (only used when the question bank is empty)
+# Prompts are plain str.format templates, so importing this module does not import LangChain
+prompt_generate = """
+Generate {count} psychometric test questions covering:
 - Situational judgment
 - Numerical reasoning
 - Verbal reasoning
@@ -36,68 +43,9 @@ Answer: 2
 
 Separate each question with a blank line.
 """
-)
-
-questions_text = chat.predict(prompt_generate.format())
-
-# Step 2: Parse questions
-questions = []
-for block in questions_text.strip().split("\n\n"):
-    lines = block.strip().split("\n")
-    if len(lines) < 6:
-        continue
-    question_text = lines[0].replace("Question: ", "").strip()
-    options = [lines[1][3:].strip(), lines[2][3:].strip(), lines[3][3:].strip(), lines[4][3:].strip()]
-    
-    # Extract first digit from the answer line
-    match = re.search(r'\d', lines[5])
-    if match:
-        answer = int(match.group())
-    else:
-        answer = 1  # fallback
-    questions.append({"question": question_text, "options": options, "answer": answer})
 
-# Step 3: User attempts questions one by one
-user_answers = []
-for i, q in enumerate(questions, 1):
-    print(f"\nQuestion {i}: {q['question']}")
-    for idx, option in enumerate(q['options'], 1):
-        print(f"{idx}. {option}")
-    
-    while True:
-        user_ans = input("Your answer (1-4): ").strip()
-        if user_ans in ["1", "2", "3", "4"]:
-            user_answers.append(int(user_ans))
-            break
-        else:
-            print("Invalid input! Enter a number between 1 and 4.")
-
-# Step 4: Display test results
-correct_count = 0
-print("\n--- Test Results ---\n")
-for i, q in enumerate(questions):
-    print(f"Question {i+1}: {q['question']}")
-    print(f"Your answer: {user_answers[i]} - {q['options'][user_answers[i]-1]}")
-    print(f"Correct answer: {q['answer']} - {q['options'][q['answer']-1]}\n")
-    if user_answers[i] == q['answer']:
-        correct_count += 1
-
-wrong_count = len(questions) - correct_count
-print(f"Total Questions: {len(questions)}")
-print(f"Correct Answers: {correct_count}")
-print(f"Wrong Answers: {wrong_count}")
-
-print("\n--- Waiting for the AI report.... ---\n")
-
-# Step 5: Prepare feedback
-feedback_data = []
-for i, q in enumerate(questions):
-    feedback_data.append(f"Q{i+1}: {q['question']}\nYour answer: {user_answers[i]}\nCorrect answer: {q['answer']}\n")
-
-feedback_prompt = PromptTemplate(
-    input_variables=["feedback_data", "correct_count", "wrong_count"],
-    template="""
-The user has completed a psychometric test with 15 questions. Here are the results:
+feedback_prompt = """
+The user has completed a psychometric test with {question_count} questions. Here are the results:
 
 - Correct Answers: {correct_count}
 - Wrong Answers: {wrong_count}
@@ -113,13 +61,287 @@ Provide a concise and clear summary of the results. Include:
 
 Ensure the feedback is actionable and encouraging, with specific suggestions for improvement.
 """
-)
 
-feedback = chat.predict(feedback_prompt.format(
-    feedback_data="\n".join(feedback_data),
-    correct_count=correct_count,
-    wrong_count=wrong_count
-))
 
-print("\n--- Personalized Feedback ---\n")
-print(feedback)
+def generate_questions_text(count=15):
+    with tracing.span("generate_questions"):
+        return get_chat().invoke(prompt_generate.format(count=count)).content
+
+
+# Step 2: Draw questions from the pre-generated bank (see question_bank.py)
+def load_questions(n=15):
+    """Up to `n` questions; fewer only when the bank itself holds fewer."""
+    if n < 1:
+        raise ValueError("A test needs at least one question.")
+    bank = get_question_bank()
+    questions = bank.sample(n)
+    if not questions:
+        # No usable bank on disk: fall back to generating the test live
+        questions = parse_questions(generate_questions_text(n))[:n]
+
+    # Top up thin categories for future sessions without blocking this one
+    bank.refill_in_background()
+    return questions
+
+
+# Step 3: User attempts questions one by one
+def ask_questions(questions):
+    user_answers = []
+    for i, q in enumerate(questions, 1):
+        print(f"\nQuestion {i}: {q['question']}")
+        for idx, option in enumerate(q['options'], 1):
+            print(f"{idx}. {option}")
+
+        while True:
+            user_ans = input("Your answer (1-4): ").strip()
+            if user_ans in ["1", "2", "3", "4"]:
+                user_answers.append(int(user_ans))
+                break
+            else:
+                print("Invalid input! Enter a number between 1 and 4.")
+    return user_answers
+
+
+# Step 4: Display test results
+def show_results(questions, user_answers):
+    correct_count = 0
+    print("\n--- Test Results ---\n")
+    for i, q in enumerate(questions):
+        print(f"Question {i+1}: {q['question']}")
+        print(f"Your answer: {user_answers[i]} - {q['options'][user_answers[i]-1]}")
+        print(f"Correct answer: {q['answer']} - {q['options'][q['answer']-1]}\n")
+        if user_answers[i] == q['answer']:
+            correct_count += 1
+
+    wrong_count = len(questions) - correct_count
+    print(f"Total Questions: {len(questions)}")
+    print(f"Correct Answers: {correct_count}")
+    print(f"Wrong Answers: {wrong_count}")
+    return correct_count, wrong_count
+
+
+# Step 5: Prepare feedback
+def feedback_entry(number, question, user_answer):
+    return f"Q{number}: {question['question']}\nYour answer: {user_answer}\nCorrect answer: {question['answer']}\n"
+
+
+def build_feedback_prompt(questions, user_answers, correct_count, wrong_count, feedback_data=None):
+    if feedback_data is None:
+        feedback_data = [feedback_entry(i + 1, q, user_answers[i]) for i, q in enumerate(questions)]
+
+    return feedback_prompt.format(
+        question_count=len(questions),
+        feedback_data="\n".join(feedback_data),
+        correct_count=correct_count,
+        wrong_count=wrong_count
+    )
+
+
+def generate_feedback(questions, user_answers, correct_count, wrong_count):
+    with tracing.span("generate_feedback", questions=len(questions)):
+        return get_chat().invoke(build_feedback_prompt(questions, user_answers, correct_count, wrong_count)).content
+
+
+async def agenerate_feedback(questions, user_answers, correct_count, wrong_count, feedback_data=None):
+    with tracing.span("generate_feedback", questions=len(questions)):
+        prompt = build_feedback_prompt(questions, user_answers, correct_count, wrong_count, feedback_data)
+        return (await get_chat().ainvoke(prompt)).content
+
+
+# ---------------------------
+# Test Sessions (for servers)
+# ---------------------------
+ANSWERING = "answering"
+COMPLETE = "complete"
+REPORTED = "reported"
+
+
+class TestSession:
+    """
+    One user's run through a test: ANSWERING -> COMPLETE -> REPORTED.
+
+    Answers are scored as they arrive (O(1) each) and their feedback entries
+    are appended right away, so the feedback prompt is ready the moment the
+    last answer lands. Questions are shared with the bank, not copied, and
+    answers are kept in a bytearray, so idle sessions stay small. While the
+    user answers, the questions for their next test are drawn in the
+    background (`next_session`).
+    """
+
+    __slots__ = ("id", "questions", "answers", "correct", "feedback_data", "state", "feedback",
+                 "last_active", "_prefetch")
+
+    def __init__(self, questions, session_id=None, prefetch=False):
+        self.id = session_id or secrets.token_urlsafe(8)
+        self.questions = questions
+        self.answers = bytearray()
+        self.correct = 0
+        self.feedback_data = []
+        self.state = ANSWERING if questions else COMPLETE
+        self.feedback = None
+        self.last_active = time.monotonic()
+        self._prefetch = None
+        if prefetch:
+            self.prefetch_next()
+
+    @classmethod
+    async def start(cls, n=15, prefetch=True):
+        # Sampling is instant; the thread only matters when questions have to be generated live
+        questions = await asyncio.to_thread(load_questions, n)
+        # Prefetching needs the running loop, so it starts here rather than by default in __init__
+        return cls(questions, prefetch=prefetch)
+
+    @property
+    def index(self):
+        return len(self.answers)
+
+    @property
+    def wrong(self):
+        return len(self.answers) - self.correct
+
+    def prefetch_next(self):
+        """Starts drawing the next test's questions on a worker thread (needs a running event loop)."""
+        if self._prefetch is None:
+            self._prefetch = asyncio.get_running_loop().run_in_executor(None, load_questions, len(self.questions))
+        return self._prefetch
+
+    def current_question(self):
+        """The question awaiting an answer, without its correct answer; None once the test is complete."""
+        if self.state != ANSWERING:
+            return None
+        question = self.questions[self.index]
+        return {"id": question.get("id"), "number": self.index + 1, "total": len(self.questions),
+                "question": question["question"], "options": question["options"]}
+
+    def answer(self, choice):
+        """Records the answer to the current question and returns whether it was correct."""
+        if self.state != ANSWERING:
+            raise ValueError(f"Session {self.id} is {self.state}; no question is waiting for an answer.")
+        if choice not in (1, 2, 3, 4):
+            raise ValueError("Answer must be a number between 1 and 4.")
+
+        question = self.questions[self.index]
+        is_correct = choice == question["answer"]
+        self.correct += is_correct
+        self.answers.append(choice)
+        self.feedback_data.append(feedback_entry(len(self.answers), question, choice))
+        self.last_active = time.monotonic()
+        if len(self.answers) == len(self.questions):
+            self.state = COMPLETE
+        return is_correct
+
+    def results(self):
+        return {"answered": len(self.answers), "total": len(self.questions),
+                "correct": self.correct, "wrong": self.wrong, "state": self.state}
+
+    async def generate_feedback(self):
+        """The LLM report for a completed test; generated once and then kept on the session."""
+        if self.state == ANSWERING:
+            raise ValueError(f"Session {self.id} still has {len(self.questions) - self.index} unanswered questions.")
+        if self.feedback is None:
+            self.feedback = await agenerate_feedback(
+                self.questions, self.answers, self.correct, self.wrong, self.feedback_data
+            )
+            self.state = REPORTED
+            self.feedback_data = None  # the prompt is no longer needed
+        self.last_active = time.monotonic()
+        return self.feedback
+
+    async def next_session(self):
+        """A new session over the prefetched questions (drawn now if prefetching never started)."""
+        questions = await self.prefetch_next()
+        self._prefetch = None
+        return TestSession(questions, prefetch=True)
+
+    def close(self):
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+            self._prefetch = None
+
+
+class SessionStore:
+    """In-memory sessions by id, dropping the least recently used beyond `max_sessions` or after `ttl` seconds."""
+
+    def __init__(self, max_sessions=10000, ttl=3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, session):
+        self._sessions[session.id] = session
+        self._evict()
+        return session
+
+    def get(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - session.last_active > self.ttl:
+            self.drop(session_id)
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def drop(self, session_id):
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - oldest.last_active <= self.ttl:
+                break
+            self.drop(session_id)
+
+
+# ---------------------------
+# Command Line Test
+# ---------------------------
+async def run_session(session):
+    while (question := session.current_question()) is not None:
+        print(f"\nQuestion {question['number']}: {question['question']}")
+        for idx, option in enumerate(question['options'], 1):
+            print(f"{idx}. {option}")
+
+        while True:
+            # input() runs on a thread so the next test keeps loading in the background
+            user_ans = (await asyncio.to_thread(input, "Your answer (1-4): ")).strip()
+            if user_ans in ["1", "2", "3", "4"]:
+                session.answer(int(user_ans))
+                break
+            print("Invalid input! Enter a number between 1 and 4.")
+
+    show_results(session.questions, list(session.answers))
+    print("\n--- Waiting for the AI report.... ---\n")
+    feedback = await session.generate_feedback()
+
+    print("\n--- Personalized Feedback ---\n")
+    print(feedback)
+
+
+async def run_tests(n=15):
+    session = await TestSession.start(n)
+    while True:
+        await run_session(session)
+        again = (await asyncio.to_thread(input, "\nTake another test? (y/N): ")).strip().lower()
+        if again != "y":
+            session.close()
+            return
+        # Drawn in the background while this test was being answered
+        session = await session.next_session()
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Take a psychometric test and get AI feedback.")
+    parser.add_argument("--questions", type=int, default=15, help="Questions per test")
+    args = parser.parse_args(argv)
+    asyncio.run(run_tests(args.questions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+import re
+import json
+import uuid
+import random
+import hashlib
+import logging
+import argparse
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+BANK_VERSION = 1
+# The bank shipped with the repo is only read; background refills append to a per-user file
+BANK_PATH = os.getenv(
+    "CAREERCRAFT_QUESTION_BANK",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "psychometric_questions.jsonl")
+)
+REFILL_PATH = os.getenv(
+    "CAREERCRAFT_QUESTION_BANK_REFILL",
+    os.path.join(os.path.expanduser("~"), ".cache", "careercraft", "psychometric_questions.jsonl")
+)
+CATEGORIES = ("situational", "numerical", "verbal", "non-verbal")
+CATEGORY_NAMES = {
+    "situational": "situational judgment",
+    "numerical": "numerical reasoning",
+    "verbal": "verbal reasoning",
+    "non-verbal": "non-verbal reasoning",
+}
+# A background refill starts once any category has fewer questions than this
+LOW_WATERMARK = int(os.getenv("CAREERCRAFT_QUESTION_BANK_LOW_WATERMARK", 8))
+REFILL_BATCH = 10
+# Recent questions listed in a refill prompt so the model writes new ones
+AVOID_IN_PROMPT = 40
+
+generate_template = """
+Generate {count} psychometric test questions on {category_name}.
+
+Each question should have:
+- The question text
+- 4 options (labeled 1-4)
+- The correct answer number (1-4)
+
+Format as plain text like:
+Question: ...
+1. Option
+2. Option
+3. Option
+4. Option
+Answer: 2
+
+Separate each question with a blank line.
+{avoid}
+Batch reference: {nonce}
+"""
+
+
+# ---------------------------
+# Parsing
+# ---------------------------
+QUESTION_PATTERN = re.compile(r"^\s*(?:\*\*)?(?:Q(?:uestion)?\s*\d*)\s*[:.)]\s*(?:\*\*)?\s*(.+)$", re.IGNORECASE)
+OPTION_PATTERN = re.compile(r"^\s*\(?([1-4])[.):]\s*(.+)$")
+ANSWER_PATTERN = re.compile(r"^\s*(?:\*\*)?(?:Correct\s+)?Answer\s*(?:\*\*)?\s*[:\-]?\s*(?:\*\*)?\s*\(?([1-4])", re.IGNORECASE)
+
+
+def parse_questions(questions_text):
+    """
+    Parses "Question: / 1.-4. / Answer:" blocks into question dicts.
+
+    Blocks are delimited by their "Question" line rather than by blank lines,
+    so extra blank lines, numbering or preamble text do not drop questions.
+    Questions without four options or an answer are skipped.
+    """
+    questions = []
+    current = None
+
+    def finish(question):
+        if question and len(question["options"]) == 4 and question["answer"]:
+            questions.append({k: question[k] for k in ("question", "options", "answer")})
+
+    for line in questions_text.splitlines():
+        match = QUESTION_PATTERN.match(line)
+        if match:
+            finish(current)
+            current = {"question": match.group(1).strip(), "options": [], "answer": None}
+            continue
+        if current is None:
+            continue
+        match = ANSWER_PATTERN.match(line)
+        if match:
+            current["answer"] = int(match.group(1))
+            continue
+        match = OPTION_PATTERN.match(line)
+        if match and int(match.group(1)) == len(current["options"]) + 1:
+            current["options"].append(match.group(2).strip())
+    finish(current)
+    return questions
+
+
+# ---------------------------
+# Question Bank
+# ---------------------------
+def question_id(category, text):
+    # Derived from the text, so ids never collide between the shipped bank and a refill file
+    return f"{category}-{hashlib.sha256(text.strip().lower().encode('utf-8')).hexdigest()[:10]}"
+
+
+class QuestionBank:
+    """
+    Versioned JSONL bank of psychometric questions, indexed by category.
+
+    The first line is a header ({"bank_version": N}); every other line is one
+    question with "id", "category", "question", "options" and "answer".
+
+    Questions are read from `path` and `refill_path`; new questions are only
+    ever appended to `refill_path`, so the bank shipped in data/ is not
+    modified at runtime.
+    """
+
+    def __init__(self, path=BANK_PATH, refill_path=REFILL_PATH):
+        self.path = path
+        self.refill_path = refill_path
+        self.by_category = {category: [] for category in CATEGORIES}
+        self.by_id = {}
+        self._seen_questions = set()
+        self._lock = threading.Lock()
+        self._refill_thread = None
+        for bank_path in dict.fromkeys([path, refill_path]):
+            if os.path.exists(bank_path):
+                self._load(bank_path)
+
+    def _load(self, bank_path):
+        with open(bank_path, encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("bank_version") != BANK_VERSION:
+                raise ValueError(f"Unsupported question bank version in {bank_path}: {header}")
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+
+    def _index(self, question):
+        if question["question"].lower() in self._seen_questions:
+            return  # also present in the other bank file
+        self.by_category.setdefault(question["category"], []).append(question)
+        self.by_id[question["id"]] = question
+        self._seen_questions.add(question["question"].lower())
+
+    def __len__(self):
+        return sum(len(questions) for questions in self.by_category.values())
+
+    def get(self, question_id):
+        return self.by_id.get(question_id)
+
+    def counts(self):
+        return {category: len(questions) for category, questions in self.by_category.items()}
+
+    def sample(self, n=15, rng=None):
+        """
+        Draws `n` distinct questions, spread as evenly as possible across categories.
+
+        Categories that run short are topped up from the others, so a sample is
+        only smaller than `n` when the whole bank is.
+        """
+        rng = rng or random
+        categories = [category for category, questions in self.by_category.items() if questions]
+        if not categories:
+            return []
+
+        quotas = {category: n // len(categories) for category in categories}
+        for category in rng.sample(categories, n % len(categories)):
+            quotas[category] += 1
+
+        picked = []
+        leftovers = []
+        for category in categories:
+            pool = self.by_category[category]
+            chosen = rng.sample(pool, min(quotas[category], len(pool)))
+            picked.extend(chosen)
+            chosen_ids = {id(question) for question in chosen}
+            leftovers.extend(question for question in pool if id(question) not in chosen_ids)
+
+        if len(picked) < n and leftovers:
+            picked.extend(rng.sample(leftovers, min(n - len(picked), len(leftovers))))
+        rng.shuffle(picked)
+        return picked
+
+    def low_categories(self, low_watermark=LOW_WATERMARK):
+        return [category for category in CATEGORIES if len(self.by_category.get(category, [])) < low_watermark]
+
+    def add(self, category, questions):
+        """Appends new (not yet seen) questions to `refill_path`; returns how many were added."""
+        with self._lock:
+            new_questions = []
+            for question in questions:
+                if question["question"].lower() in self._seen_questions:
+                    continue
+                new_questions.append({"id": question_id(category, question["question"]), "category": category, **question})
+                self._seen_questions.add(question["question"].lower())
+            if not new_questions:
+                return 0
+
+            is_new_file = not os.path.exists(self.refill_path)
+            os.makedirs(os.path.dirname(os.path.abspath(self.refill_path)), exist_ok=True)
+            with open(self.refill_path, "a", encoding="utf-8") as f:
+                if is_new_file:
+                    f.write(json.dumps({"bank_version": BANK_VERSION}) + "\n")
+                for question in new_questions:
+                    f.write(json.dumps(question, ensure_ascii=False) + "\n")
+            for question in new_questions:
+                self.by_category.setdefault(category, []).append(question)
+                self.by_id[question["id"]] = question
+            return len(new_questions)
+
+    def generate(self, category, count=REFILL_BATCH):
+        """Asks the LLM for `count` new questions in `category` and adds them to the bank."""
+        from llm_clients import get_chat_model
+
+        # Every refill prompt is unique (recent questions plus a nonce), so neither the LLM cache nor
+        # request coalescing can hand back an earlier batch that dedup would then throw away
+        recent = [question["question"] for question in self.by_category.get(category, [])[-AVOID_IN_PROMPT:]]
+        avoid = ""
+        if recent:
+            avoid = "\nDo not repeat any of these existing questions:\n" + "\n".join(f"- {q}" for q in recent) + "\n"
+        prompt = generate_template.format(
+            count=count, category_name=CATEGORY_NAMES[category], avoid=avoid, nonce=uuid.uuid4().hex
+        )
+        response = get_chat_model(model="gemini-2.5-flash", temperature=0.3).invoke(prompt)
+        return self.add(category, parse_questions(response.content))
+
+    def refill_in_background(self, low_watermark=LOW_WATERMARK):
+        """Starts a daemon thread topping up low categories; no-op if none are low or one is running."""
+        low = self.low_categories(low_watermark)
+        if not low or (self._refill_thread and self._refill_thread.is_alive()):
+            return None
+
+        def refill():
+            from scheduler import batch_priority
+
+            with batch_priority():
+                for category in low:
+                    try:
+                        self.generate(category)
+                    except Exception:
+                        logger.warning("Question bank refill for %s failed", category, exc_info=True)
+
+        self._refill_thread = threading.Thread(target=refill, name="question-bank-refill", daemon=True)
+        self._refill_thread.start()
+        return self._refill_thread
+
+
+_default_bank = None
+
+
+def get_question_bank():
+    global _default_bank
+    if _default_bank is None:
+        _default_bank = QuestionBank()
+    return _default_bank
+
+
+# ---------------------------
+# Offline Build
+# ---------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the psychometric question bank.")
+    parser.add_argument("command", choices=["build", "stats"])
+    parser.add_argument("--per-category", type=int, default=50, help="Target questions per category")
+    parser.add_argument("--path", default=BANK_PATH)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # An offline build extends the given bank file itself
+    bank = QuestionBank(args.path, refill_path=args.path)
+    if args.command == "build":
+        for category in CATEGORIES:
+            attempts = 0
+            while len(bank.by_category[category]) < args.per_category and attempts < 10:
+                missing = args.per_category - len(bank.by_category[category])
+                added = bank.generate(category, min(missing, REFILL_BATCH))
+                attempts += 1
+                print(f"{category}: +{added} (total {len(bank.by_category[category])})")
+
+    print(json.dumps({"path": bank.path, "refill_path": bank.refill_path, "bank_version": BANK_VERSION, "counts": bank.counts()}, indent=2))
@@ -0,0 +1,180 @@
+import re
+import json
+
+
+# ---------------------------
+# Result Shape
+# ---------------------------
+MAX_ITEMS = 5  # Max 5 strengths / weaknesses / feedback points
+
+# JSON keys requested from the model -> keys of the result dict used across the tools
+JSON_FIELDS = {
+    "strengths": "Strengths",
+    "weaknesses": "Weaknesses",
+    "feedback": "Personalized Feedback",
+}
+
+# Fallback section headings; "weaknesses and areas for improvement" etc. collapse onto the same key
+SECTION_PATTERN = re.compile(
+    r"^[ \t#>*_{\"-]*(?:\d+\.\s*)?[*_]*"
+    r"(?P<name>relevance score|score|strengths|weaknesses|areas for improvement|personali[sz]ed feedback|final recommendation)"
+    r"(?P<colon>[^:\n]{0,40}:)?[*_ \t]*(?P<rest>[^\n]*)$",
+    re.IGNORECASE | re.MULTILINE
+)
+SECTION_KEYS = {
+    "relevance score": "Score",
+    "score": "Score",
+    "strengths": "Strengths",
+    "weaknesses": "Weaknesses",
+    "areas for improvement": "Weaknesses",
+    "personalized feedback": "Personalized Feedback",
+    "personalised feedback": "Personalized Feedback",
+    "final recommendation": "Final Recommendation",
+}
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def _empty_result():
+    return {
+        "Score": 0,
+        "Strengths": [],
+        "Weaknesses": [],
+        "Personalized Feedback": [],
+        "Final Recommendation": "",
+        "Parse Mode": "unparsed",
+    }
+
+
+def _clamp_score(value):
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        match = NUMBER_PATTERN.search(str(value))
+        if not match:
+            return None
+        score = float(match.group())
+    return int(round(min(max(score, 0.0), 100.0)))
+
+
+def _clean_item(item):
+    return BULLET_PATTERN.sub("", str(item)).strip().strip('*_[]",').strip()
+
+
+def _as_items(value):
+    if isinstance(value, str):
+        value = value.splitlines()
+    if not isinstance(value, list):
+        return []
+    items = [_clean_item(item) for item in value]
+    return [item for item in items if item][:MAX_ITEMS]
+
+
+# ---------------------------
+# Fast Path: JSON
+# ---------------------------
+def _load_json(text):
+    # Tolerates ```json fences and chatter around the object
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _result_from_json(data):
+    score = _clamp_score(data.get("score"))
+    if score is None:
+        return None
+
+    result = _empty_result()
+    result["Score"] = score
+    for json_key, result_key in JSON_FIELDS.items():
+        result[result_key] = _as_items(data.get(json_key, []))
+    result["Final Recommendation"] = str(data.get("final_recommendation") or "").strip()
+    result["Parse Mode"] = "json"
+    return result
+
+
+def _parse_json(text):
+    data = _load_json(text)
+    return _result_from_json(data) if data is not None else None
+
+
+# ---------------------------
+# Fallback: One-Pass Section Extraction
+# ---------------------------
+def _parse_sections(text):
+    result = _empty_result()
+    # A heading ends in a colon, is marked up (# / **), or stands alone; "- Strengths in SQL" is a bullet
+    matches = [
+        match for match in SECTION_PATTERN.finditer(text)
+        if match.group("colon") or not match.group("rest").strip() or match.group(0).lstrip().startswith(("#", "**"))
+    ]
+    if not matches:
+        return result
+
+    score = None
+    for i, match in enumerate(matches):
+        key = SECTION_KEYS[match.group("name").lower()]
+        body_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        # Without a colon the rest of the line belongs to the heading ("Weaknesses and Areas for Improvement")
+        rest = match.group("rest") if match.group("colon") else ""
+        body = rest + "\n" + text[match.end():body_end]
+
+        if key == "Score":
+            if score is None:
+                score = _clamp_score(body)
+        elif key == "Final Recommendation":
+            result[key] = result[key] or " ".join(body.split())
+        elif not result[key]:
+            result[key] = _as_items(body)
+
+    if score is not None:
+        result["Score"] = score
+        result["Parse Mode"] = "sections"
+    return result
+
+
+def parse_ranking(response_text):
+    """
+    Parses a CV ranking response into a dict with a guaranteed integer "Score".
+
+    The JSON object requested by the ranking prompt is tried first; if the
+    model ignored the schema, headings are located in a single regex pass, in
+    any order and with or without markdown bold. "Parse Mode" records which
+    path succeeded ("json", "sections" or "unparsed", where Score is 0).
+    """
+    return _parse_json(response_text) or _parse_sections(response_text)
+
+
+def parse_batch_rankings(response_text, ids):
+    """
+    Parses a batched response ({"results": [{"id": ..., "score": ..., ...}]})
+    into {id: result} for the expected `ids`.
+
+    Entries with unknown ids or no usable score are dropped, so callers can
+    retry whatever is missing. A batch of one falls back to `parse_ranking`.
+    """
+    ids = [str(item_id) for item_id in ids]
+    data = _load_json(response_text)
+    results = {}
+    if data is not None:
+        entries = data.get("results")
+        if isinstance(entries, list):
+            for entry in entries:
+                if not isinstance(entry, dict) or str(entry.get("id")) not in ids:
+                    continue
+                result = _result_from_json(entry)
+                if result is not None:
+                    results.setdefault(str(entry["id"]), result)
+
+    if not results and len(ids) == 1:
+        result = parse_ranking(response_text)
+        if result["Parse Mode"] != "unparsed":
+            results[ids[0]] = result
+    return results
@@ -0,0 +1,312 @@
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from cv_artifacts import text_digest
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+RESULT_DB = os.getenv(
+    "CAREERCRAFT_RESULT_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "careercraft", "results.sqlite3")
+)
+# Buffered results are written in one transaction once this many are waiting
+WRITE_BATCH_SIZE = int(os.getenv("CAREERCRAFT_RESULT_BATCH", 500))
+
+LIST_COLUMNS = ("strengths", "weaknesses", "feedback")
+COLUMNS = ("cv_hash", "jd_hash", "model", "score", "strengths", "weaknesses", "feedback",
+           "final_recommendation", "cv_name", "created_at")
+# A new score replaces the old one, but the CV keeps the file name it was first stored under,
+# so exact copies uploaded under other names do not rename it
+UPSERT_RANKING = (
+    f"INSERT INTO rankings ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+    "ON CONFLICT (cv_hash, jd_hash, model) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[3:] if column != "cv_name")
+    + ", cv_name = COALESCE(rankings.cv_name, excluded.cv_name)"
+)
+
+
+def job_digest(job_description):
+    # Surrounding whitespace differs between pasted text and files, so it is not part of a job's identity
+    return text_digest(job_description.strip())
+
+
+def model_name(llm):
+    """The model a LangChain chat model calls ("gemini-2.5-flash", "fake-gemini", ...)."""
+    params = getattr(llm, "_identifying_params", None) or {}
+    name = params.get("model") or getattr(llm, "_llm_type", None) or type(llm).__name__
+    return str(name).removeprefix("models/")
+
+
+# ---------------------------
+# SQLite Result Store
+# ---------------------------
+class ResultStore:
+    """
+    Persistent CV ranking results, one row per (CV, job description, model).
+
+    CVs and job descriptions are identified by the SHA-256 of their text (the
+    CV digest is the artifact key `cv_artifacts` uses), so a re-scored CV
+    replaces its earlier result for that job and model. Writes are buffered and committed together
+    with `executemany` once `batch_size` results are waiting, and on
+    `flush()` / `close()`. Queries see flushed results only.
+    """
+
+    def __init__(self, database_path=RESULT_DB, batch_size=WRITE_BATCH_SIZE):
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self._pending = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(database_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rankings (
+                    id INTEGER PRIMARY KEY,
+                    cv_hash TEXT NOT NULL,
+                    jd_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    strengths TEXT NOT NULL,
+                    weaknesses TEXT NOT NULL,
+                    feedback TEXT NOT NULL,
+                    final_recommendation TEXT NOT NULL DEFAULT '',
+                    cv_name TEXT,
+                    created_at REAL NOT NULL,
+                    UNIQUE (cv_hash, jd_hash, model)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_descriptions (
+                    jd_hash TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            # MinHash signatures of stored CVs, for near-duplicate lookups (see dedup.py)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cv_signatures (
+                    cv_hash TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            # Top-K and score ranges per job walk this index in order; history uses the CV one
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rankings_job_score ON rankings (jd_hash, score DESC, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rankings_cv ON rankings (cv_hash, created_at DESC)")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared across threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only syncs at checkpoints: a crash can lose the last commits, never corrupt the file
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def add(self, cv_text, job_description, model, result, cv_name=None):
+        """Buffers one ranking result (a dict shaped like `parse_ranking`'s) and returns its CV hash."""
+        cv_hash = text_digest(cv_text)
+        row = (
+            cv_hash, job_digest(job_description), model, int(result["Score"]),
+            json.dumps(result.get("Strengths") or [], ensure_ascii=False),
+            json.dumps(result.get("Weaknesses") or [], ensure_ascii=False),
+            json.dumps(result.get("Personalized Feedback") or [], ensure_ascii=False),
+            result.get("Final Recommendation") or "", cv_name, time.time(),
+        )
+        with self._lock:
+            self._pending.append((row, job_description))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+        return cv_hash
+
+    def flush(self):
+        """Writes all buffered results in a single transaction; returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        now = time.time()
+        job_descriptions = {job_digest(text): text for _, text in pending}
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_descriptions (jd_hash, text, created_at) VALUES (?, ?, ?)",
+                [(jd_hash, text, now) for jd_hash, text in job_descriptions.items()]
+            )
+            conn.executemany(UPSERT_RANKING, [row for row, _ in pending])
+        return len(pending)
+
+    def add_signatures(self, items):
+        """Saves (cv_hash, signature bytes) pairs in one transaction; returns how many were given."""
+        if not items:
+            return 0
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO cv_signatures (cv_hash, signature, created_at) VALUES (?, ?, ?)",
+                [(cv_hash, signature, now) for cv_hash, signature in items]
+            )
+        return len(items)
+
+    def close(self):
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    @staticmethod
+    def _result(row):
+        result = dict(row)
+        for key in LIST_COLUMNS:
+            result[key] = json.loads(result[key])
+        return result
+
+    def get(self, cv_hash, job_description=None, jd_hash=None, model=None):
+        """The stored result of one CV for a job (and model, if given), or None."""
+        jd_hash = jd_hash or job_digest(job_description)
+        query = "SELECT * FROM rankings WHERE cv_hash = ? AND jd_hash = ?"
+        params = [cv_hash, jd_hash]
+        if model is not None:
+            query += " AND model = ?"
+            params.append(model)
+        row = self._connection().execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        return None if row is None else self._result(row)
+
+    def signatures(self):
+        """Yields every saved (cv_hash, signature bytes) pair."""
+        yield from self._connection().execute("SELECT cv_hash, signature FROM cv_signatures ORDER BY rowid")
+
+    def top(self, job_description=None, jd_hash=None, k=20, min_score=None, max_score=None, model=None,
+            after=None):
+        """
+        One page of the best results for a job, highest score first.
+
+        The job is given by its text or `jd_hash`. `min_score`/`max_score` are
+        inclusive bounds. Pages are keyset-paginated: pass the returned
+        cursor as `after` to get the next page, which stays cheap however deep
+        the page. Returns (results, cursor); the cursor is None on the last page.
+        """
+        jd_hash = jd_hash or job_digest(job_description)
+        clauses = ["jd_hash = ?"]
+        params = [jd_hash]
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("score <= ?")
+            params.append(max_score)
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        if after is not None:
+            score, last_id = after
+            clauses.append("(score < ? OR (score = ? AND id > ?))")
+            params.extend([score, score, last_id])
+
+        rows = self._connection().execute(
+            f"SELECT * FROM rankings WHERE {' AND '.join(clauses)} ORDER BY score DESC, id LIMIT ?",
+            [*params, k + 1]
+        ).fetchall()
+        results = [self._result(row) for row in rows[:k]]
+        cursor = (results[-1]["score"], results[-1]["id"]) if len(rows) > k else None
+        return results, cursor
+
+    def count(self, job_description=None, jd_hash=None, min_score=None, max_score=None):
+        jd_hash = jd_hash or job_digest(job_description)
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM rankings WHERE jd_hash = ? AND score BETWEEN ? AND ?",
+            (jd_hash, 0 if min_score is None else min_score, 100 if max_score is None else max_score)
+        ).fetchone()[0]
+
+    def history(self, cv_text=None, cv_hash=None, limit=50):
+        """Every job a CV was ranked for, newest first, with the job description text."""
+        cv_hash = cv_hash or text_digest(cv_text)
+        rows = self._connection().execute("""
+            SELECT rankings.*, job_descriptions.text AS job_description
+            FROM rankings JOIN job_descriptions USING (jd_hash)
+            WHERE cv_hash = ? ORDER BY created_at DESC LIMIT ?
+        """, (cv_hash, limit)).fetchall()
+        return [self._result(row) for row in rows]
+
+    def jobs(self, limit=50):
+        """Stored job descriptions with their result counts, most recent first."""
+        rows = self._connection().execute("""
+            SELECT job_descriptions.jd_hash, job_descriptions.text, job_descriptions.created_at,
+                   COUNT(rankings.id) AS results
+            FROM job_descriptions LEFT JOIN rankings USING (jd_hash)
+            GROUP BY job_descriptions.jd_hash ORDER BY job_descriptions.created_at DESC LIMIT ?
+        """, (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+# ---------------------------
+# Command Line
+# ---------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query stored CV ranking results.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    top_parser = subcommands.add_parser("top", help="Best CVs for a job description")
+    top_parser.add_argument("jd_file", help="File containing the job description")
+    top_parser.add_argument("-k", type=int, default=20)
+    top_parser.add_argument("--page", type=int, default=1)
+    top_parser.add_argument("--min-score", type=int, default=None)
+    top_parser.add_argument("--max-score", type=int, default=None)
+    history_parser = subcommands.add_parser("history", help="Every job a CV was ranked for")
+    history_parser.add_argument("cv_file")
+    subcommands.add_parser("jobs", help="Stored job descriptions")
+    parser.add_argument("--db", default=RESULT_DB)
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    if args.command == "top":
+        with open(args.jd_file, encoding="utf-8") as f:
+            job_description = f.read()
+        cursor = None
+        for _ in range(args.page):
+            results, next_cursor = store.top(job_description, k=args.k, min_score=args.min_score,
+                                             max_score=args.max_score, after=cursor)
+            cursor = next_cursor
+        total = store.count(job_description, min_score=args.min_score, max_score=args.max_score)
+        for rank, result in enumerate(results, (args.page - 1) * args.k + 1):
+            print(f"{rank:<5} {result['score']:>3}  {result['model']:<18} {result['cv_name'] or result['cv_hash'][:12]}")
+        print(f"\n{total} results{' (more pages)' if cursor else ''}")
+    elif args.command == "history":
+        from tools import load_tool
+        from page_loader import read_budget
+        from compaction import DEFAULT_TOKEN_BUDGET
+
+        # Read the CV the way cv-ranking.py does, so its text (and hash) matches what was stored
+        pages = load_tool("cv_ranking").load_cv_pages(args.cv_file, read_budget(DEFAULT_TOKEN_BUDGET))
+        for result in store.history("\n".join(pages)):
+            title = " ".join(result["job_description"].split())[:60]
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(result['created_at']))}  "
+                  f"{result['score']:>3}  {title}")
+    else:
+        for job in store.jobs():
+            print(f"{job['jd_hash'][:12]}  {job['results']:>6} results  {' '.join(job['text'].split())[:60]}")
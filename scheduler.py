@@ -0,0 +1,425 @@
+import os
+import re
+import copy
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import Future
+import tracing
+from tools import lazy_classes
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+# Defaults match Gemini 2.5 Flash on the first paid tier; override per deployment
+DEFAULT_RPM = int(os.getenv("CAREERCRAFT_LLM_RPM", 1000))
+DEFAULT_TPM = int(os.getenv("CAREERCRAFT_LLM_TPM", 1_000_000))
+# Share of each bucket that batch work may not use, so interactive calls never queue behind a ranking run
+BATCH_RESERVE = float(os.getenv("CAREERCRAFT_LLM_BATCH_RESERVE", 0.2))
+MAX_RETRIES = int(os.getenv("CAREERCRAFT_LLM_MAX_RETRIES", 5))
+BASE_DELAY = 1.0
+MAX_DELAY = 30.0
+# Output tokens are unknown up front; the estimate is corrected once usage comes back
+EXPECTED_OUTPUT_TOKENS = 1000
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+_priority = ContextVar("careercraft_llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def batch_priority():
+    """Marks LLM calls made inside the block (and tasks started from it) as batch work."""
+    token = _priority.set(BATCH)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# ---------------------------
+# Transient Errors
+# ---------------------------
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+TRANSIENT_MESSAGE = re.compile(
+    r"\b(?:429|503|RESOURCE_EXHAUSTED|UNAVAILABLE|DEADLINE_EXCEEDED|rate limit|quota)", re.IGNORECASE
+)
+
+
+def is_transient(error):
+    """True for quota, overload and timeout errors worth retrying."""
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    for attribute in ("code", "status_code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int) and status in TRANSIENT_STATUS:
+            return True
+    return bool(TRANSIENT_MESSAGE.search(f"{type(error).__name__} {error}"))
+
+
+# ---------------------------
+# Token Buckets
+# ---------------------------
+class TokenBucket:
+    """
+    Refills continuously at `per_minute / 60` per second up to `capacity`.
+
+    Not thread-safe on its own; `Scheduler` guards its buckets with one lock
+    so the request and token buckets are always charged together.
+    """
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, reserve=0.0):
+        """Seconds until `amount` can be taken while leaving `reserve` (a fraction of capacity) untouched."""
+        self._refill()
+        floor = reserve * self.capacity
+        amount = min(amount, self.capacity - floor)
+        missing = amount + floor - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        # Settles an estimate against the real usage; may leave the bucket in debt
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+class Scheduler:
+    """
+    Gatekeeper for one model's quota.
+
+    Every call first reserves one request and its estimated tokens from the
+    RPM/TPM buckets (batch calls must leave `batch_reserve` of each bucket for
+    interactive ones), retries transient errors with full-jitter exponential
+    backoff, and shares one result between identical prompts in flight at the
+    same time.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, batch_reserve=BATCH_RESERVE,
+                 max_retries=MAX_RETRIES, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.batch_reserve = batch_reserve
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._counters = {"calls": 0, "retries": 0, "coalesced": 0, "throttled_seconds": 0.0}
+
+    def _bump(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    # Rate limiting
+    def _try_reserve(self, tokens):
+        reserve = self.batch_reserve if _priority.get() == BATCH else 0.0
+        with self._lock:
+            wait = max(self.requests.wait_time(1, reserve), self.tokens.wait_time(tokens, reserve))
+            if wait == 0.0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                self._counters["calls"] += 1
+            return wait
+
+    def _throttled(self, wait):
+        self._bump("throttled_seconds", wait)
+        tracing.count("throttled_ms", round(wait * 1000, 3))
+
+    def acquire(self, tokens):
+        while True:
+            wait = self._try_reserve(tokens)
+            if not wait:
+                return
+            self._throttled(wait)
+            time.sleep(wait)
+
+    async def aacquire(self, tokens):
+        while True:
+            wait = self._try_reserve(tokens)
+            if not wait:
+                return
+            self._throttled(wait)
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated, result):
+        """Charges the difference between the estimated and the reported token usage."""
+        used = 0
+        for generation in getattr(result, "generations", []):
+            usage = getattr(generation.message, "usage_metadata", None) or {}
+            used += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        if used:
+            with self._lock:
+                self.tokens.adjust(used - estimated)
+
+    # Retries
+    def _retry_delay(self, attempt, error):
+        if attempt >= self.max_retries or not is_transient(error):
+            return None
+        self._bump("retries")
+        tracing.count("llm_retries")
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _call_with_retry(self, fn, tokens):
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.settle(tokens, result)
+            return result
+
+    async def _acall_with_retry(self, fn, tokens):
+        attempt = 0
+        while True:
+            await self.aacquire(tokens)
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.settle(tokens, result)
+            return result
+
+    # Coalescing
+    # Set as a leader's result when its call was cancelled rather than failed; followers then call again
+    _LEADER_CANCELLED = object()
+
+    def _join(self, key):
+        """Returns (future, is_leader); the leader makes the call, everyone else waits on its future."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                tracing.count("coalesced")
+                return future, False
+            future = self._in_flight[key] = Future()
+            return future, True
+
+    def _resolve(self, key, future, result=None, error=None):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def call(self, fn, tokens, key=None):
+        """Runs `fn()` under the rate limits with retries; calls sharing `key` are coalesced."""
+        if key is None:
+            return self._call_with_retry(fn, tokens)
+
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            result = future.result()
+            if result is not self._LEADER_CANCELLED:
+                return copy.deepcopy(result)
+        try:
+            result = self._call_with_retry(fn, tokens)
+        except Exception as e:
+            self._resolve(key, future, error=e)
+            raise
+        except BaseException:
+            # Cancellation (or Ctrl+C) belongs to the leader alone, so it is never handed to followers
+            self._resolve(key, future, self._LEADER_CANCELLED)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    async def acall(self, fn, tokens, key=None):
+        """Async counterpart of `call`; `fn` returns an awaitable."""
+        if key is None:
+            return await self._acall_with_retry(fn, tokens)
+
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            # Shielded: a cancelled follower would otherwise cancel the future the others share
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            if result is not self._LEADER_CANCELLED:
+                return copy.deepcopy(result)
+        try:
+            result = await self._acall_with_retry(fn, tokens)
+        except Exception as e:
+            self._resolve(key, future, error=e)
+            raise
+        except BaseException:
+            # e.g. a request timeout cancelling the leader: its followers make the call themselves
+            self._resolve(key, future, self._LEADER_CANCELLED)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    def stream(self, fn, tokens):
+        """Yields from `fn()`; transient errors are only retried before the first chunk arrives."""
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                chunks = fn()
+                first = next(chunks, None)
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            break
+        if first is not None:
+            yield first
+            yield from chunks
+
+    async def astream(self, fn, tokens):
+        """Async counterpart of `stream`."""
+        attempt = 0
+        while True:
+            await self.aacquire(tokens)
+            chunks = fn()
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            break
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model):
+    """One scheduler per model name, since Gemini quotas are counted per model."""
+    with _schedulers_lock:
+        if model not in _schedulers:
+            _schedulers[model] = Scheduler()
+        return _schedulers[model]
+
+
+def all_stats():
+    with _schedulers_lock:
+        return {model: scheduler.stats() for model, scheduler in _schedulers.items()}
+
+
+# ---------------------------
+# Scheduled Chat Model
+# ---------------------------
+def _define_scheduled_chat_model():
+    from typing import Any
+    from pydantic import Field
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+    class ScheduledChatModel(BaseChatModel):
+        """
+        Wraps a chat model so that each of its calls goes through a `Scheduler`.
+
+        LangChain's cache and callbacks run on this wrapper, so cache hits never
+        touch the quota and tracing sees one call per request, however many
+        retries it took.
+        """
+
+        inner: BaseChatModel
+        scheduler: Any = Field(default=None, exclude=True)
+        coalesce: bool = True
+
+        @property
+        def _llm_type(self):
+            return self.inner._llm_type
+
+        @property
+        def _identifying_params(self):
+            return self.inner._identifying_params
+
+        @staticmethod
+        def _estimate(messages):
+            return sum(len(str(message.content)) for message in messages) // 4 + EXPECTED_OUTPUT_TOKENS
+
+        def _key(self, messages, stop, kwargs):
+            if not self.coalesce:
+                return None
+            digest = hashlib.sha256(repr(sorted(self.inner._identifying_params.items())).encode("utf-8"))
+            for message in messages:
+                digest.update(f"\x00{message.type}\x00{message.content}".encode("utf-8"))
+            digest.update(repr((stop, sorted(kwargs.items()))).encode("utf-8"))
+            return digest.hexdigest()
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            return self.scheduler.call(
+                lambda: self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                self._estimate(messages), self._key(messages, stop, kwargs)
+            )
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            return await self.scheduler.acall(
+                lambda: self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                self._estimate(messages), self._key(messages, stop, kwargs)
+            )
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            yield from self.scheduler.stream(
+                lambda: self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs),
+                self._estimate(messages)
+            )
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            chunks = self.scheduler.astream(
+                lambda: self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs),
+                self._estimate(messages)
+            )
+            async for chunk in chunks:
+                yield chunk
+
+    return ScheduledChatModel
+
+
+# BaseChatModel pulls in most of langchain_core, so the wrapper is only defined when the first client is built
+__getattr__ = lazy_classes(__name__, {"ScheduledChatModel": _define_scheduled_chat_model})
@@ -0,0 +1,135 @@
+import sys
+import time
+import tracing
+
+
+# ---------------------------
+# Latency Reporting
+# ---------------------------
+class LatencyReport:
+    """Time to first token and total latency (seconds) of one LLM call."""
+
+    __slots__ = ("started", "first_token", "total")
+
+    def __init__(self):
+        self.started = None
+        self.first_token = None
+        self.total = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def mark_token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+        if self.first_token is None:
+            # Non-streaming calls (or empty streams) deliver everything at once
+            self.first_token = self.total
+
+    def __str__(self):
+        if self.total is None:
+            return "latency: n/a"
+        return f"time to first token {self.first_token:.2f}s, total {self.total:.2f}s"
+
+
+def message_text(message):
+    """Plain text of an AIMessage / AIMessageChunk whose content may be a list of parts."""
+    content = getattr(message, "content", message)
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text", ""))
+    return "".join(parts)
+
+
+# ---------------------------
+# Full-Response and Streaming Calls
+# ---------------------------
+def invoke_text(runnable, inputs, latency=None):
+    """Invokes a model or chain and returns the response text."""
+    latency = latency or LatencyReport()
+    latency.start()
+    response = runnable.invoke(inputs)
+    latency.finish()
+    return message_text(response)
+
+
+async def ainvoke_text(runnable, inputs, latency=None):
+    """Async counterpart of `invoke_text`."""
+    latency = latency or LatencyReport()
+    latency.start()
+    response = await runnable.ainvoke(inputs)
+    latency.finish()
+    return message_text(response)
+
+
+def _trace_stream(stage, latency, usage):
+    # A span cannot stay open across yields, so the finished stream is logged as one event
+    tracing.event(
+        stage, latency.total,
+        ttft_ms=round(latency.first_token * 1000, 3),
+        input_tokens=usage.get("input_tokens", 0),
+        output_tokens=usage.get("output_tokens", 0),
+    )
+
+
+def _add_usage(usage, chunk):
+    if usage is None:
+        return
+    for key, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+        if isinstance(value, int):
+            usage[key] = usage.get(key, 0) + value
+
+
+def stream_text(runnable, inputs, latency=None, stage="llm_stream"):
+    """Yields response text chunks as the model produces them."""
+    latency = latency or LatencyReport()
+    usage = {} if tracing.enabled() else None
+    latency.start()
+    for chunk in runnable.stream(inputs):
+        _add_usage(usage, chunk)
+        text = message_text(chunk)
+        if text:
+            latency.mark_token()
+            yield text
+    latency.finish()
+    if usage is not None:
+        _trace_stream(stage, latency, usage)
+
+
+async def astream_text(runnable, inputs, latency=None, stage="llm_stream"):
+    """Async counterpart of `stream_text`."""
+    latency = latency or LatencyReport()
+    usage = {} if tracing.enabled() else None
+    latency.start()
+    async for chunk in runnable.astream(inputs):
+        _add_usage(usage, chunk)
+        text = message_text(chunk)
+        if text:
+            latency.mark_token()
+            yield text
+    latency.finish()
+    if usage is not None:
+        _trace_stream(stage, latency, usage)
+
+
+def print_stream(chunks, file=None):
+    """Prints chunks as they arrive (leading whitespace dropped) and returns the full text."""
+    file = file or sys.stdout
+    parts = []
+    for chunk in chunks:
+        if not parts:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+        parts.append(chunk)
+        print(chunk, end="", file=file, flush=True)
+    print(file=file)
+    return "".join(parts).strip()
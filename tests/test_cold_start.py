@@ -0,0 +1,33 @@
+import os
+import sys
+import subprocess
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_cold_start import CASES, HEAVY_MODULES  # noqa: E402
+
+
+def imported_modules(code):
+    """Top-level names of every module a fresh interpreter imports while running `code` (from -X importtime)."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert process.returncode == 0, process.stderr[-2000:]
+    modules = set()
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return modules
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_help_and_imports_stay_light(case):
+    heavy = imported_modules(CASES[case]) & set(HEAVY_MODULES)
+    assert not heavy, f"{case} imported {sorted(heavy)}"
+
+
+def test_check_catches_a_heavy_import():
+    assert "langchain_core" in imported_modules("import langchain_core")
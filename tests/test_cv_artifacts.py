@@ -0,0 +1,52 @@
+from cv_artifacts import ArtifactStore
+
+CV = ["Jane Doe\nExperience\nData analyst building SQL reports and Python dashboards for finance teams\n"
+      "Skills\nSQL, Python, Excel, Tableau"]
+JOB_A = "Data analyst with SQL, Python and dashboard experience for our finance team. Excel a plus."
+JOB_B = "Head chef running a busy kitchen: menus, catering, food safety and a team of cooks."
+
+
+def scored(score):
+    return {"Score": score, "Strengths": [], "Weaknesses": [], "Personalized Feedback": [],
+            "Final Recommendation": "", "Parse Mode": "json"}
+
+
+def score(store, pages, job_description, result):
+    decision = store.plan(pages, job_description)
+    assert decision["rescore"]
+    store.record(decision, pages, job_description, result)
+
+
+def test_switching_jobs_reuses_each_jobs_own_score(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    score(store, CV, JOB_A, scored(80))
+    score(store, CV, JOB_B, scored(5))
+
+    for job, expected in ((JOB_A, 80), (JOB_B, 5), (JOB_A, 80)):
+        decision = store.plan(CV, job)
+        assert not decision["rescore"] and decision["fresh"]
+        assert decision["result"]["Score"] == expected
+
+
+def test_another_jobs_score_is_never_reused(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    score(store, CV, JOB_B, scored(5))
+    decision = store.plan(CV, JOB_A)
+    assert decision["rescore"]
+    assert decision["reason"] == "different job description"
+
+
+def test_small_edit_reuses_the_closest_jobs_score(tmp_path):
+    # The sample JD is short, so two extra words already move relevance by 0.1
+    store = ArtifactStore(str(tmp_path), threshold=0.2)
+    score(store, CV, JOB_A, scored(80))
+    score(store, CV, JOB_B, scored(5))
+    decision = store.plan(CV, JOB_A + " Hybrid working.")
+    assert not decision["rescore"] and not decision["fresh"]
+    assert decision["result"]["Score"] == 80
+
+
+def test_unparsed_results_are_rescored(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    score(store, CV, JOB_A, {**scored(0), "Parse Mode": "unparsed"})
+    assert store.plan(CV, JOB_A)["rescore"]
@@ -0,0 +1,37 @@
+import pytest
+from tools import load_tool
+from fake_llm import FakeGeminiChat
+from llm_clients import set_chat_model_factory
+
+cv_builder = load_tool("cv_builder")
+
+
+class FailingSectionChat(FakeGeminiChat):
+    """Fails every prompt that mentions "BROKEN" with a non-retryable error."""
+
+    def _respond(self, messages):
+        if "BROKEN" in self._prompt(messages):
+            raise ValueError("Invalid argument: section rejected")
+        return super()._respond(messages)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    monkeypatch.delenv("CAREERCRAFT_LLM_CACHE", raising=False)
+    set_chat_model_factory(lambda model, temperature, **kwargs: FailingSectionChat(model=model))
+    yield
+    set_chat_model_factory(None)
+
+
+def test_all_sections_are_enhanced(llm):
+    result = cv_builder.enhance_cv("Analyst", "SQL", ["Built reports", "Ran dashboards"], "Data Analyst")
+    assert result["summary"] and result["skills"] and all(result["jobs"])
+    assert result["errors"] == {}
+
+
+def test_one_failed_section_keeps_the_others(llm):
+    result = cv_builder.enhance_cv("Analyst", "SQL", ["Built reports", "BROKEN", "Ran dashboards"], "Data Analyst")
+    assert set(result["errors"]) == {"job-2"}
+    assert result["jobs"][1] is None and result["latency"]["jobs"][1] is None
+    assert result["jobs"][0] and result["jobs"][2]
+    assert result["summary"] and result["skills"]
@@ -0,0 +1,50 @@
+import os
+import sys
+import pytest
+from tools import load_tool
+from fake_llm import install_fake_llm
+from llm_clients import set_chat_model_factory
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from run import JOB_DESCRIPTION, synthetic_cv_text, write_pdf  # noqa: E402
+
+cv_ranking = load_tool("cv_ranking")
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    monkeypatch.setenv("CAREERCRAFT_TEXT_CACHE", "0")
+    monkeypatch.delenv("CAREERCRAFT_LLM_CACHE", raising=False)
+    install_fake_llm()
+    yield
+    set_chat_model_factory(None)
+
+
+@pytest.fixture
+def cv_dir(tmp_path):
+    for number in range(4):
+        write_pdf(str(tmp_path / f"candidate-{number}.pdf"), f"Candidate {number}\n" + synthetic_cv_text(seed=number))
+    (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+    (tmp_path / "notes.txt").write_text("not a CV")
+    return tmp_path
+
+
+@pytest.mark.parametrize("cvs_per_prompt", [1, 3])
+def test_rank_cvs_scores_a_directory(fake_llm, cv_dir, cvs_per_prompt):
+    rows = cv_ranking.rank_cvs([str(cv_dir)], JOB_DESCRIPTION, max_workers=2, cvs_per_prompt=cvs_per_prompt)
+
+    assert [os.path.basename(row["File"]) for row in rows][-1] == "broken.pdf"
+    assert len(rows) == 5  # the .txt file is not a supported CV
+    scored, failed = rows[:-1], rows[-1]
+    assert all(row["Error"] is None and row["Score"] is not None for row in scored)
+    assert [row["Score"] for row in scored] == sorted((row["Score"] for row in scored), reverse=True)
+    assert all(row["Strengths"] and row["Personalized Feedback"] for row in scored)
+    assert failed["Score"] is None and failed["Error"]
+
+
+def test_shortlist_only_scores_the_best_matches(fake_llm, cv_dir):
+    rows = cv_ranking.rank_cvs([str(cv_dir)], JOB_DESCRIPTION, max_workers=2, shortlist_size=2)
+    scored = [row for row in rows if row["Score"] is not None]
+    assert len(scored) == 2
+    assert all(row["Shortlisted"] for row in scored)
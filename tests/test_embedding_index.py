@@ -0,0 +1,58 @@
+import pytest
+from embedding_index import EmbeddingIndex, HashingEmbedder
+
+ANALYST = ["Jane Doe\nExperience\nBuilt Power BI dashboards and SQL reports for finance\nSkills\nSQL, Python, Excel"]
+CHEF = ["John Roe\nExperience\nRan a busy kitchen, planned menus and catering\nSkills\nFood safety, pastry"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder(64))
+
+
+def test_search_finds_the_matching_cv(index):
+    index.add_many([("analyst", ANALYST), ("chef", CHEF)])
+    assert index.search("Power BI dashboards", k=1)[0][0] == "analyst"
+    assert index.similar_to("analyst", k=1)[0][0] == "chef"
+
+
+def test_replacing_a_cv_without_chunks(index):
+    index.add("empty", [""])
+    assert index.count == 0
+    index.add("empty", ANALYST)
+    assert [cv_id for cv_id, _, _ in index.search("SQL reports")] == ["empty"]
+
+
+def test_a_cv_listed_twice_keeps_its_last_version(index):
+    index.add_many([("cv", CHEF), ("cv", ANALYST)])
+    results = index.search("kitchen menus catering")
+    assert len(results) == 1
+    assert index.similar_to("cv") == []
+
+
+def test_replaced_cv_survives_reopening(index, tmp_path):
+    index.add("cv", CHEF)
+    index.add("cv", ANALYST)
+    reopened = EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder(64))
+    assert len(reopened) == 1
+    assert reopened.search("SQL", k=5)[0][0] == "cv"
+
+
+def test_release_advises_every_mapping_it_can(index, monkeypatch):
+    index.add("analyst", ANALYST)
+    released = []
+
+    class Buffer:
+        def madvise(self, *args):
+            released.append(args)
+
+    monkeypatch.setattr(index.vectors, "_mmap", Buffer())
+    monkeypatch.setattr(index.rows, "_mmap", Buffer())
+    index._release(0, index.capacity)
+    assert len(released) == 2
+
+    # One array without a mapping must not stop the other from being released
+    released.clear()
+    monkeypatch.setattr(index.vectors, "_mmap", None)
+    index._release(0, index.capacity)
+    assert len(released) == 1
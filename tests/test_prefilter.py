@@ -0,0 +1,25 @@
+import pytest
+from prefilter import BM25Index, shortlist
+
+TEXTS = {
+    "analyst.pdf": "data analyst sql python dashboards",
+    "engineer.pdf": "data engineer spark airflow pipelines python",
+    "chef.pdf": "chef kitchen menus catering",
+}
+
+
+def test_top_k_returns_the_best_k():
+    results = shortlist(TEXTS, "sql python analyst", top_k=2)
+    assert [cv for cv, _ in results] == ["analyst.pdf", "engineer.pdf"]
+
+
+def test_min_score_drops_unrelated_cvs():
+    results = shortlist(TEXTS, "python", top_k=None, min_score=0.0)
+    assert {cv for cv, _ in results} == {"analyst.pdf", "engineer.pdf"}
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_top_k_rejects_k_below_one(k):
+    index = BM25Index(list(TEXTS.values()), ids=list(TEXTS))
+    with pytest.raises(ValueError):
+        index.top_k("python", k=k)
@@ -0,0 +1,51 @@
+import hashlib
+import pytest
+import llm_cache
+import llm_clients
+import question_bank
+from fake_llm import FakeGeminiChat
+from langchain_core.globals import set_llm_cache
+
+
+class VaryingQuestionsChat(FakeGeminiChat):
+    """Writes questions derived from the prompt, like a real model given a different prompt."""
+
+    def _respond(self, messages):
+        self.calls += 1
+        prompt = self._prompt(messages)
+        tag = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return prompt, "\n\n".join(
+            f"Question: Question {tag}-{i}?\n1. A\n2. B\n3. C\n4. D\nAnswer: 1" for i in range(3)
+        )
+
+
+@pytest.fixture
+def cached_llm(tmp_path, monkeypatch):
+    monkeypatch.setenv("CAREERCRAFT_LLM_CACHE", str(tmp_path / "llm.sqlite3"))
+    llm_clients.set_chat_model_factory(lambda model, temperature, **kwargs: VaryingQuestionsChat(model=model))
+    yield
+    llm_clients.set_chat_model_factory(None)
+    set_llm_cache(None)
+    llm_cache._configured_cache = None
+
+
+def test_refills_keep_growing_with_the_llm_cache(tmp_path, cached_llm):
+    bank = question_bank.QuestionBank(tmp_path / "missing.jsonl", refill_path=str(tmp_path / "refill.jsonl"))
+    assert bank.generate("verbal", 3) == 3
+    assert bank.generate("verbal", 3) == 3
+    assert len(question_bank.QuestionBank(tmp_path / "missing.jsonl", refill_path=str(tmp_path / "refill.jsonl"))) == 6
+
+
+def test_ids_come_from_the_question_text(tmp_path):
+    shipped = str(tmp_path / "shipped.jsonl")
+    refill = str(tmp_path / "refill.jsonl")
+    questions = [{"question": f"Which word is odd one out {i}?", "options": ["a", "b", "c", "d"], "answer": 1}
+                 for i in range(2)]
+    question_bank.QuestionBank(shipped, refill_path=shipped).add("verbal", questions[:1])
+    bank = question_bank.QuestionBank(shipped, refill_path=refill)
+    bank.add("verbal", questions)
+
+    reloaded = question_bank.QuestionBank(shipped, refill_path=refill)
+    assert len(reloaded) == 2
+    assert len(reloaded.by_id) == 2
+    assert reloaded.get(question_bank.question_id("verbal", questions[1]["question"]))["question"] == questions[1]["question"]
@@ -0,0 +1,26 @@
+from result_store import ResultStore
+
+RESULT = {"Score": 70, "Strengths": ["SQL"], "Weaknesses": [], "Personalized Feedback": [],
+          "Final Recommendation": "Interview."}
+CV = "Jane Doe\nData analyst, SQL and Python"
+JOB = "Data analyst with SQL"
+
+
+def test_exact_copies_keep_the_first_file_name(tmp_path):
+    with ResultStore(str(tmp_path / "results.sqlite3")) as store:
+        cv_hash = store.add(CV, JOB, "fake", RESULT, "jane.pdf")
+        store.add(CV, JOB, "fake", {**RESULT, "Score": 72}, "jane (1).pdf")
+        store.flush()
+        store.add(CV, JOB, "fake", {**RESULT, "Score": 75}, "jane-copy.pdf")
+        store.flush()
+        stored = store.get(cv_hash, JOB, model="fake")
+    assert stored["cv_name"] == "jane.pdf"
+    assert stored["score"] == 75
+
+
+def test_a_name_is_filled_in_when_the_first_had_none(tmp_path):
+    with ResultStore(str(tmp_path / "results.sqlite3")) as store:
+        cv_hash = store.add(CV, JOB, "fake", RESULT)
+        store.add(CV, JOB, "fake", RESULT, "jane.pdf")
+        store.flush()
+        assert store.get(cv_hash, JOB, model="fake")["cv_name"] == "jane.pdf"
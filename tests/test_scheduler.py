@@ -0,0 +1,182 @@
+import asyncio
+import pytest
+import scheduler
+import llm_clients
+from fake_llm import FakeRateLimitError, install_fake_llm
+
+
+def flaky(failures, result="ok", error=FakeRateLimitError, message="429 Resource has been exhausted (e.g. check quota)."):
+    """A call that raises `error(message)` `failures` times before returning `result`."""
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) <= failures:
+            raise error(message)
+        return result
+
+    return fn, attempts
+
+
+# ---------------------------
+# Retries
+# ---------------------------
+def test_retries_429_until_success():
+    s = scheduler.Scheduler(base_delay=0)
+    fn, attempts = flaky(2)
+    assert s.call(fn, 10) == "ok"
+    assert len(attempts) == 3
+    assert s.stats()["retries"] == 2
+    assert s.stats()["calls"] == 3
+
+
+def test_gives_up_after_max_retries():
+    s = scheduler.Scheduler(base_delay=0, max_retries=2)
+    fn, attempts = flaky(10)
+    with pytest.raises(FakeRateLimitError):
+        s.call(fn, 10)
+    assert len(attempts) == 3
+
+
+def test_does_not_retry_other_errors():
+    s = scheduler.Scheduler(base_delay=0)
+    fn, attempts = flaky(1, error=ValueError, message="Invalid argument")
+    with pytest.raises(ValueError):
+        s.call(fn, 10)
+    assert len(attempts) == 1
+
+
+def test_async_retries_429_until_success():
+    s = scheduler.Scheduler(base_delay=0)
+    fn, attempts = flaky(3)
+
+    async def afn():
+        return fn()
+
+    assert asyncio.run(s.acall(afn, 10)) == "ok"
+    assert len(attempts) == 4
+
+
+def test_fake_model_429s_are_retried(monkeypatch):
+    s = scheduler.Scheduler(base_delay=0, max_retries=50)
+    monkeypatch.setattr(scheduler, "get_scheduler", lambda model: s)
+    monkeypatch.delenv("CAREERCRAFT_LLM_CACHE", raising=False)
+    install_fake_llm(error_rate=0.9, seed=0)
+    try:
+        reply = llm_clients.get_chat_model(model="fake-429").invoke("Write one CV bullet.")
+    finally:
+        llm_clients.set_chat_model_factory(None)
+    assert reply.content
+    assert s.stats()["retries"] > 0
+
+
+# ---------------------------
+# Coalescing
+# ---------------------------
+def test_followers_share_the_leader_result():
+    async def main():
+        s = scheduler.Scheduler(base_delay=0)
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"text": "ok"}
+
+        results = await asyncio.gather(*(s.acall(fn, 10, key="same") for _ in range(3)))
+        return s, calls, results
+
+    s, calls, results = asyncio.run(main())
+    assert results == [{"text": "ok"}] * 3
+    assert len(calls) == 1
+    assert s.stats()["coalesced"] == 2
+
+
+def test_followers_share_the_leader_error():
+    async def main():
+        s = scheduler.Scheduler(base_delay=0)
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad prompt")
+
+        return await asyncio.gather(*(s.acall(fn, 10, key="same") for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_leader_lets_followers_call_themselves():
+    async def main():
+        s = scheduler.Scheduler(base_delay=0)
+        started = asyncio.Event()
+        calls = []
+
+        async def hanging():
+            calls.append("leader")
+            started.set()
+            await asyncio.sleep(3600)
+
+        async def fresh():
+            calls.append("follower")
+            await asyncio.sleep(0.01)
+            return "fresh"
+
+        # Like main.py's request timeout: asyncio.wait_for cancels the leader's call
+        leader = asyncio.create_task(asyncio.wait_for(s.acall(hanging, 10, key="same"), 0.05))
+        await started.wait()
+        followers = [asyncio.create_task(s.acall(fresh, 10, key="same")) for _ in range(2)]
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        return s, calls, await asyncio.gather(*followers)
+
+    s, calls, results = asyncio.run(main())
+    assert results == ["fresh", "fresh"]
+    # One follower takes over as leader and the other coalesces onto it
+    assert calls == ["leader", "follower"]
+    assert s._in_flight == {}
+
+
+def test_cancelled_follower_does_not_cancel_the_others():
+    async def main():
+        s = scheduler.Scheduler(base_delay=0)
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        leader = asyncio.create_task(s.acall(fn, 10, key="same"))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(s.acall(fn, 10, key="same")) for _ in range(2)]
+        await asyncio.sleep(0)
+        followers[0].cancel()
+        return await asyncio.gather(leader, followers[1], followers[0], return_exceptions=True)
+
+    leader, follower, cancelled = asyncio.run(main())
+    assert (leader, follower) == ("ok", "ok")
+    assert isinstance(cancelled, asyncio.CancelledError)
+
+
+def test_sync_followers_survive_a_cancelled_leader():
+    import threading
+
+    s = scheduler.Scheduler(base_delay=0)
+    started, release = threading.Event(), threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait()
+        raise KeyboardInterrupt
+
+    results = []
+    leader = threading.Thread(target=lambda: pytest.raises(KeyboardInterrupt, s.call, interrupted, 10, "same"))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: results.append(s.call(lambda: "fresh", 10, "same")))
+    follower.start()
+    while not s.stats()["coalesced"]:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["fresh"]
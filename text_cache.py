@@ -0,0 +1,194 @@
+import os
+import json
+import hashlib
+import tempfile
+import importlib
+from importlib import metadata
+import tracing
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+CACHE_DIR = os.getenv(
+    "CAREERCRAFT_TEXT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "careercraft", "text")
+)
+MAX_CACHE_BYTES = int(os.getenv("CAREERCRAFT_TEXT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Writes from other processes sharing the directory are only noticed on a rescan, so rescan every so often
+RESCAN_WRITES = 256
+# Eviction trims down to this share of max_bytes, so a full cache is not rescanned on every write
+EVICT_TO = 0.9
+
+# Bump when the stored format or the way pages are extracted changes
+CACHE_FORMAT_VERSION = 1
+
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# Loaders are LangChain document loader classes, or their "module.ClassName" path so that
+# callers do not import LangChain until a document actually has to be parsed
+def resolve_loader(loader_cls):
+    if isinstance(loader_cls, str):
+        module_name, _, name = loader_cls.rpartition(".")
+        return getattr(importlib.import_module(module_name), name)
+    return loader_cls
+
+
+def loader_name(loader_cls):
+    return loader_cls.rpartition(".")[2] if isinstance(loader_cls, str) else loader_cls.__name__
+
+
+def loader_version(loader_cls):
+    """Identifies a loader implementation, so upgrading it invalidates old entries."""
+    if isinstance(loader_cls, str):
+        module_name, _, qualname = loader_cls.rpartition(".")
+    else:
+        module_name, qualname = loader_cls.__module__, loader_cls.__qualname__
+    package = module_name.split(".")[0].replace("_", "-")
+    return f"{module_name}.{qualname}@{_package_version(package)}/v{CACHE_FORMAT_VERSION}"
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------------------
+# Content-Addressed Text Cache
+# ---------------------------
+class TextCache:
+    """
+    On-disk cache of extracted document pages, keyed by file content and loader.
+
+    Entries are small JSON files; reading one refreshes its mtime, and writes
+    evict the least recently used entries once the directory grows past
+    `max_bytes`. Writes are atomic, so several processes can share a cache.
+
+    The directory size is tracked as a running total; it is only listed again
+    when that total passes `max_bytes` or every `RESCAN_WRITES` writes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._total = None  # unknown until the first scan
+        self._writes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path, loader_cls):
+        raw = f"{file_digest(file_path)}:{loader_version(loader_cls)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                pages = json.load(f)["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return pages
+
+    def put(self, key, pages):
+        path = self._path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"pages": pages}, f, ensure_ascii=False)
+                written = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._writes += 1
+        if self._total is not None:
+            self._total += written - replaced
+        if self._total is None or self._total > self.max_bytes or self._writes % RESCAN_WRITES == 0:
+            self.evict()
+
+    def evict(self):
+        """Lists the directory and, once it is past `max_bytes`, removes the least recently used entries."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        # Oldest first
+        target = self.max_bytes if total <= self.max_bytes else self.max_bytes * EVICT_TO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self._total = total
+
+    def clear(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith((".json", ".tmp")):
+                os.remove(entry.path)
+        self._total = 0
+
+
+_default_cache = None
+
+
+def get_text_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextCache()
+    return _default_cache
+
+
+def load_pages(file_path, loader_cls, cache=None):
+    """
+    Returns the page texts of `file_path` as extracted by `loader_cls`.
+
+    The document is only parsed when no entry exists for this exact file
+    content and loader version; pass `cache=False` to bypass the cache.
+    """
+    with tracing.span("load_cv", file=os.path.basename(file_path), loader=loader_name(loader_cls)) as current:
+        if cache is False or os.getenv("CAREERCRAFT_TEXT_CACHE") == "0":
+            pages = [doc.page_content for doc in resolve_loader(loader_cls)(file_path).load()]
+        else:
+            cache = cache or get_text_cache()
+            key = cache.key(file_path, loader_cls)
+            pages = cache.get(key)
+            current.set(text_cache_hit=pages is not None)
+            if pages is None:
+                pages = [doc.page_content for doc in resolve_loader(loader_cls)(file_path).load()]
+                cache.put(key, pages)
+        current.set(pages=len(pages))
+    return pages
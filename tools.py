@@ -0,0 +1,71 @@
+import os
+import sys
+import importlib
+import importlib.util
+
+
+# ---------------------------
+# Tool Scripts
+# ---------------------------
+# The CLI scripts have hyphenated file names, so they cannot be imported with a plain `import`
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TOOL_FILES = {
+    "cv_ranking": "cv-ranking.py",
+    "cover_letter": "cover-letter.py",
+    "cv_builder": "cv-builder.py",
+    "psycometric": "psycometric.py",
+}
+
+
+def load_tool(name):
+    """
+    Imports a tool script as a module registered under `name` (e.g. "cv_ranking").
+
+    Registering it in sys.modules keeps its functions picklable, which the
+    process pools used for document parsing rely on.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if name not in TOOL_FILES:
+        raise ValueError(f"Unknown tool: {name}")
+
+    file_name = TOOL_FILES[name]
+    if file_name == f"{name}.py":
+        return importlib.import_module(name)
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, file_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+# ---------------------------
+# Lazily Defined Classes
+# ---------------------------
+def lazy_classes(module_name, factories):
+    """
+    Returns a module-level `__getattr__` (PEP 562) that defines classes on first access.
+
+    `factories` maps a class name to a function that imports what the class
+    needs and returns it. Classes subclassing LangChain or pydantic types are
+    defined this way so that importing their module stays cheap. The class is
+    cached on the module under its own name and qualname, so pickle can find it there.
+    """
+    module = sys.modules[module_name]
+
+    def __getattr__(name):
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        cls = factory()
+        cls.__qualname__ = name
+        cls.__module__ = module_name
+        setattr(module, name, cls)
+        return cls
+
+    return __getattr__
@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import itertools
+import threading
+from contextvars import ContextVar
+from tools import lazy_classes
+
+
+# ---------------------------
+# Settings
+# ---------------------------
+# CAREERCRAFT_TRACE=1 (or "stderr") logs one JSON line per finished span to stderr,
+# any other value is treated as a file to append them to; unset or "0" disables tracing
+_target = None
+_sink = None
+_enabled = False
+_write_lock = threading.Lock()
+_metrics_lock = threading.Lock()
+_metrics = {}
+
+_current_span = ContextVar("careercraft_span", default=None)
+_span_ids = itertools.count(1)
+
+
+def configure_tracing(target=None):
+    """(Re)configures tracing from `target` or CAREERCRAFT_TRACE; returns whether it is enabled."""
+    global _target, _sink, _enabled
+    target = target if target is not None else os.getenv("CAREERCRAFT_TRACE", "")
+    with _write_lock:
+        if _sink is not None and _sink is not sys.stderr:
+            _sink.close()
+        _target = target
+        if target in ("", "0"):
+            _sink = None
+        elif target in ("1", "stderr"):
+            _sink = sys.stderr
+        else:
+            _sink = open(target, "a", encoding="utf-8")
+        _enabled = _sink is not None
+    return _enabled
+
+
+def enabled():
+    return _enabled
+
+
+# ---------------------------
+# Spans
+# ---------------------------
+class Span:
+    """One timed stage. Attributes set on it end up in its JSON log line."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "started", "attrs", "_token")
+
+    def __init__(self, name, attrs):
+        parent = _current_span.get()
+        self.name = name
+        self.span_id = f"{os.getpid():x}-{next(_span_ids):x}"
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.attrs = attrs
+        self.started = None
+        self._token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        _emit(self, duration)
+        return False
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, so instrumented code pays almost nothing."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attrs):
+    """Context manager timing one stage; nested spans record their parent."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, attrs)
+
+
+def current_span():
+    """The innermost open span, or a no-op span when there is none."""
+    return (_enabled and _current_span.get()) or _NOOP_SPAN
+
+
+def count(key, amount=1):
+    """Adds to a counter on the innermost open span (e.g. cache hits)."""
+    if _enabled:
+        current = _current_span.get()
+        if current is not None:
+            current.add(key, amount)
+
+
+def event(name, duration, **attrs):
+    """
+    Logs an already-measured stage as a child of the current span.
+
+    Used where a `with span(...)` block cannot wrap the work, such as a
+    generator streaming chunks back to its caller.
+    """
+    if _enabled:
+        record = Span(name, attrs)
+        _emit(record, duration)
+
+
+def _emit(record, duration):
+    line = {
+        "ts": time.time(),
+        "trace_id": record.trace_id,
+        "span_id": record.span_id,
+        "parent_id": record.parent_id,
+        "name": record.name,
+        "duration_ms": round(duration * 1000, 3),
+        **record.attrs,
+    }
+
+    with _metrics_lock:
+        stats = _metrics.setdefault(record.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += line["duration_ms"]
+        stats["max_ms"] = max(stats["max_ms"], line["duration_ms"])
+        for key in ("input_tokens", "cached_input_tokens", "output_tokens", "cache_hits", "cache_misses", "llm_calls"):
+            if key in record.attrs:
+                stats[key] = stats.get(key, 0) + record.attrs[key]
+
+    with _write_lock:
+        if _sink is not None:
+            _sink.write(json.dumps(line, default=str) + "\n")
+            _sink.flush()
+
+
+def metrics():
+    """Per-stage totals (count, total/max milliseconds, tokens, cache hits) since start-up."""
+    with _metrics_lock:
+        return {name: dict(stats) for name, stats in _metrics.items()}
+
+
+# ---------------------------
+# LLM Call Instrumentation
+# ---------------------------
+def _define_callback_handler():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TracingCallbackHandler(BaseCallbackHandler):
+        """
+        Adds LLM round-trip time and token usage to the span that made the call.
+
+        Attached to every client built by `llm_clients.get_chat_model` while
+        tracing is enabled. Token counts come from the response's
+        `usage_metadata`, which Gemini fills in for normal and streamed calls.
+        """
+
+        run_inline = True
+
+        def __init__(self):
+            self._started = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._started[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            started = self._started.pop(run_id, None)
+            current = current_span()
+            current.add("llm_calls")
+            if started is not None:
+                current.add("llm_ms", round((time.perf_counter() - started) * 1000, 3))
+
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    current.add("input_tokens", usage.get("input_tokens", 0))
+                    # Prompt prefix tokens the backend served from its context cache
+                    current.add("cached_input_tokens", (usage.get("input_token_details") or {}).get("cache_read", 0))
+                    current.add("output_tokens", usage.get("output_tokens", 0))
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._started.pop(run_id, None)
+            current_span().add("llm_errors")
+
+    return TracingCallbackHandler
+
+
+# LangChain's callback module is slow to import, so the handler class is only defined when a client needs it
+__getattr__ = lazy_classes(__name__, {"TracingCallbackHandler": _define_callback_handler})
+
+configure_tracing()